@@ -0,0 +1,81 @@
+"""Benchmark per-lookup latency of `scryfall.get_cards`.
+
+Compares a linear scan over a list of card dicts (the original implementation), a vectorized scan over the columns
+of the card store and the lazily built hash index.
+
+Usage:
+    python benchmarks/get_cards.py [--lookups N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+
+def _list_scan(cards: list[dict], **kwargs: str) -> list[dict]:
+    from mtg_proxies.scryfall import canonic_card_name
+
+    for key, value in kwargs.items():
+        value = value.lower()
+        if key == "name":
+            value = canonic_card_name(value)
+        cards = [card for card in cards if key in card and card[key].lower() == value]
+    return cards
+
+
+def _measure(lookup: Callable[..., object], queries: list[dict[str, str]]) -> float:
+    """Return mean latency per lookup in milliseconds."""
+    start = time.perf_counter()
+    for query in queries:
+        lookup(**query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark card lookups.")
+    parser.add_argument("--lookups", type=int, default=200, help="number of lookups (default: %(default)d)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)d)")
+    args = parser.parse_args()
+
+    from mtg_proxies.scryfall import canonic_card_name
+    from mtg_proxies.scryfall.index import CardIndex
+    from mtg_proxies.scryfall.scryfall import _get_database
+
+    store = _get_database()
+    rows = random.Random(args.seed).sample(range(len(store)), args.lookups)
+    queries = [
+        {
+            "name": canonic_card_name(store.value("name", row)),
+            "set": store.value("set", row).lower(),
+            "collector_number": store.value("collector_number", row).lower(),
+        }
+        for row in rows
+    ]
+
+    cards = list(store)
+    index = CardIndex(store, normalize={"name": canonic_card_name})
+    start = time.perf_counter()
+    index.rows(**queries[0])
+    build_time = (time.perf_counter() - start) * 1000
+
+    results = {
+        "list scan": _measure(lambda **kwargs: _list_scan(cards, **kwargs), queries),
+        "column scan": _measure(store.rows, queries),
+        "hash index": _measure(index.rows, queries),
+    }
+    assert all(np.array_equal(index.rows(**query), store.rows(**query)) for query in queries)
+
+    print(f"{len(store)} cards, {args.lookups} lookups of name, set and collector number")
+    print(f"hash index built in {build_time:.1f} ms")
+    for name, latency in results.items():
+        print(f"{name:>12}: {latency:8.3f} ms per lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark partial matching of misspelled card names.
+
+Compares a linear scan over all card names (the original implementation) with the n-gram index, and measures the
+edit distance ranking used for suggestions. The corpus consists of real card names with random typos.
+
+Usage:
+    python benchmarks/name_matching.py [--names N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+
+def _misspell(name: str, rnd: random.Random) -> str:
+    """Introduce a typical typo into a name."""
+    words = name.split(" ")
+    match rnd.randrange(4):
+        case 0:  # Drop a character
+            i = rnd.randrange(len(name))
+            return name[:i] + name[i + 1 :]
+        case 1:  # Swap two characters
+            i = rnd.randrange(max(len(name) - 1, 1))
+            return name[:i] + name[i + 1 : i + 2] + name[i : i + 1] + name[i + 2 :]
+        case 2:  # Truncate the last word
+            return " ".join([*words[:-1], words[-1][: max(len(words[-1]) // 2, 1)]])
+        case _:  # Drop a word
+            return " ".join(word for i, word in enumerate(words) if i != rnd.randrange(len(words))) or name
+
+
+def _scan(names: list[str], words: list[str]) -> list[str]:
+    return [name for name in names if all(word in name for word in words)]
+
+
+def _measure(match: Callable[[str], object], queries: list[str]) -> float:
+    """Return mean latency per query in milliseconds."""
+    start = time.perf_counter()
+    for query in queries:
+        match(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy card name matching.")
+    parser.add_argument("--names", type=int, default=500, help="number of misspelled names (default: %(default)d)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)d)")
+    args = parser.parse_args()
+
+    from mtg_proxies.decklists.sanitizing import card_names
+    from mtg_proxies.scryfall import canonic_card_name
+    from mtg_proxies.scryfall.name_index import NameIndex
+
+    names = list(card_names()[0])
+    rnd = random.Random(args.seed)
+    queries = [canonic_card_name(_misspell(name, rnd)) for name in rnd.sample(names, args.names)]
+
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build_time = (time.perf_counter() - start) * 1000
+
+    results = {
+        "scan": _measure(lambda query: _scan(names, query.split(" ")), queries),
+        "n-gram index": _measure(lambda query: index.containing(query.split(" ")), queries),
+        "closest names": _measure(index.closest, queries),
+    }
+    assert all(index.containing(query.split(" ")) == _scan(names, query.split(" ")) for query in queries)
+
+    print(f"{len(names)} card names, {args.names} misspelled names")
+    print(f"n-gram index built in {build_time:.1f} ms")
+    for name, latency in results.items():
+        print(f"{name:>13}: {latency:8.3f} ms per name")
+
+
+if __name__ == "__main__":
+    main()
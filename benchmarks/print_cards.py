@@ -0,0 +1,103 @@
+"""Benchmark image decoding of `print_cards_matplotlib` on a deck full of duplicates.
+
+Compares decoding every card of the deck (the original implementation) with the LRU cache of decoded, cropped
+uint8 bitmaps. Reports the number of decoded images, peak traced memory and runtime.
+
+Usage:
+    python benchmarks/print_cards.py [--unique N] [--copies N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+def _write_scans(folder: Path, n: int, seed: int) -> list[Path]:
+    """Write `n` random scans in the size of a png scan."""
+    from mtg_proxies.print_cards import image_size
+
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(n):
+        path = folder / f"card_{i}.png"
+        plt.imsave(path, rng.random((image_size[1], image_size[0], 3), dtype=np.float32))
+        paths.append(path)
+    return paths
+
+
+def _uncached_load_image(path: str | Path, left: int = 0, top: int = 0) -> np.ndarray:
+    from mtg_proxies.print_cards import _crop
+
+    return _crop(plt.imread(path), left, top)
+
+
+def _measure(load_image: Callable[..., np.ndarray], images: list[Path], out_file: Path, dpi: int) -> dict[str, float]:
+    """Print the images and return decode count, peak memory in MiB and runtime in seconds."""
+    import mtg_proxies.print_cards as print_cards
+
+    decodes = 0
+    imread = plt.imread
+
+    def counting_imread(*args: object, **kwargs: object) -> np.ndarray:
+        nonlocal decodes
+        decodes += 1
+        return imread(*args, **kwargs)
+
+    print_cards._decode_image.cache_clear()
+    print_cards._load_image.cache_clear()
+    original_load_image = print_cards._load_image
+    plt.imread = counting_imread
+    print_cards._load_image = load_image
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        print_cards.print_cards_matplotlib(images, out_file, dpi=dpi)
+        runtime = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        plt.imread = imread
+        print_cards._load_image = original_load_image
+    return {"decodes": decodes, "peak": peak / 2**20, "runtime": runtime}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark image decoding while printing cards.")
+    parser.add_argument("--unique", type=int, default=10, help="number of distinct cards (default: %(default)d)")
+    parser.add_argument("--copies", type=int, default=10, help="copies of each card (default: %(default)d)")
+    parser.add_argument("--dpi", type=int, default=150, help="resolution of the output (default: %(default)d)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)d)")
+    args = parser.parse_args()
+
+    import mtg_proxies.print_cards as print_cards
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        scans = _write_scans(folder, args.unique, args.seed)
+        images = [scan for scan in scans for _ in range(args.copies)]  # Like `fetch_scans_scryfall`
+
+        results = {
+            "uncached": _measure(_uncached_load_image, images, folder / "uncached.pdf", args.dpi),
+            "lru cache": _measure(print_cards._load_image, images, folder / "cached.pdf", args.dpi),
+        }
+
+    print(f"{len(images)} cards, {args.unique} distinct scans, printed at {args.dpi} dpi")
+    for name, result in results.items():
+        print(f"{name:>10}: {result['decodes']:4d} decodes, {result['peak']:8.1f} MiB peak, {result['runtime']:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
-import mtg_proxies.scryfall as scryfall
-from mtg_proxies.print_cards import print_cards_fpdf, print_cards_matplotlib
-from mtg_proxies.scans import fetch_scans_scryfall
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import mtg_proxies.scryfall as scryfall
+    from mtg_proxies.print_cards import print_cards_fpdf, print_cards_matplotlib
+    from mtg_proxies.scans import fetch_scans_scryfall
 
 __all__ = [
     "fetch_scans_scryfall",
@@ -8,3 +14,23 @@ __all__ = [
     "print_cards_matplotlib",
     "scryfall",
 ]
+
+
+def __getattr__(name: str) -> object:
+    # Public names are imported on first access, as some pull in matplotlib
+    lazy_imports = {
+        "fetch_scans_scryfall": "mtg_proxies.scans",
+        "print_cards_fpdf": "mtg_proxies.print_cards",
+        "print_cards_matplotlib": "mtg_proxies.print_cards",
+        "scryfall": "mtg_proxies.scryfall",
+    }
+    if name not in lazy_imports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = import_module(lazy_imports[name])
+    value = module if module.__name__ == f"{__name__}.{name}" else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -1,14 +1,16 @@
+from __future__ import annotations
+
 import argparse
+import os
 from collections.abc import Container
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import numpy as np
+# Subcommands import what they need when they run, so startup doesn't pay for numpy or matplotlib
+if TYPE_CHECKING:
+    import numpy as np
 
-from mtg_proxies import fetch_scans_scryfall, print_cards_fpdf, print_cards_matplotlib
-from mtg_proxies.deck_value import show_deck_value
-from mtg_proxies.decklists import archidekt, manastack, parse_decklist
-from mtg_proxies.decklists.decklist import Decklist
-from mtg_proxies.tokens import get_tokens
+    from mtg_proxies.decklists.decklist import Decklist
 
 
 def parse_decklist_spec(decklist_spec: str, warn_levels: Container[str] = ("ERROR", "WARNING", "COSMETIC")) -> Decklist:
@@ -18,17 +20,20 @@ def parse_decklist_spec(decklist_spec: str, warn_levels: Container[str] = ("ERRO
         decklist_spec: File path or ManaStack id
         warn_levels: Levels of warnings to show
     """
+    from mtg_proxies.decklists import ValidationCache, archidekt, manastack, parse_decklist
+
+    cache = ValidationCache(suggest=True)  # Name the closest cards for typos
     print("Parsing decklist ...")
     if Path(decklist_spec).is_file():  # Decklist is file
-        decklist, ok, warnings = parse_decklist(decklist_spec)
+        decklist, ok, warnings = parse_decklist(decklist_spec, cache)
     elif decklist_spec.lower().startswith("manastack:") and decklist_spec.split(":")[-1].isdigit():
         # Decklist on Manastack
         manastack_id = decklist_spec.split(":")[-1]
-        decklist, ok, warnings = manastack.parse_decklist(manastack_id)
+        decklist, ok, warnings = manastack.parse_decklist(manastack_id, cache=cache)
     elif decklist_spec.lower().startswith("archidekt:") and decklist_spec.split(":")[-1].isdigit():
         # Decklist on Archidekt
         archidekt_id = decklist_spec.split(":")[-1]
-        decklist, ok, warnings = archidekt.parse_decklist(archidekt_id)
+        decklist, ok, warnings = archidekt.parse_decklist(archidekt_id, cache)
     else:
         print(f"Cant find decklist '{decklist_spec}'")
         quit()
@@ -53,6 +58,8 @@ def papersize(string: str) -> np.ndarray:
 
     Supports preconfigured formats (e.g. "a4") and custom formats (e.g. "8.5x11" in inches).
     """
+    import numpy as np
+
     spec = string.lower()
     if spec == "a4":
         return np.array([21, 29.7]) / 2.54
@@ -65,6 +72,13 @@ def papersize(string: str) -> np.ndarray:
 def main() -> None:
     """Run mtg-proxies CLI."""
     parser = argparse.ArgumentParser("mtg-proxies", description="Create high quality MtG proxies from your decklist.")
+    parser.add_argument(
+        "--cache-dir",
+        help="folder to cache downloads in (default: MTG_PROXIES_CACHE_DIR or a temporary folder)",
+        type=Path,
+        default=None,
+        metavar="PATH",
+    )
     subparsers = parser.add_subparsers(dest="command")
 
     # Print tool
@@ -100,7 +114,7 @@ def main() -> None:
     )
     print_parser.add_argument(
         "--border_crop",
-        help="how much to crop inner borders of printed cards, in source image pixels (default: %(default)s)",
+        help="how much to crop inner borders of printed cards, in pixels of a png scan (default: %(default)s)",
         type=int,
         default=14,
         metavar="PIXELS",
@@ -124,6 +138,19 @@ def main() -> None:
         choices=["all", "front", "back"],
         default="all",
     )
+    print_parser.add_argument(
+        "--quality",
+        help="scan variant to use; auto picks the smallest sufficient for --dpi, or png for pdf (default: %(default)s)",
+        choices=["auto", "png", "large", "normal"],
+        default="auto",
+    )
+    print_parser.add_argument(
+        "--workers",
+        help="maximum number of concurrent downloads (default: 8)",
+        type=int,
+        default=None,
+        metavar="N",
+    )
 
     # Convert tool
     convert_parser = subparsers.add_parser(
@@ -171,15 +198,89 @@ def main() -> None:
         metavar="FLOAT",
     )
 
+    # Prefetch tool
+    prefetch_parser = subparsers.add_parser(
+        "prefetch",
+        help="Download scans into the cache ahead of printing",
+        description="Download scans into the cache ahead of printing.",
+    )
+    prefetch_parser.add_argument(
+        "decklist",
+        nargs="*",
+        help="paths to decklists in text/arena format, or manastack:{manastack_id}, or archidekt:{archidekt_id}",
+    )
+    prefetch_parser.add_argument(
+        "--set",
+        help="code of a set to prefetch all scans of, can be repeated",
+        action="append",
+        default=[],
+        metavar="CODE",
+    )
+    prefetch_parser.add_argument("--query", help="Scryfall search query to prefetch the results of", metavar="QUERY")
+    prefetch_parser.add_argument(
+        "--dpi",
+        help="dpi the scans will be printed at with raster formats (png, jpg); omit for pdf",
+        type=int,
+        default=None,
+    )
+    prefetch_parser.add_argument(
+        "--quality",
+        help="scan variant to use; auto picks the smallest sufficient for --dpi, or png for pdf (default: %(default)s)",
+        choices=["auto", "png", "large", "normal"],
+        default="auto",
+    )
+    prefetch_parser.add_argument(
+        "--workers",
+        help="maximum number of concurrent downloads (default: 8)",
+        type=int,
+        default=None,
+        metavar="N",
+    )
+
+    # Cache tool
+    cache_parser = subparsers.add_parser(
+        "cache",
+        help="Show or prune the download cache",
+        description="Show or prune the download cache.",
+    )
+    cache_parser.add_argument("action", choices=["stats", "prune"], help="show cache statistics or prune the cache")
+    cache_parser.add_argument(
+        "--max-size",
+        help="prune down to this size, e.g. 500M or 2G (default: MTG_PROXIES_CACHE_SIZE)",
+        type=str,
+        default=None,
+        metavar="SIZE",
+    )
+    cache_parser.add_argument(
+        "--policy",
+        help="evict least recently or least frequently used files first (default: %(default)s)",
+        choices=["lru", "lfu"],
+        default="lru",
+    )
+    cache_parser.add_argument("--dry-run", action="store_true", help="only list the files that would be removed")
+
     args = parser.parse_args()
+    if args.cache_dir is not None:  # Before the Scryfall interface is imported, which reads it
+        os.environ["MTG_PROXIES_CACHE_DIR"] = str(args.cache_dir)
 
     match args.command:
         case "print":
+            import numpy as np
+
+            from mtg_proxies import fetch_scans_scryfall, print_cards_fpdf, print_cards_matplotlib
+
             # Parse decklist
             decklist = parse_decklist_spec(args.decklist)
 
-            # Fetch scans
-            images = fetch_scans_scryfall(decklist, faces=args.faces)
+            # Fetch scans, pdfs are printed at the resolution of the scans
+            images = fetch_scans_scryfall(
+                decklist,
+                faces=args.faces,
+                max_workers=args.workers,
+                cardsize=np.array([2.5, 3.5]) * args.scale,
+                dpi=None if args.outfile.endswith(".pdf") else args.dpi,
+                quality=args.quality,
+            )
 
             # Plot cards
             if args.outfile.endswith(".pdf"):
@@ -219,6 +320,8 @@ def main() -> None:
             print(f"Successfully wrote decklist to {args.outfile.resolve()}.")
 
         case "tokens":
+            from mtg_proxies.tokens import get_tokens
+
             # Parse decklist
             decklist = parse_decklist_spec(args.decklist, warn_levels=["ERROR", "WARNING"])
 
@@ -239,8 +342,47 @@ def main() -> None:
             print(f"Successfully appended tokens to {Path(out_file).resolve()}.")
 
         case "deck_value":
+            from mtg_proxies.deck_value import show_deck_value
+
             # Parse decklist
             decklist = parse_decklist_spec(args.decklist, warn_levels=["ERROR", "WARNING"])
 
             # Show deck value decomposition
             show_deck_value(decklist, lump_threshold=args.lump_threshold)
+
+        case "prefetch":
+            from mtg_proxies.prefetch import prefetch
+            from mtg_proxies.scryfall.cache import format_size
+
+            if len(args.decklist) == 0 and len(args.set) == 0 and args.query is None:
+                prefetch_parser.error("nothing to prefetch, specify decklists, --set or --query")
+
+            decklists = [parse_decklist_spec(spec, warn_levels=["ERROR"]) for spec in args.decklist]
+            stats = prefetch(
+                decklists, args.set, args.query, max_workers=args.workers, dpi=args.dpi, quality=args.quality
+            )
+
+            print(
+                f"Downloaded {stats.downloaded} scans ({format_size(stats.bytes)}), "
+                f"skipped {stats.skipped} already cached, {stats.failed} failed."
+            )
+            if stats.failed > 0:
+                print("Run the same command again to retry the failed scans.")
+
+        case "cache":
+            from mtg_proxies import scryfall
+            from mtg_proxies.scryfall.cache import format_size, parse_size
+
+            if args.action == "prune":
+                max_bytes = parse_size(args.max_size) if args.max_size is not None else None
+                removed = scryfall.prune_cache(max_bytes, args.policy, dry_run=args.dry_run)
+                for entry in removed:
+                    print(
+                        f"{'Would remove' if args.dry_run else 'Removed'} {entry.path.name} ({format_size(entry.size)})"
+                    )
+                print(f"Freed {format_size(sum(entry.size for entry in removed))} in {len(removed)} files.")
+
+            stats = scryfall.cache_stats()
+            budget = format_size(stats.max_bytes) if stats.max_bytes is not None else "unlimited"
+            print(f"Cache: {stats.files} files, {format_size(stats.bytes)} (budget: {budget})")
+            print(f"Pinned bulk data: {stats.pinned_files} files, {format_size(stats.pinned_bytes)}")
@@ -1,6 +1,7 @@
 from operator import itemgetter
 
 import matplotlib.pyplot as plt
+import numpy as np
 
 from mtg_proxies import scryfall
 from mtg_proxies.decklists.decklist import Decklist
@@ -10,10 +11,10 @@ def show_deck_value(decklist: Decklist, lump_threshold: float = 0.03) -> None:
     """Show deck value decomposition."""
     # Fetch prices
     card_prices = []
-    for card in decklist.cards:
-        price = scryfall.get_price(card["oracle_id"])
-        if price is not None:
-            card_prices.append((card["name"], card.count * price))
+    prices = scryfall.get_prices([card["oracle_id"] for card in decklist.cards])
+    for card, price in zip(decklist.cards, prices):
+        if not np.isnan(price):
+            card_prices.append((card["name"], card.count * float(price)))
         else:
             print(f"WARNING: Unable to find price for {card['name']}")
 
@@ -1,6 +1,13 @@
 from mtg_proxies.decklists.cleaning import merge_duplicates
 from mtg_proxies.decklists.decklist import Card, Comment, Decklist, DecklistEntry, parse_decklist, parse_decklist_stream
-from mtg_proxies.decklists.sanitizing import ParseWarning, get_print_warnings, validate_card_name, validate_print
+from mtg_proxies.decklists.sanitizing import (
+    ParseWarning,
+    ValidationCache,
+    get_print_warnings,
+    validate_card_name,
+    validate_cards,
+    validate_print,
+)
 
 __all__ = [
     "Card",
@@ -8,10 +15,12 @@ __all__ = [
     "Decklist",
     "DecklistEntry",
     "ParseWarning",
+    "ValidationCache",
     "get_print_warnings",
     "merge_duplicates",
     "parse_decklist",
     "parse_decklist_stream",
     "validate_card_name",
+    "validate_cards",
     "validate_print",
 ]
@@ -3,15 +3,18 @@ from __future__ import annotations
 import requests
 
 from mtg_proxies.decklists import Decklist, ParseWarning
-from mtg_proxies.decklists.sanitizing import validate_card_name, validate_print
+from mtg_proxies.decklists.sanitizing import ValidationCache, validate_cards
 
 
-def parse_decklist(archidekt_id: str) -> tuple[Decklist, bool, list[ParseWarning]]:
+def parse_decklist(
+    archidekt_id: str, cache: ValidationCache | None = None
+) -> tuple[Decklist, bool, list[ParseWarning]]:
     """Parse a decklist from manastack.
 
     Args:
         archidekt_id: Deck list id as shown in the deckbuilder URL
         zones: List of zones to include. Available are: `mainboard`, `commander`, `sideboard` and `maybeboard`
+        cache: Validation results to share with other decklists, see `validate_cards`
     """
     decklist = Decklist()
     warnings = []
@@ -25,28 +28,24 @@ def parse_decklist(archidekt_id: str) -> tuple[Decklist, bool, list[ParseWarning
 
     in_deck = {cat["name"] for cat in data["categories"] if cat["includedInDeck"]}
 
-    for item in data["cards"]:
-        # Extract relevant data
-        count = item["quantity"]
-        raw_card_name = item["card"]["oracleCard"]["name"]
-        set_id = item["card"]["edition"]["editioncode"]
-        collector_number = item["card"]["collectorNumber"]
-        if item["categories"] is not None and len(item["categories"]) > 0 and item["categories"][0] not in in_deck:
-            continue
-
-        # Validate card name
-        card_name, warnings_name = validate_card_name(raw_card_name)
-        if card_name is None:
-            decklist.append_comment(raw_card_name)
-            warnings.extend(warnings_name)
+    items = [
+        item
+        for item in data["cards"]
+        if item["categories"] is None or len(item["categories"]) == 0 or item["categories"][0] in in_deck
+    ]
+
+    # Validate all cards at once
+    entries = [
+        (item["card"]["oracleCard"]["name"], item["card"]["edition"]["editioncode"], item["card"]["collectorNumber"])
+        for item in items
+    ]
+    for item, (card, card_warnings) in zip(items, validate_cards(entries, cache)):
+        warnings.extend(card_warnings)
+        if card is None:  # Invalid card name
+            decklist.append_comment(item["card"]["oracleCard"]["name"])
             ok = False
-            continue
-
-        # Validate card print
-        card, warnings_print = validate_print(card_name, set_id, collector_number)
-
-        decklist.append_card(count, card)
-        warnings.extend(warnings_name + warnings_print)
+        else:
+            decklist.append_card(item["quantity"], card)
 
     decklist.name = data["name"]
 
@@ -3,12 +3,13 @@ from __future__ import annotations
 import os
 import re
 from collections import Counter
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal, TextIO
 
 import mtg_proxies.scryfall as scryfall
-from mtg_proxies.decklists.sanitizing import ParseWarning, validate_card_name, validate_print
+from mtg_proxies.decklists.sanitizing import ParseWarning, ValidationCache, validate_cards
 
 
 @dataclass(slots=True)
@@ -19,7 +20,7 @@ class Card:
     """
 
     count: int
-    card: dict[str, Any]
+    card: Mapping[str, Any]
 
     def __getitem__(self, key: str) -> Any:  # noqa: ANN401
         return self.card[key]
@@ -66,7 +67,7 @@ class Decklist:
     entries: list[DecklistEntry] = field(default_factory=list)
     name: str | None = None
 
-    def append_card(self, count: int, card: dict) -> None:
+    def append_card(self, count: int, card: Mapping[str, Any]) -> None:
         """Append a card line to this decklist."""
         self.entries.append(Card(count, card))
 
@@ -116,7 +117,9 @@ class Decklist:
         return decklist
 
 
-def parse_decklist(filepath: str | Path) -> tuple[Decklist, bool, list[ParseWarning]]:
+def parse_decklist(
+    filepath: str | Path, cache: ValidationCache | None = None
+) -> tuple[Decklist, bool, list[ParseWarning]]:
     """Parse card information from a decklist in text or MtG Arena (or mixed) format.
 
     E.g.:
@@ -127,13 +130,17 @@ def parse_decklist(filepath: str | Path) -> tuple[Decklist, bool, list[ParseWarn
 
     Maintains comments. If decklist is in text format, set and collector_number entries will be `None`.
 
+    Args:
+        filepath: Path of the decklist file
+        cache: Validation results to share with other decklists, see `validate_cards`
+
     Returns:
         decklist: Decklist object
         ok: whether all cards could be found
         warnings: List of warnings and error encountered during parsing
     """
     with open(filepath, encoding="utf-8") as f:
-        decklist, ok, warnings = parse_decklist_stream(f)
+        decklist, ok, warnings = parse_decklist_stream(f, cache)
 
     # Use file name without extension as name
     decklist.name = Path(filepath).stem
@@ -141,37 +148,40 @@ def parse_decklist(filepath: str | Path) -> tuple[Decklist, bool, list[ParseWarn
     return decklist, ok, warnings
 
 
-def parse_decklist_stream(stream: TextIO) -> tuple[Decklist, bool, list[ParseWarning]]:
+def parse_decklist_stream(
+    stream: TextIO, cache: ValidationCache | None = None
+) -> tuple[Decklist, bool, list[ParseWarning]]:
     """Parse card information from a decklist in text or MtG Arena (or mixed) format from a stream.
 
     See:
         parse_decklist
     """
+    lines = [line.rstrip() for line in stream]
+
+    # Extract relevant data of card lines, other lines are comments
+    cards: dict[int, tuple[int, str, str | None, str | None]] = {}
+    for i, line in enumerate(lines):
+        m = re.search(r"([0-9]+)x?\s+(.+?)(?:\s+\((\S*)\)\s+(\S+))?\s*$", line)
+        if m:
+            # Count, card name, set id and collector number. The latter two may be None
+            cards[i] = (int(m.group(1)), m.group(2), m.group(3), m.group(4))
+
+    # Validate all cards at once
+    validated = dict(zip(cards, validate_cards([entry[1:] for entry in cards.values()], cache)))
+
     decklist = Decklist()
     warnings = []
     ok = True
-    for line in stream:
-        m = re.search(r"([0-9]+)x?\s+(.+?)(?:\s+\((\S*)\)\s+(\S+))?\s*$", line)
-        if m:
-            # Extract relevant data
-            count = int(m.group(1))
-            card_name = m.group(2)
-            set_id = m.group(3)  # May be None
-            collector_number = m.group(4)  # May be None
-
-            # Validate card name
-            card_name, warnings_name = validate_card_name(card_name)
-            if card_name is None:
-                decklist.append_comment(line.rstrip())
-                warnings.extend(warnings_name)
-                ok = False
-                continue
-
-            # Validate card print
-            card, warnings_print = validate_print(card_name, set_id, collector_number)
-
-            decklist.append_card(count, card)
-            warnings.extend(warnings_name + warnings_print)
+    for i, line in enumerate(lines):
+        if i not in cards:
+            decklist.append_comment(line)
+            continue
+
+        card, card_warnings = validated[i]
+        warnings.extend(card_warnings)
+        if card is None:  # Invalid card name
+            decklist.append_comment(line)
+            ok = False
         else:
-            decklist.append_comment(line.rstrip())
+            decklist.append_card(cards[i][0], card)
     return decklist, ok, warnings
@@ -5,17 +5,18 @@ from collections.abc import Sequence
 import requests
 
 from mtg_proxies.decklists import Decklist, ParseWarning
-from mtg_proxies.decklists.sanitizing import validate_card_name, validate_print
+from mtg_proxies.decklists.sanitizing import ValidationCache, validate_cards
 
 
 def parse_decklist(
-    manastack_id: str, zones: Sequence[str] = ("commander", "mainboard")
+    manastack_id: str, zones: Sequence[str] = ("commander", "mainboard"), cache: ValidationCache | None = None
 ) -> tuple[Decklist, bool, list[ParseWarning]]:
     """Parse a decklist from manastack.
 
     Args:
         manastack_id: Deck list id as shown in the deckbuilder URL
         zones: List of zones to include. Available are: `mainboard`, `commander`, `sideboard` and `maybeboard`
+        cache: Validation results to share with other decklists, see `validate_cards`
     """
     decklist = Decklist()
     warnings = []
@@ -26,29 +27,26 @@ def parse_decklist(
         raise (ValueError(f"Manastack returned statuscode {r.status_code}"))
 
     data = r.json()
+
+    # Validate the cards of all zones at once
+    entries = [
+        (item["card"]["name"], item["card"]["set"]["slug"], item["card"]["num"])
+        for zone in zones
+        for item in data["list"][zone]
+    ]
+    validated = iter(validate_cards(entries, cache))
+
     for zone in zones:
         if len(data["list"][zone]) > 0:
             decklist.append_comment(zone.capitalize())
             for item in data["list"][zone]:
-                # Extract relevant data
-                count = item["count"]
-                raw_card_name = item["card"]["name"]
-                set_id = item["card"]["set"]["slug"]
-                collector_number = item["card"]["num"]
-
-                # Validate card name
-                card_name, warnings_name = validate_card_name(raw_card_name)
-                if card_name is None:
-                    decklist.append_comment(raw_card_name)
-                    warnings.extend(warnings_name)
+                card, card_warnings = next(validated)
+                warnings.extend(card_warnings)
+                if card is None:  # Invalid card name
+                    decklist.append_comment(item["card"]["name"])
                     ok = False
-                    continue
-
-                # Validate card print
-                card, warnings_print = validate_print(card_name, set_id, collector_number)
-
-                decklist.append_card(count, card)
-                warnings.extend(warnings_name + warnings_print)
+                else:
+                    decklist.append_card(item["count"], card)
 
             if zone != zones[-1]:
                 decklist.append_comment("")
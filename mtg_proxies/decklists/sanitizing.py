@@ -1,9 +1,12 @@
-from dataclasses import dataclass
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
 from functools import cache
-from typing import Literal
+from typing import Any, Literal
 
 import mtg_proxies.scryfall as scryfall
 from mtg_proxies.format import format_print, format_token, listing
+from mtg_proxies.scryfall.bulk import CardDiff
+from mtg_proxies.scryfall.name_index import NameIndex
 
 
 @dataclass(slots=True)
@@ -23,18 +26,36 @@ def card_names() -> tuple[dict[str, str], dict[str, str]]:
 
     Cached for performance.
     """
-    cards_by_name = {
-        card["name"].lower(): card["name"] for card in scryfall.get_cards() if card["layout"] != "art_series"
-    }
+    cards_by_name = {name.lower(): name for name in scryfall.get_card_names()}
     double_faced_by_front = {
         name.split("//")[0].strip().lower(): name for name in cards_by_name.values() if "//" in name
     }
     return cards_by_name, double_faced_by_front
 
 
-def validate_card_name(card_name: str) -> tuple[str | None, list[ParseWarning]]:
+@cache
+def name_index() -> NameIndex:
+    """Return index for partial matching of lower case card names.
+
+    Cached for performance.
+    """
+    cards_by_name, _ = card_names()
+    return NameIndex(list(cards_by_name))
+
+
+@scryfall.on_refresh
+def _clear_card_names(database_name: str, diff: CardDiff | None) -> None:
+    card_names.cache_clear()
+    name_index.cache_clear()
+
+
+def validate_card_name(card_name: str, *, suggest: bool = False) -> tuple[str | None, list[ParseWarning]]:
     """Validate card name against the Scryfall database.
 
+    Args:
+        card_name: Card name to validate
+        suggest: If no card name matches partially, suggest the closest card names in the warning
+
     Returns:
         card_name: valid card name.
         warnings: list of (level, message) warnings.
@@ -55,9 +76,7 @@ def validate_card_name(card_name: str) -> tuple[str | None, list[ParseWarning]]:
         )
     else:  # No exact match
         # Try partial matching
-        candidates = [
-            cards_by_name[name] for name in cards_by_name if all(elem in name for elem in sanizized_name.split(" "))
-        ]
+        candidates = [cards_by_name[name] for name in name_index().containing(sanizized_name.split(" "))]
 
         if len(candidates) == 1:  # Found unique candidate
             validated_name = candidates[0]
@@ -65,7 +84,14 @@ def validate_card_name(card_name: str) -> tuple[str | None, list[ParseWarning]]:
                 ParseWarning("WARNING", f"Misspelled card name {card_name!r}. Assuming you mean {validated_name!r}.")
             )
         elif len(candidates) == 0:  # No matching card
-            warnings.append(ParseWarning("ERROR", f"Unable to find card {card_name!r}."))
+            closest = [cards_by_name[name] for name in name_index().closest(sanizized_name)] if suggest else []
+            if len(closest) > 0:
+                alternatives = listing([repr(card) for card in closest], ", ", " or ")
+                warnings.append(
+                    ParseWarning("ERROR", f"Unable to find card {card_name!r}. Did you mean {alternatives}?")
+                )
+            else:
+                warnings.append(ParseWarning("ERROR", f"Unable to find card {card_name!r}."))
         else:  # Multiple matching cards
             alternatives = listing([repr(card) for card in candidates], ", ", " or ", 6)
             warnings.append(ParseWarning("ERROR", f"Unable to find card {card_name!r}. Did you mean {alternatives}?"))
@@ -73,7 +99,7 @@ def validate_card_name(card_name: str) -> tuple[str | None, list[ParseWarning]]:
     return validated_name, warnings
 
 
-def get_print_warnings(card: dict) -> list[str]:
+def get_print_warnings(card: Mapping[str, Any]) -> list[str]:
     """Return warnings for low-resolution scans."""
     warnings = []
     if not card["highres_image"] or card["digital"]:
@@ -87,7 +113,7 @@ def get_print_warnings(card: dict) -> list[str]:
     return warnings
 
 
-def validate_print(card_name: str, set_id: str, collector_number: str) -> tuple[dict, list[ParseWarning]]:
+def validate_print(card_name: str, set_id: str, collector_number: str) -> tuple[Mapping[str, Any], list[ParseWarning]]:
     """Validate a print against the Scryfall database.
 
     Assumes card name is valid.
@@ -137,3 +163,53 @@ def validate_print(card_name: str, set_id: str, collector_number: str) -> tuple[
             )
         )
     return card, warnings
+
+
+@dataclass(slots=True)
+class ValidationCache:
+    """Results of `validate_card_name` and `validate_print` by their arguments.
+
+    Pass the same cache to several calls of `validate_cards` to share results across decklists.
+    Set `suggest` to name the closest cards when a card name doesn't match at all, see `validate_card_name`.
+    """
+
+    suggest: bool = False
+    names: dict[str, tuple[str | None, list[ParseWarning]]] = field(default_factory=dict)
+    prints: dict[tuple[str, str | None, str | None], tuple[Mapping[str, Any], list[ParseWarning]]] = field(
+        default_factory=dict
+    )
+
+
+def validate_cards(
+    entries: Iterable[tuple[str, str | None, str | None]], cache: ValidationCache | None = None
+) -> list[tuple[Mapping[str, Any] | None, list[ParseWarning]]]:
+    """Validate card names and prints of many decklist entries at once.
+
+    Each distinct card name and print is only validated once, repeated entries reuse the result.
+
+    Args:
+        entries: Card name, set id and collector number of each entry. Set id and collector number may be `None`.
+        cache: Results of previous validations to reuse. New results are added to it. Also controls whether
+            invalid card names get suggestions.
+
+    Returns:
+        For each entry, the valid Scryfall card object, or `None` if the card name is invalid, and its warnings.
+    """
+    if cache is None:
+        cache = ValidationCache()
+
+    results: list[tuple[Mapping[str, Any] | None, list[ParseWarning]]] = []
+    for card_name, set_id, collector_number in entries:
+        if card_name not in cache.names:
+            cache.names[card_name] = validate_card_name(card_name, suggest=cache.suggest)
+        validated_name, warnings_name = cache.names[card_name]
+        if validated_name is None:
+            results.append((None, list(warnings_name)))
+            continue
+
+        key = (validated_name, set_id, collector_number)
+        if key not in cache.prints:
+            cache.prints[key] = validate_print(*key)
+        card, warnings_print = cache.prints[key]
+        results.append((card, warnings_name + warnings_print))
+    return results
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+from typing import Any
 
-def format_print(card_name: str | dict, set_id: str | None = None, collector_number: str | None = None) -> str:
+
+def format_print(
+    card_name: str | Mapping[str, Any], set_id: str | None = None, collector_number: str | None = None
+) -> str:
     """Format a card into a human-readable string."""
     if "name" in card_name:
         card_name, set_id, collector_number = card_name["name"], card_name["set"], card_name["collector_number"]
@@ -38,7 +43,7 @@ def listing(items: list[str], sep: str, final_sep: str, max_items: int | None =
     return sep.join([*items[:max_items], "..."])
 
 
-def format_token(card: dict) -> str:
+def format_token(card: Mapping[str, Any]) -> str:
     """Format a token card into a human-readable string."""
     # Double faced cards
     if "colors" not in card:
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from mtg_proxies import scryfall
+from mtg_proxies.decklists import Decklist
+from mtg_proxies.scans import Quality, select_image_variant
+
+
+def _image_uris(cards: Iterable[Mapping[str, Any]], variant: str) -> list[str]:
+    """Image uris of all faces of some cards. Cards without images are ignored."""
+    image_uris = []
+    for card in cards:
+        try:
+            image_uris += [face["image_uris"][variant] for face in scryfall.get_faces(card)]
+        except ValueError:  # No images, e.g. some art series cards
+            continue
+    return image_uris
+
+
+def prefetch(
+    decklists: Iterable[Decklist] = (),
+    sets: Iterable[str] = (),
+    query: str | None = None,
+    *,
+    max_workers: int | None = None,
+    cardsize: Sequence[float] = (2.5, 3.5),
+    dpi: float | None = None,
+    quality: Quality = "auto",
+    silent: bool = False,
+) -> scryfall.PrefetchStats:
+    """Download the scans of decklists, whole sets or search results into the cache.
+
+    Printing them later doesn't have to wait for downloads, if the scans are prefetched in the same variant, see
+    `fetch_scans_scryfall`. Scans that are cached already are skipped, so an interrupted prefetch can be resumed by
+    running it again.
+
+    Args:
+        decklists: Decklists to fetch scans for
+        sets: Codes of sets to fetch all scans of
+        query: Scryfall search query to fetch the scans of all results of
+        max_workers: Maximum number of concurrent downloads, see `scryfall.get_images`
+        cardsize: Size of a printed card in inches
+        dpi: Resolution of the output. If unknown, the largest variant is used.
+        quality: Image variant to use regardless of the resolution ("png", "large", "normal"), or "auto"
+        silent: Don't show a progress bar
+
+    Returns:
+        Counts of skipped, downloaded and failed scans
+    """
+    variant = select_image_variant(cardsize, dpi, quality)
+    image_uris = [image_uri for decklist in decklists for image_uri in _image_uris(decklist.cards, variant)]
+    for set_code in sets:
+        image_uris += _image_uris(scryfall.get_cards(set=set_code), variant)
+    if query is not None:
+        image_uris += _image_uris(scryfall.iter_search(query), variant)
+
+    return scryfall.prefetch_images(image_uris, max_workers=max_workers, desc="Prefetching artwork", silent=silent)
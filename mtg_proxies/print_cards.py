@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from functools import lru_cache
 from pathlib import Path
 
 import matplotlib.pyplot as plt
@@ -11,7 +12,45 @@ from tqdm import tqdm
 
 from mtg_proxies.plotting import SplitPages
 
-image_size = np.array([745, 1040])
+image_size = np.array([745, 1040])  # Reference size of scans. Crops are in its pixels, other sizes are scaled.
+IMAGE_CACHE_SIZE = 16  # Number of decoded scans kept in memory while plotting, more than a sheet holds
+
+
+def _crop(img: np.ndarray, left: int, top: int) -> np.ndarray:
+    """Crop an image from the left and top, in pixels of the reference size."""
+    scale = np.array(img.shape[1::-1]) / image_size
+    return img[round(top * scale[1]) :, round(left * scale[0]) :]
+
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def _decode_image(path: str) -> np.ndarray:
+    """Decode an image file to an uint8 bitmap.
+
+    PNGs are decoded by matplotlib as floats in [0, 1], which take four times the memory.
+    """
+    img = plt.imread(path)
+    if img.dtype != np.uint8:
+        img = np.round(img * 255).astype(np.uint8)
+    img.flags.writeable = False  # Shared between all copies of a card
+    return img
+
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def _load_image(path: str | Path, left: int = 0, top: int = 0) -> np.ndarray:
+    """Load a scan as an uint8 bitmap, cropped from the left and top.
+
+    Decoded images are kept in a bounded LRU cache, so repeated cards are only decoded once.
+    The crop is a view into the decoded image, so different crops of a scan share its memory.
+
+    Args:
+        path: Image file
+        left: Pixels to crop from the left, in pixels of a png scan
+        top: Pixels to crop from the top, in pixels of a png scan
+
+    Returns:
+        Read-only bitmap of shape (height, width, channels)
+    """
+    return _crop(_decode_image(str(path)), left, top)
 
 
 def _occupied_space(cardsize: np.ndarray, pos: np.ndarray, border_crop: int, closed: bool = False) -> np.ndarray:
@@ -30,12 +69,14 @@ def print_cards_matplotlib(
 ) -> None:
     """Print a list of cards to a pdf file.
 
+    Repeated image files are decoded only once, see `_load_image`.
+
     Args:
         images: List of image files
         filepath: Name of the pdf file
         papersize: Size of the paper in inches. Defaults to A4.
         cardsize: Size of a card in inches.
-        border_crop: How many pixel to crop from the border of each card.
+        border_crop: How many pixel to crop from the border of each card, in pixels of a png scan.
         interpolation: Interpolation method for resizing images.
         dpi: Dots per inch for the output PDF.
         background_color: Background color of the PDF as name or hex code.
@@ -65,13 +106,11 @@ def print_cards_matplotlib(
             for y in range(N[1]):
                 for x in range(N[0]):
                     if idx < len(images):
-                        img = plt.imread(images[idx])
-                        idx += 1
-
                         # Crop left and top if not on border of sheet
                         left = border_crop if x > 0 else 0
                         top = border_crop if y > 0 else 0
-                        img = img[top:, left:]
+                        img = _load_image(images[idx], left, top)
+                        idx += 1
 
                         # Compute extent
                         lower = (offset + _occupied_space(cardsize, np.array([x, y]), border_crop)) / papersize
@@ -116,7 +155,7 @@ def print_cards_fpdf(
         filepath: Name of the pdf file
         papersize: Size of the paper in inches. Defaults to A4.
         cardsize: Size of a card in inches.
-        border_crop: How many pixel to crop from the border of each card.
+        border_crop: How many pixel to crop from the border of each card, in pixels of a png scan.
         background_color: Background color of the PDF as an RGB tuple.
         cropmarks: Whether to add crop marks to the PDF.
     """
@@ -157,7 +196,7 @@ def print_cards_fpdf(
             cropped_image = str(path.parent / (path.stem + f"_{left}_{top}" + path.suffix))
             if not Path(cropped_image).is_file():
                 # Crop image
-                plt.imsave(cropped_image, plt.imread(image)[top:, left:])
+                plt.imsave(cropped_image, _load_image(image, left, top))
 
         # Compute extent
         lower = offset + _occupied_space(cardsize, np.array([x, y]), border_crop)
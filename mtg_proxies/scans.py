@@ -1,27 +1,73 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from typing import Literal
 
-from tqdm import tqdm
-
 import mtg_proxies.scryfall as scryfall
 from mtg_proxies.decklists.decklist import Decklist
 
+# Pixel sizes of the image variants provided by Scryfall, from largest to smallest
+IMAGE_VARIANTS = {
+    "png": (745, 1040),
+    "large": (672, 936),
+    "normal": (488, 680),
+}
+
+type Quality = Literal["auto", "png", "large", "normal"]
+
+
+def select_image_variant(cardsize: Sequence[float], dpi: float | None, quality: Quality = "auto") -> str:
+    """Choose the smallest image variant, that has enough pixels to print cards at a resolution.
+
+    Args:
+        cardsize: Size of a printed card in inches
+        dpi: Resolution of the output. If unknown, the largest variant is used.
+        quality: Image variant to use regardless of the resolution, or `auto`
+
+    Returns:
+        Key of the variant in the `image_uris` of a card
+    """
+    if quality != "auto":
+        return quality
+    if dpi is None:
+        return "png"
+    required = (cardsize[0] * dpi, cardsize[1] * dpi)
+    sufficient = [
+        variant for variant, size in IMAGE_VARIANTS.items() if size[0] >= required[0] and size[1] >= required[1]
+    ]
+    return sufficient[-1] if len(sufficient) > 0 else "png"
+
 
-def fetch_scans_scryfall(decklist: Decklist, faces: Literal["all", "front", "back"] = "all") -> list[str]:
+def fetch_scans_scryfall(
+    decklist: Decklist,
+    faces: Literal["all", "front", "back"] = "all",
+    max_workers: int | None = None,
+    *,
+    cardsize: Sequence[float] = (2.5, 3.5),
+    dpi: float | None = None,
+    quality: Quality = "auto",
+) -> list[str]:
     """Search Scryfall for scans of a decklist.
 
+    Scans are downloaded concurrently, in the smallest variant sufficient for the output resolution.
+
     Args:
         decklist: The decklist to fetch scans for
         faces: Which faces to fetch ("all", "front", "back")
+        max_workers: Maximum number of concurrent downloads, see `scryfall.get_images`
+        cardsize: Size of a printed card in inches
+        dpi: Resolution of the output. If unknown, the largest variant is used.
+        quality: Image variant to use regardless of the resolution ("png", "large", "normal"), or "auto"
 
     Returns:
         List: List of image files
     """
-    return [
-        scan
-        for card in tqdm(decklist.cards, desc="Fetching artwork")
+    variant = select_image_variant(cardsize, dpi, quality)
+    image_uris = [
+        image_uri[variant]
+        for card in decklist.cards
         for i, image_uri in enumerate(card.image_uris)
-        for scan in [scryfall.get_image(image_uri["png"], silent=True)] * card.count
+        for _ in range(card.count)
         if faces == "all" or (faces == "front" and i == 0) or (faces == "back" and i > 0)
     ]
+    return scryfall.get_images(image_uris, max_workers=max_workers, desc="Fetching artwork")
@@ -1,27 +1,60 @@
+from mtg_proxies.scryfall.aio import adepaginate, afetch_scans, aget_image, aget_images
+from mtg_proxies.scryfall.bulk import CardDiff
+from mtg_proxies.scryfall.card import CardView
 from mtg_proxies.scryfall.scryfall import (
+    PrefetchStats,
+    cache_stats,
     canonic_card_name,
     card_by_id,
     cards_by_oracle_id,
     get_card,
+    get_card_names,
     get_cards,
     get_faces,
     get_image,
+    get_images,
     get_price,
+    get_prices,
+    get_related_tokens,
+    iter_search,
+    on_refresh,
     oracle_ids_by_name,
+    prefetch_images,
+    prune_cache,
     recommend_print,
+    recommend_prints,
+    refresh_database,
     search,
 )
 
 __all__ = [
+    "CardDiff",
+    "CardView",
+    "PrefetchStats",
+    "adepaginate",
+    "afetch_scans",
+    "aget_image",
+    "aget_images",
+    "cache_stats",
     "canonic_card_name",
     "card_by_id",
     "cards_by_oracle_id",
     "get_card",
+    "get_card_names",
     "get_cards",
     "get_faces",
     "get_image",
+    "get_images",
     "get_price",
+    "get_prices",
+    "get_related_tokens",
+    "iter_search",
+    "on_refresh",
     "oracle_ids_by_name",
+    "prefetch_images",
+    "prune_cache",
     "recommend_print",
+    "recommend_prints",
+    "refresh_database",
     "search",
 ]
@@ -0,0 +1,262 @@
+"""Asynchronous counterparts of the Scryfall downloads.
+
+Share the cache and the rate limit of the synchronous interface, but never block the event loop while waiting for
+the network. Requires `httpx`, which is installed with the `async` extra: `pip install mtg-proxies[async]`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Sequence
+from contextlib import asynccontextmanager
+from importlib.metadata import version
+from pathlib import Path
+from types import ModuleType
+from typing import IO, TYPE_CHECKING, Literal
+
+from mtg_proxies.scryfall import scryfall
+from mtg_proxies.scryfall.file_lock import FileLock
+from mtg_proxies.scryfall.partial_download import PartialDownload
+
+if TYPE_CHECKING:
+    import httpx
+
+    from mtg_proxies.decklists.decklist import Decklist
+    from mtg_proxies.scans import Quality
+
+MAX_CONCURRENCY = 32  # Default number of concurrent downloads
+WRITE_SIZE = 1024 * 1024  # Bytes to collect before writing them to a file in a thread
+
+_in_flight: dict[str, asyncio.Task[Path]] = {}
+
+
+def _httpx() -> ModuleType:
+    try:
+        import httpx
+    except ImportError as e:
+        raise ImportError("The async interface requires httpx, install mtg-proxies[async]") from e
+    return httpx
+
+
+@asynccontextmanager
+async def _client(client: httpx.AsyncClient | None) -> AsyncIterator[httpx.AsyncClient]:
+    """Use the given client, or a new one for the duration of the context."""
+    if client is not None:
+        yield client
+        return
+
+    httpx = _httpx()
+    async with httpx.AsyncClient(
+        headers={"User-Agent": f"mtg-proxies/{version('mtg-proxies')}", "Accept": "*/*"},
+        limits=httpx.Limits(max_connections=MAX_CONCURRENCY),
+        follow_redirects=True,
+    ) as client:
+        yield client
+
+
+async def aget_image(image_uri: str, *, client: httpx.AsyncClient | None = None) -> str:
+    """Download card artwork and return the path to a local copy.
+
+    Async version of `get_image`.
+
+    Args:
+        image_uri: Uri of the image
+        client: Client to use for the download. By default, a new one is created.
+
+    Returns:
+        string: Path to local file.
+    """
+    return await aget_file(image_uri, client=client)
+
+
+async def aget_file(url: str, *, client: httpx.AsyncClient | None = None) -> str:
+    """Download a file and return the path to a local copy.
+
+    Async version of `get_file`. Concurrent requests for the same file share a single download.
+
+    Returns:
+        string: Path to local file.
+    """
+    file_path = await asyncio.to_thread(scryfall.cached_file, url, verify=True)
+    if file_path is None:  # Not cached
+        task = _in_flight.get(url)
+        if task is None:
+            task = _in_flight[url] = asyncio.create_task(_aget_file(url, client))
+            task.add_done_callback(lambda _: _in_flight.pop(url, None))
+        file_path = await asyncio.shield(task)  # Don't cancel the download for other waiters
+
+    await asyncio.to_thread(scryfall.record_access, file_path)
+    return str(file_path)
+
+
+async def _aget_file(url: str, client: httpx.AsyncClient | None) -> Path:
+    path = await asyncio.to_thread(scryfall.download_path, url)
+    async with FileLock(path):  # Other threads and processes may download the same file
+        file_path = await asyncio.to_thread(scryfall.cached_file, url, verify=True)
+        if file_path is None:
+            async with scryfall.rate_limit(url):
+                await adownload(url, path, client=client)
+            file_path = await asyncio.to_thread(scryfall.commit_download, url, path)
+    return file_path
+
+
+async def adownload(
+    url: str,
+    dst: Path | str,
+    *,
+    client: httpx.AsyncClient | None = None,
+    size: int | None = None,
+    retries: int = scryfall.DOWNLOAD_RETRIES,
+    backoff: float = 1.0,
+) -> None:
+    """Download a file.
+
+    Async version of `download`, which continues interrupted downloads the same way. Files are written in a thread,
+    so the event loop is never blocked.
+
+    Args:
+        url: Url of the file
+        dst: Path to save the file to
+        client: Client to use for the download. By default, a new one is created.
+        size: Expected size of the file in bytes, which is verified after the download
+        retries: Number of times to retry a failed download
+        backoff: Seconds to wait before the first retry, doubling with every further retry
+    """
+    httpx = _httpx()
+    partial = PartialDownload(url, dst, size)
+    async with _client(client) as client:
+        for attempt in range(retries + 1):
+            try:
+                await _adownload_part(client, partial)
+                break
+            except (httpx.TransportError, ValueError):
+                if attempt == retries:
+                    raise
+            except httpx.HTTPStatusError as e:
+                if attempt == retries or e.response.status_code < 500:  # Client errors don't go away by retrying
+                    raise
+            await asyncio.sleep(backoff * 2**attempt)
+    await asyncio.to_thread(partial.finish)
+
+
+async def _adownload_part(client: httpx.AsyncClient, partial: PartialDownload) -> None:
+    """Download the rest of a partially downloaded file."""
+    headers = await asyncio.to_thread(partial.headers)
+    async with client.stream("GET", partial.url, headers=headers, timeout=scryfall.DOWNLOAD_TIMEOUT) as response:
+        if partial.is_complete(response.status_code, response.headers):
+            return
+        response.raise_for_status()
+        f = await asyncio.to_thread(partial.start, response.status_code, response.headers)
+        buffer = bytearray()
+        try:
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+                if len(buffer) >= WRITE_SIZE:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    buffer.clear()
+        finally:
+            # Keep what arrived so far, the next attempt continues from there
+            await asyncio.to_thread(_write_and_close, f, bytes(buffer))
+    await asyncio.to_thread(partial.verify)
+
+
+def _write_and_close(f: IO[bytes], data: bytes) -> None:
+    with f:
+        f.write(data)
+
+
+async def adepaginate(url: str, *, client: httpx.AsyncClient | None = None, use_cache: bool = True) -> list[dict]:
+    """Depaginates Scryfall search results.
+
+    Async version of `depaginate`. Uses Scryfall API call rate limit.
+
+    Args:
+        url: Url of the first page
+        client: Client to use for the requests. By default, a new one is created.
+        use_cache: Cache the pages and revalidate them with conditional requests
+
+    Returns:
+        list: Concatenation of all `data` entries.
+
+    Raises:
+        ValueError: If Scryfall returns an error, other than `not_found` for searches without results
+    """
+    data = []
+    async with _client(client) as client:
+        while url is not None:
+            if use_cache:
+                response = await scryfall.response_cache().aget_json(url, client, scryfall.scryfall_rate_limiter)
+            else:
+                async with scryfall.scryfall_rate_limiter:
+                    response = (await client.get(url)).json()
+            page, url = scryfall.parse_page(url, response)
+            data += page
+    return data
+
+
+async def aget_images(
+    image_uris: Iterable[str], *, max_concurrency: int = MAX_CONCURRENCY, client: httpx.AsyncClient | None = None
+) -> list[str]:
+    """Download many card artworks concurrently and return the paths to local copies.
+
+    Async version of `get_images`.
+
+    Args:
+        image_uris: Uris of the images, may contain duplicates
+        max_concurrency: Maximum number of concurrent downloads
+        client: Client to use for the downloads. By default, a new one is created.
+
+    Returns:
+        Path to the local file of each uri, in the same order
+    """
+    image_uris = list(image_uris)
+    unique_uris = list(dict.fromkeys(image_uris))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async with _client(client) as client:
+
+        async def get(image_uri: str) -> str:
+            async with semaphore:
+                return await aget_image(image_uri, client=client)
+
+        paths = dict(zip(unique_uris, await asyncio.gather(*(get(image_uri) for image_uri in unique_uris))))
+    return [paths[image_uri] for image_uri in image_uris]
+
+
+async def afetch_scans(
+    decklist: Decklist,
+    faces: Literal["all", "front", "back"] = "all",
+    *,
+    max_concurrency: int = MAX_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    cardsize: Sequence[float] = (2.5, 3.5),
+    dpi: float | None = None,
+    quality: Quality = "auto",
+) -> list[str]:
+    """Search Scryfall for scans of a decklist.
+
+    Async version of `fetch_scans_scryfall`.
+
+    Args:
+        decklist: The decklist to fetch scans for
+        faces: Which faces to fetch ("all", "front", "back")
+        max_concurrency: Maximum number of concurrent downloads
+        client: Client to use for the downloads. By default, a new one is created.
+        cardsize: Size of a printed card in inches
+        dpi: Resolution of the output. If unknown, the largest variant is used.
+        quality: Image variant to use regardless of the resolution ("png", "large", "normal"), or "auto"
+
+    Returns:
+        List: List of image files
+    """
+    from mtg_proxies.scans import select_image_variant  # Imports this package
+
+    variant = select_image_variant(cardsize, dpi, quality)
+    image_uris = [
+        image_uri[variant]
+        for card in decklist.cards
+        for i, image_uri in enumerate(card.image_uris)
+        for _ in range(card.count)
+        if faces == "all" or (faces == "front" and i == 0) or (faces == "back" and i > 0)
+    ]
+    return await aget_images(image_uris, max_concurrency=max_concurrency, client=client)
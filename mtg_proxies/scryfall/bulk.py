@@ -0,0 +1,131 @@
+"""Bookkeeping of local copies of Scryfall bulk data.
+
+See:
+    https://scryfall.com/docs/api/bulk-data
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from mtg_proxies.scryfall.file_lock import FileLock
+from mtg_proxies.scryfall.store import CardStore
+
+# Parts of encoded card objects, which change daily for most cards: the flat prices object and the popularity ranks
+_VOLATILE = re.compile(rb',?(?:"prices":\s*\{[^{}]*\}|"(?:edhrec_rank|penny_rank)":\s*\d+)')
+
+
+@dataclass(slots=True, frozen=True)
+class BulkFile:
+    """Version of a Scryfall bulk data file."""
+
+    type: str
+    updated_at: str
+    size: int
+    download_uri: str
+
+    @staticmethod
+    def from_bulk_data(bulk_data: dict) -> BulkFile:
+        """Create from a Scryfall bulk data object."""
+        return BulkFile(bulk_data["type"], bulk_data["updated_at"], bulk_data["size"], bulk_data["download_uri"])
+
+    @property
+    def file_name(self) -> str:
+        """Name of the downloaded file. Contains a timestamp, so it changes with every update."""
+        return self.download_uri.split("/")[-1]
+
+    def is_current(self, bulk_data: dict) -> bool:
+        """Check whether this is the version described by a Scryfall bulk data object."""
+        return self.updated_at == bulk_data["updated_at"] and self.size == bulk_data["size"]
+
+
+class BulkManifest:
+    """Persistent record of the bulk data files downloaded so far.
+
+    The manifest is shared by all processes using the cache folder, so updates are merged with the file.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Load a manifest, or start an empty one if the file doesn't exist.
+
+        Args:
+            path: Path of the manifest json file
+        """
+        self.path = Path(path)
+        self.files: dict[str, BulkFile] = self._read()
+
+    def _read(self) -> dict[str, BulkFile]:
+        if not self.path.is_file():
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            return {type_: BulkFile(**entry) for type_, entry in json.load(f).items()}
+
+    def get(self, type_: str) -> BulkFile | None:
+        """Get the current local version of a bulk data type."""
+        return self.files.get(type_)
+
+    def update(self, bulk_file: BulkFile) -> None:
+        """Record a new local version of a bulk data type and save the manifest.
+
+        Entries of other bulk data types are re-read from the file, so updates of other processes are kept.
+        """
+        with FileLock(self.path):
+            self.files = self._read()
+            self.files[bulk_file.type] = bulk_file
+
+            # Write atomically, so other processes never read a partial manifest
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({type_: asdict(entry) for type_, entry in self.files.items()}, f, indent=2)
+            tmp_path.replace(self.path)
+
+
+@dataclass(slots=True)
+class CardDiff:
+    """Differences between two versions of a card database."""
+
+    added: set[str] = field(default_factory=set)
+    removed: set[str] = field(default_factory=set)
+    changed: set[str] = field(default_factory=set)
+    oracle_ids: set[str] = field(default_factory=set)
+    """Oracle ids of all added, removed and changed cards, in either version."""
+
+    def __bool__(self) -> bool:
+        return len(self.added) > 0 or len(self.removed) > 0 or len(self.changed) > 0
+
+
+def diff_card_stores(old: CardStore, new: CardStore) -> CardDiff:
+    """Find cards that were added, removed or changed between two card stores.
+
+    Cards are matched by their id and compared by their complete card objects, except for prices and popularity
+    ranks. Those change daily for most cards, so caches of them are rebuilt instead.
+    """
+    _, old_common, new_common = np.intersect1d(
+        old.columns["id"], new.columns["id"], assume_unique=True, return_indices=True
+    )
+    removed = np.setdiff1d(np.arange(len(old)), old_common)
+    added = np.setdiff1d(np.arange(len(new)), new_common)
+    changed = [
+        (o, n)
+        for o, n in zip(old_common, new_common)
+        if old.raw(o) != new.raw(n) and _VOLATILE.sub(b"", old.raw(o)) != _VOLATILE.sub(b"", new.raw(n))
+    ]
+
+    diff = CardDiff()
+    for row in removed:
+        diff.removed.add(old.value("id", row))
+        diff.oracle_ids.add(old.value("oracle_id", row))
+    for row in added:
+        diff.added.add(new.value("id", row))
+        diff.oracle_ids.add(new.value("oracle_id", row))
+    for old_row, new_row in changed:
+        diff.changed.add(new.value("id", new_row))
+        diff.oracle_ids.update((old.value("oracle_id", old_row), new.value("oracle_id", new_row)))
+    diff.oracle_ids.discard(None)  # Cards without oracle id
+    return diff
@@ -0,0 +1,249 @@
+"""Size-bounded management of the download cache.
+
+Every use of a cached file is appended to an access log, from which the least recently (or least frequently) used
+files are evicted once the cache exceeds its budget. Bulk data files in use are pinned and never evicted, older
+versions of them are garbage collected instead.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+ACCESS_LOG_NAME = "access.log"
+STALE_DOWNLOAD_AGE = 3600  # Seconds without progress, after which an unfinished download counts as abandoned
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(size: str) -> int:
+    """Parse a size in bytes, optionally with a binary unit, e.g. `500M` or `2GB`."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", size.upper())
+    if m is None:
+        raise ValueError(f"Invalid size '{size}'")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2)])
+
+
+def format_size(size: float) -> str:
+    """Format a size in bytes with a binary unit, e.g. `1.5 GB`."""
+    for unit in ("KB", "MB", "GB", "TB"):
+        size /= 1024
+        if size < 1024:
+            break
+    return f"{size:.1f} {unit}"
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """File or directory in the cache."""
+
+    path: Path
+    size: int
+    last_access: float
+    accesses: int
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Summary of the cache contents."""
+
+    files: int
+    bytes: int
+    pinned_files: int
+    pinned_bytes: int
+    max_bytes: int | None
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size
+
+
+class CacheManager:
+    """Keeps a cache folder within a byte budget."""
+
+    def __init__(
+        self,
+        folder: Path | str,
+        max_bytes: int | None = None,
+        pinned: Callable[[], Iterable[str]] | None = None,
+        internal: Iterable[str] = (),
+        objects: ObjectStore | None = None,
+    ) -> None:
+        """Create a CacheManager.
+
+        Args:
+            folder: Cache folder
+            max_bytes: Budget of the cache in bytes, or `None` for no limit
+            pinned: Function returning the names of the files and folders which must not be evicted
+            internal: Names of bookkeeping files and folders, which are neither counted nor evicted
+            objects: Object store within the cache folder, whose objects are managed individually
+        """
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+        self.pinned = pinned or (lambda: ())
+        self.internal = {ACCESS_LOG_NAME, *internal}
+        self.objects = objects
+        if objects is not None:
+            self.internal |= {objects.objects_folder.name, objects.manifest_path.name}
+        self._lock = threading.Lock()
+
+    @property
+    def access_log(self) -> Path:
+        """Path of the access log."""
+        return self.folder / ACCESS_LOG_NAME
+
+    def record_access(self, path: Path | str) -> None:
+        """Record the use of a cached file."""
+        # Appends of a single short line are atomic, so processes can share the log without locking
+        line = f"{time.time():.3f} {Path(path).name}\n"
+        with self._lock, open(self.access_log, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _read_access_log(self) -> dict[str, tuple[float, int]]:
+        """Get the time of the last access and the number of accesses of each file name."""
+        accesses: dict[str, tuple[float, int]] = {}
+        if not self.access_log.is_file():
+            return accesses
+        with open(self.access_log, encoding="utf-8") as f:
+            for line in f:
+                timestamp, _, name = line.rstrip("\n").partition(" ")
+                try:
+                    last_access, count = accesses.get(name, (0.0, 0))
+                    accesses[name] = (max(last_access, float(timestamp)), count + 1)
+                except ValueError:  # Partially written line
+                    continue
+        return accesses
+
+    def entries(self) -> tuple[list[CacheEntry], list[CacheEntry]]:
+        """List the contents of the cache.
+
+        Files that were never accessed through the cache use their modification time as time of last access.
+        Unfinished downloads of the object store are included once they are abandoned, see `STALE_DOWNLOAD_AGE`.
+
+        Returns:
+            Evictable and pinned entries
+        """
+        accesses = self._read_access_log()
+        pinned_names = set(self.pinned())
+        paths = [path for path in self.folder.iterdir() if path.name not in self.internal]
+        staged: set[Path] = set()
+        if self.objects is not None:
+            paths += self.objects.objects()
+            staged = set(self.objects.staged())
+            paths += staged
+
+        evictable, pinned = [], []
+        for path in paths:
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+                if path in staged and stat.st_mtime > time.time() - STALE_DOWNLOAD_AGE:
+                    continue  # Still in progress
+                last_access, count = accesses.get(path.name, (stat.st_mtime, 0))
+                entry = CacheEntry(path, _size(path), last_access, count)
+            except FileNotFoundError:  # Removed concurrently
+                continue
+            (pinned if path.name in pinned_names else evictable).append(entry)
+        return evictable, pinned
+
+    def stats(self) -> CacheStats:
+        """Summarize the contents of the cache."""
+        evictable, pinned = self.entries()
+        return CacheStats(
+            files=len(evictable) + len(pinned),
+            bytes=sum(entry.size for entry in evictable) + sum(entry.size for entry in pinned),
+            pinned_files=len(pinned),
+            pinned_bytes=sum(entry.size for entry in pinned),
+            max_bytes=self.max_bytes,
+        )
+
+    def prune(
+        self,
+        max_bytes: int | None = None,
+        policy: Literal["lru", "lfu"] = "lru",
+        *,
+        keep: Iterable[Path | str] = (),
+        dry_run: bool = False,
+    ) -> list[CacheEntry]:
+        """Evict files until the cache fits into its budget.
+
+        Pinned files count towards the budget, but are never evicted.
+
+        Args:
+            max_bytes: Budget in bytes. Defaults to the budget of the manager.
+            policy: Evict the least recently used (`lru`) or the least frequently used (`lfu`) files first
+            keep: Files to not evict this time, e.g. because they are about to be used
+            dry_run: Only determine which files would be evicted
+
+        Returns:
+            The evicted entries
+        """
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        if max_bytes is None:
+            return []
+
+        evictable, pinned = self.entries()
+        total = sum(entry.size for entry in evictable) + sum(entry.size for entry in pinned)
+        if total <= max_bytes:
+            return []
+        keep = {Path(path).name for path in keep}
+        evictable = [entry for entry in evictable if entry.path.name not in keep]
+        if policy == "lru":
+            evictable.sort(key=lambda entry: entry.last_access)
+        elif policy == "lfu":
+            evictable.sort(key=lambda entry: (entry.accesses, entry.last_access))
+        else:
+            raise ValueError(f"Unknown policy '{policy}'")
+
+        evicted = []
+        for entry in evictable:
+            if total <= max_bytes:
+                break
+            if not dry_run:
+                self.remove(entry.path)
+            evicted.append(entry)
+            total -= entry.size
+
+        if not dry_run and len(evicted) > 0:
+            self.compact()
+        return evicted
+
+    def remove(self, path: Path) -> None:
+        """Remove a file or folder from the cache."""
+        if self.objects is not None and path.is_relative_to(self.objects.objects_folder):
+            self.objects.remove(path)
+        elif path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+    def compact(self) -> None:
+        """Rewrite the access log with one line per access of the remaining files.
+
+        Keeps the access counts, but drops entries of removed files, so the log doesn't grow forever.
+        """
+        evictable, pinned = self.entries()
+        names = {entry.path.name for entry in evictable} | {entry.path.name for entry in pinned}
+        with self._lock:
+            accesses = self._read_access_log()
+            tmp_path = self.access_log.with_name(f"{ACCESS_LOG_NAME}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for name, (last_access, count) in accesses.items():
+                    if name in names:
+                        f.writelines([f"{last_access:.3f} {name}\n"] * count)
+            tmp_path.replace(self.access_log)
+        if self.objects is not None:
+            self.objects.compact()
@@ -0,0 +1,110 @@
+"""Lazy views of cards in a card store."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import numpy as np
+
+from mtg_proxies.scryfall.store import (
+    CATEGORICAL_COLUMNS,
+    FLAG_FACE_ORACLE_ID,
+    FLAG_PRICE_KEYS,
+    FLAG_PRICES,
+    FLAGS,
+    PRICE_COLUMNS,
+    CardStore,
+)
+
+_MISSING = object()  # Card has no such field
+_NOT_CACHED = object()
+
+
+class CardView(Mapping[str, Any]):
+    """Read-only view of a card in a card store.
+
+    Behaves like the Scryfall card object, but only holds a reference to its row. Fields stored in columns of the
+    card store are read from there, all other fields are decoded from the card object on first access and cached
+    individually.
+    """
+
+    __slots__ = ("_fields", "_row", "_store")
+
+    def __init__(self, store: CardStore, row: int) -> None:
+        """Create a view of a row of a card store."""
+        self._store = store
+        self._row = int(row)
+        self._fields: dict[str, Any] | None = None
+
+    @property
+    def row(self) -> int:
+        """Row of this card in its card store."""
+        return self._row
+
+    @property
+    def store(self) -> CardStore:
+        """Card store containing this card."""
+        return self._store
+
+    def _get(self, key: str) -> Any:  # noqa: ANN401
+        store, row = self._store, self._row
+        if key in CATEGORICAL_COLUMNS:
+            code = store.columns[key][row]
+            return store.categories[key][code] if code >= 0 else _MISSING
+        if key == "id":
+            return store.value("id", row)
+        if key == "oracle_id":
+            if store.columns["flags"][row] & FLAG_FACE_ORACLE_ID:  # Oracle id is only on the faces
+                return _MISSING
+            oracle_id = store.value("oracle_id", row)
+            return oracle_id if oracle_id is not None else _MISSING
+        if key in FLAGS:
+            return bool(store.columns["flags"][row] & (1 << FLAGS.index(key)))
+        if key == "prices":  # Scryfall prices are strings with two decimals
+            flags = store.columns["flags"][row]
+            if not flags & FLAG_PRICES:
+                return _MISSING
+            prices = (
+                (column, store.columns[column][row]) for column in PRICE_COLUMNS if flags & FLAG_PRICE_KEYS[column]
+            )
+            return {column: f"{price:.2f}" if not np.isnan(price) else None for column, price in prices}
+
+        if self._fields is None:
+            self._fields = {}
+        value = self._fields.get(key, _NOT_CACHED)
+        if value is _NOT_CACHED:
+            value = self._fields[key] = store.decoded(row).get(key, _MISSING)
+        return value
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        value = self._get(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._get(key) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.decoded(self._row))
+
+    def __len__(self) -> int:
+        return len(self._store.decoded(self._row))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CardView):
+            return (self._store is other._store and self._row == other._row) or self["id"] == other["id"]
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self["id"])
+
+    def __repr__(self) -> str:
+        return f"CardView({self['name']!r}, {self['set']!r}, {self['collector_number']!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Decode the complete Scryfall card object."""
+        return self._store.card(self._row)
@@ -0,0 +1,105 @@
+"""Locks for files in a cache shared by several threads and processes.
+
+Files are locked on one of a fixed number of stripes per folder, so neither the cache nor the process fill up with a
+lock per cached file. Threads of a process lock the stripe with a thread lock, across processes it is locked with
+`fcntl.flock` on a lock file. On platforms without `fcntl`, files are only locked within the process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Self
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LOCK_FOLDER_NAME = ".locks"
+_STRIPES = 256  # Number of lock files per folder
+_POLL_INTERVAL = 0.001  # Seconds between the first attempts of async waiters to acquire a lock
+_MAX_POLL_INTERVAL = 0.05  # Seconds between later attempts, the interval doubles with every attempt
+
+_thread_locks: defaultdict[Path, threading.Lock] = defaultdict(threading.Lock)  # By lock file path
+_thread_locks_lock = threading.Lock()
+
+
+class FileLock:
+    """Context manager for exclusive access to a file.
+
+    Use it to make sure only one thread or process creates a file, while the others wait and then use it.
+    Can also be used as async context manager, which polls for the lock instead of blocking the event loop.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Create a lock for a file. The file itself doesn't need to exist.
+
+        Args:
+            path: Path of the file to lock
+        """
+        self.path = Path(path)
+        stripe = zlib.crc32(self.path.name.encode()) % _STRIPES
+        self._lock_path = self.path.parent / LOCK_FOLDER_NAME / f"{stripe}.lock"
+        with _thread_locks_lock:
+            self._thread_lock = _thread_locks[self._lock_path]
+        self._lock_file: IO[bytes] | None = None
+
+    def __enter__(self) -> Self:
+        self._acquire(blocking=True)
+        return self
+
+    def _acquire(self, *, blocking: bool) -> bool:
+        """Acquire the thread lock and the lock file.
+
+        Returns:
+            Whether the lock was acquired, always `True` if blocking
+        """
+        if not self._thread_lock.acquire(blocking=blocking):
+            return False
+        if fcntl is not None:
+            try:
+                self._lock_path.parent.mkdir(exist_ok=True)
+                self._lock_file = open(self._lock_path, "ab")  # noqa: SIM115 Closed on release
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:  # Held by another process
+                self._release()
+                return False
+            except BaseException:
+                self._release()
+                raise
+        return True
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self._release()
+
+    async def __aenter__(self) -> Self:
+        # Waiting in threads of the executor could take all of them, while the holder of the lock needs one to finish
+        interval = _POLL_INTERVAL
+        while not self._acquire(blocking=False):
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, _MAX_POLL_INTERVAL)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self._release()
+
+    def _release(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()  # Also releases the flock
+            self._lock_file = None
+        self._thread_lock.release()
@@ -0,0 +1,180 @@
+"""Cache of JSON responses of the Scryfall API.
+
+Responses are stored with their validators (`ETag` and `Last-Modified`). Within the max-age, a cached response is
+used without any request. After that, it is revalidated with a conditional request, which Scryfall answers with a
+bodyless `304 Not Modified` if nothing changed. The least recently used responses are dropped once the cache exceeds
+its number of entries.
+
+See:
+    https://developer.mozilla.org/en-US/docs/Web/HTTP/Caching
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping
+from contextlib import nullcontext, suppress
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+    from mtg_proxies.scryfall.rate_limit import RateLimiter
+
+
+class ResponseCache:
+    """Persistent cache of JSON responses, revalidated with conditional requests."""
+
+    def __init__(self, folder: Path | str, max_age: float = 0.0, max_entries: int = 1000) -> None:
+        """Create a ResponseCache.
+
+        Args:
+            folder: Folder to store the responses in. Created on first write.
+            max_age: Seconds during which a cached response is used without revalidating it
+            max_entries: Maximum number of responses to keep
+        """
+        self.folder = Path(folder)
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        """Number of responses used without a request."""
+        self.revalidations = 0
+        """Number of cached responses confirmed by a `304 Not Modified`."""
+        self.misses = 0
+        """Number of responses downloaded in full."""
+
+    def _path(self, url: str) -> Path:
+        return self.folder / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def _load(self, url: str) -> dict | None:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry if entry["url"] == url else None
+
+    def _save(self, entry: dict) -> None:
+        # Write atomically, so other processes never read a partial entry
+        path = self._path(entry["url"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        tmp_path.replace(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop the least recently used responses, until at most `max_entries` are left."""
+        entries = []
+        for path in self.folder.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:  # Removed concurrently
+                continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[: len(entries) - self.max_entries]:
+            path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.folder.glob("*.json"))
+
+    def _lookup(self, url: str) -> tuple[dict | None, bool]:
+        """Load the entry of an url.
+
+        Returns:
+            The entry, if any, and whether it is fresh, so it can be used without a request
+        """
+        entry = self._load(url)
+        if entry is None or time.time() - entry["fetched_at"] >= self.max_age:
+            return entry, False
+        with self._lock:
+            self.hits += 1
+        with suppress(FileNotFoundError):  # Modification time is the time of last use
+            os.utime(self._path(url))
+        return entry, True
+
+    @staticmethod
+    def _conditional_headers(entry: dict | None) -> dict[str, str]:
+        """Headers to revalidate an entry with."""
+        headers = {}
+        if entry is not None and entry["etag"] is not None:
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry["last_modified"] is not None:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _update(
+        self, url: str, entry: dict | None, status_code: int, headers: Mapping[str, str], decode: Callable[[], dict]
+    ) -> dict:
+        """Update the cache with the response to a (conditional) request and return its JSON object."""
+        if status_code == 304 and entry is not None:  # Unchanged
+            entry["fetched_at"] = time.time()
+            self._save(entry)
+            with self._lock:
+                self.revalidations += 1
+            return entry["body"]
+
+        body = decode()
+        with self._lock:
+            self.misses += 1
+        if 200 <= status_code < 300:  # Don't cache errors
+            self._save({
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "body": body,
+            })
+        return body
+
+    def get_json(self, url: str, session: requests.Session, rate_limiter: RateLimiter | None = None) -> dict:
+        """Get the JSON response of an url, from the cache if possible.
+
+        Args:
+            url: Url to get
+            session: Session to send requests with
+            rate_limiter: Rate limit to apply to requests. Responses used from the cache don't count.
+
+        Returns:
+            The decoded JSON object
+        """
+        entry, fresh = self._lookup(url)
+        if fresh:
+            return entry["body"]
+
+        with rate_limiter if rate_limiter is not None else nullcontext():
+            response = session.get(url, headers=self._conditional_headers(entry))
+        return self._update(url, entry, response.status_code, response.headers, response.json)
+
+    async def aget_json(self, url: str, client: httpx.AsyncClient, rate_limiter: RateLimiter | None = None) -> dict:
+        """Get the JSON response of an url, from the cache if possible.
+
+        Async version of `get_json`. The cache is read and written in a thread.
+
+        Args:
+            url: Url to get
+            client: Client to send requests with
+            rate_limiter: Rate limit to apply to requests. Responses used from the cache don't count.
+
+        Returns:
+            The decoded JSON object
+        """
+        entry, fresh = await asyncio.to_thread(self._lookup, url)
+        if fresh:
+            return entry["body"]
+
+        async with rate_limiter if rate_limiter is not None else nullcontext():
+            response = await client.get(url, headers=self._conditional_headers(entry))
+        return await asyncio.to_thread(self._update, url, entry, response.status_code, response.headers, response.json)
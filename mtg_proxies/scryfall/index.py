@@ -0,0 +1,141 @@
+"""In-memory hash indexes of a card store.
+
+Indexes are built lazily, one per queried attribute, the first time that attribute is looked up. Each index maps a
+normalized value to a slice of the rows sorted by that attribute, so it costs one dict entry per distinct value.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from mtg_proxies.scryfall.store import CATEGORICAL_COLUMNS, FLAG_FACE_ORACLE_ID, UUID_COLUMNS, CardStore
+
+INDEXED_KEYS = UUID_COLUMNS + CATEGORICAL_COLUMNS
+
+_EMPTY = np.empty(0, dtype=np.intp)
+_NO_UUID = np.void(bytes(16))
+
+
+class _Index:
+    """Rows of a card store grouped by a key column."""
+
+    def __init__(self, keys: np.ndarray, label: Callable[[Any], object]) -> None:
+        """Group rows by their keys.
+
+        Args:
+            keys: Key of each row
+            label: Label under which the rows with a key can be looked up. `None` for rows that have no value.
+        """
+        self.keys = keys
+        self.order = np.argsort(keys, kind="stable")  # Rows sorted by key, ascending within each group
+        unique, starts = np.unique(keys[self.order], return_index=True)
+        stops = [*starts[1:], len(keys)]
+        self.groups = {label(key): (key, int(start), int(stop)) for key, start, stop in zip(unique, starts, stops)}
+
+    def rows(self, label: object) -> np.ndarray:
+        """Get the sorted rows of a label."""
+        group = self.groups.get(label)
+        return self.order[group[1] : group[2]] if group is not None else _EMPTY
+
+    def mask(self, label: object, rows: np.ndarray) -> np.ndarray:
+        """Get a boolean mask of which rows have a label."""
+        group = self.groups.get(label)
+        return self.keys[rows] == group[0] if group is not None else np.zeros(len(rows), dtype=bool)
+
+
+class CardIndex:
+    """Lazily built hash indexes over the columns of a card store."""
+
+    def __init__(self, store: CardStore, normalize: dict[str, Callable[[str], str]] | None = None) -> None:
+        """Create a CardIndex.
+
+        Args:
+            store: Card store to index
+            normalize: Normalization functions for categorical columns, by column. Defaults to `str.lower`.
+                Queried values must be normalized already.
+        """
+        self.store = store
+        self.normalize = normalize or {}
+        self._indexes: dict[str, _Index] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, key: str) -> _Index:
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = self._indexes[key] = self._build(key)
+        return index
+
+    def _build(self, key: str) -> _Index:
+        column = self.store.columns[key]
+        if key in UUID_COLUMNS:
+            return _Index(column, lambda value: value.tobytes() if value != _NO_UUID else None)
+
+        # Map categories to codes of their normalized values, so each normalized value is a single group
+        normalize = self.normalize.get(key, str.lower)
+        normalized: dict[str, int] = {}
+        codes = [normalized.setdefault(normalize(category), len(normalized)) for category in self.store.categories[key]]
+        labels = list(normalized)
+        keys = np.array([*codes, -1], dtype=np.int32)[column]  # Missing values (-1) map to the last entry
+        return _Index(keys, lambda code: labels[code] if code >= 0 else None)
+
+    def _label(self, key: str, value: str) -> object:
+        if key in UUID_COLUMNS:
+            try:
+                return uuid.UUID(value).bytes
+            except ValueError:  # Not a valid uuid, so there can't be any match
+                return None
+        return value
+
+    def lookup(self, key: str, value: str) -> np.ndarray:
+        """Find all rows with a certain value of an indexed attribute.
+
+        For `oracle_id`, this includes cards that only have an oracle id on their first face.
+
+        Args:
+            key: Indexed attribute, see `INDEXED_KEYS`
+            value: Normalized value
+
+        Returns:
+            Sorted array of matching rows
+        """
+        label = self._label(key, value)
+        return self._index(key).rows(label) if label is not None else _EMPTY
+
+    def rows(self, **kwargs: str) -> np.ndarray:
+        """Find all rows matching certain attributes.
+
+        The most selective indexed attribute is looked up first and its rows filtered by the other indexed
+        attributes. Attributes that can't be indexed are matched by a scan over the remaining candidates.
+
+        Args:
+            kwargs: (key, value) pairs with normalized values, e.g. `name="tendershoot dryad", set="rix"`
+
+        Returns:
+            Sorted array of matching rows
+        """
+        indexed = {key: value for key, value in kwargs.items() if key in INDEXED_KEYS}
+        unindexed = {key: value for key, value in kwargs.items() if key not in INDEXED_KEYS}
+
+        rows = None
+        if len(indexed) > 0:
+            # Start with the most selective attribute, then filter its rows by the column values of the others
+            matches = {key: self.lookup(key, value) for key, value in indexed.items()}
+            first = min(matches, key=lambda key: len(matches[key]))
+            rows = matches[first]
+            for key, value in indexed.items():
+                if key != first and len(rows) > 0:
+                    rows = rows[self._index(key).mask(self._label(key, value), rows)]
+            if "oracle_id" in indexed:  # Only cards with a top-level oracle id have one
+                rows = rows[(self.store.columns["flags"][rows] & FLAG_FACE_ORACLE_ID) == 0]
+
+        if len(unindexed) > 0 and (rows is None or len(rows) > 0):
+            rows = self.store.rows(rows, **unindexed)
+        return rows if rows is not None else np.arange(len(self.store))
@@ -0,0 +1,82 @@
+"""Incremental parsing of Scryfall bulk data files.
+
+Bulk data files are a single json array with one object per card. Parsing them with `json.load` requires the whole
+array in memory, which is several GB for `all_cards`. Instead, the array is walked one element at a time, so only
+the current element and a read buffer are held in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")  # Rest of the buffer, if a number may continue after it
+
+
+def iter_json_array(stream: TextIO, chunk_size: int = 1024 * 1024) -> Iterator[Any]:
+    """Iterate over the elements of a json array without loading it completely.
+
+    Args:
+        stream: Text stream containing a json array
+        chunk_size: Minimum number of characters to read at once
+
+    Yields:
+        The decoded elements of the array
+
+    Raises:
+        ValueError: If the stream does not contain a valid json array
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more() -> None:
+        nonlocal buffer, pos, eof
+        # Read at least as much as is already buffered, so parsing large elements stays linear
+        chunk = stream.read(max(chunk_size, len(buffer) - pos))
+        eof = chunk == ""
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def next_char() -> str:
+        """Skip whitespace and return the next character, or an empty string at the end of the stream."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos] if pos < len(buffer) else ""
+            read_more()
+
+    if next_char() != "[":
+        raise ValueError("Expected a json array")
+    pos += 1
+    if next_char() == "]":  # Empty array
+        return
+
+    while True:
+        next_char()
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Invalid json array: {e}") from e
+            read_more()  # Element is incomplete
+            continue
+        if not eof and _NUMBER_TAIL.match(buffer, end):  # Numbers may continue in the next chunk, e.g. `1.` of `1.5`
+            read_more()
+            continue
+        pos = end
+        yield element
+
+        match next_char():
+            case ",":
+                pos += 1
+            case "]":
+                return
+            case _:
+                raise ValueError("Invalid json array: expected ',' or ']' after element")
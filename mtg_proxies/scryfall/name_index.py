@@ -0,0 +1,102 @@
+"""Inverted n-gram index for fuzzy card name matching.
+
+Every name is indexed by all its substrings of up to three characters. A name can only contain a word if it contains
+all trigrams of that word, so intersecting the posting lists of the rarest trigrams leaves only a handful of names to
+check for the actual substrings.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+_GRAM_LENGTH = 3
+_VERIFY_THRESHOLD = 64  # Check names directly, once there are this few candidates left
+_SHORTLIST = 64  # Number of names with the most common trigrams to rank by edit distance
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def _grams(name: str) -> set[str]:
+    """All substrings of up to three characters."""
+    return {name[i : i + n] for n in range(1, _GRAM_LENGTH + 1) for i in range(len(name) - n + 1)}
+
+
+def _trigrams(word: str) -> set[str]:
+    """Trigrams of a word. Shorter words are their only gram."""
+    if len(word) <= _GRAM_LENGTH:
+        return {word} if len(word) > 0 else set()
+    return {word[i : i + _GRAM_LENGTH] for i in range(len(word) - _GRAM_LENGTH + 1)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class NameIndex:
+    """Inverted index of the n-grams of names."""
+
+    def __init__(self, names: Sequence[str]) -> None:
+        """Index names.
+
+        Args:
+            names: Names to index, already normalized like the queries will be
+        """
+        self.names = list(names)
+        postings: dict[str, list[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in _grams(name):
+                postings[gram].append(i)
+        self._postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def containing(self, words: Iterable[str]) -> list[str]:
+        """Find all names containing each of some words.
+
+        Same as `[name for name in names if all(word in name for word in words)]`, without looking at every name.
+
+        Returns:
+            Matching names in index order
+        """
+        words = list(words)
+        grams = {gram for word in words for gram in _trigrams(word)}
+        postings = sorted((self._postings.get(gram, _EMPTY) for gram in grams), key=len)
+
+        rows = postings[0] if len(postings) > 0 else range(len(self.names))
+        for posting in postings[1:]:  # Rarest grams first, as they narrow down the candidates most
+            if len(rows) <= _VERIFY_THRESHOLD:
+                break
+            rows = np.intersect1d(rows, posting, assume_unique=True)
+
+        return [self.names[row] for row in rows if all(word in self.names[row] for word in words)]
+
+    def closest(self, name: str, limit: int = 5) -> list[str]:
+        """Find the names most similar to a name.
+
+        Names sharing the most trigrams with the name are ranked by their edit distance to it.
+
+        Args:
+            name: Name to look up
+            limit: Maximum number of names to return
+
+        Returns:
+            Up to `limit` names, closest first
+        """
+        postings = [self._postings[gram] for gram in _trigrams(name) if gram in self._postings]
+        if len(postings) == 0:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.names))
+        shortlist = np.argsort(-shared, kind="stable")[:_SHORTLIST]
+        shortlist = shortlist[shared[shortlist] > 0]
+        ranked = sorted(shortlist, key=lambda row: (edit_distance(name, self.names[row]), row))
+        return [self.names[row] for row in ranked[:limit]]
@@ -0,0 +1,183 @@
+"""Content-addressed storage of downloaded files.
+
+Files are stored once per distinct content, named by the SHA-256 hash of their content and sharded into two levels of
+subfolders by the first bytes of the hash, so no folder grows beyond a few hundred files even for 100k+ files.
+
+A manifest maps keys, e.g. urls, to the files. It is an append-only log shared by all processes, which is read once
+and kept in memory, so looking up a known key doesn't touch the disk. Lines appended by other processes are read on the
+next miss, if the manifest changed since.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+from mtg_proxies.scryfall.file_lock import FileLock
+
+OBJECTS_FOLDER_NAME = "objects"
+MANIFEST_NAME = "manifest.log"
+
+_REMOVED = "-"  # Object name of removed keys in the manifest
+
+
+def file_digest(path: Path | str) -> str:
+    """Compute the SHA-256 hash of a file's content."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class ObjectStore:
+    """Content-addressed files, looked up by key."""
+
+    def __init__(self, folder: Path | str) -> None:
+        """Open an object store. The folder is created on first write.
+
+        Args:
+            folder: Folder for the manifest and the objects
+        """
+        self.folder = Path(folder)
+        self.objects_folder = self.folder / OBJECTS_FOLDER_NAME
+        self.manifest_path = self.folder / MANIFEST_NAME
+        self._objects: dict[str, str] = {}  # Object name of each key
+        self._offset = 0  # Bytes of the manifest read so far
+        self._inode: int | None = None  # Identity of the manifest file read so far
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> Path:
+        """Get the path of an object by its name."""
+        return self.objects_folder / name[:2] / name[2:4] / name
+
+    def get(self, key: str) -> Path | None:
+        """Get the path of the object stored under a key.
+
+        The object isn't checked to exist, use `discard` if it turns out to be deleted outside the store.
+
+        Returns:
+            Path to the object, or `None` if there is none
+        """
+        with self._lock:
+            name = self._objects.get(key)
+            if name is None:  # Maybe added by another process
+                self._sync()
+                name = self._objects.get(key)
+        return None if name is None else self.path(name)
+
+    def put(self, key: str, file: Path | str, suffix: str = "") -> Path:
+        """Move a file into the store and record it under a key.
+
+        If the store already contains a file with the same content, the file is dropped instead.
+
+        Args:
+            key: Key to store the file under, replacing any previous object
+            file: File to move into the store
+            suffix: Suffix of the object name, e.g. `.png`
+
+        Returns:
+            Path to the object
+        """
+        file = Path(file)
+        name = file_digest(file) + suffix
+        path = self.path(name)
+        if path.is_file():  # Same content stored already
+            file.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            file.replace(path)
+        self._append([(name, key)])
+        return path
+
+    def remove(self, path: Path | str) -> None:
+        """Remove an object and all keys referring to it."""
+        name = Path(path).name
+        with self._lock:
+            self._sync()
+            keys = [key for key, object_name in self._objects.items() if object_name == name]
+        self._append([(_REMOVED, key) for key in keys])
+        Path(path).unlink(missing_ok=True)
+
+    def discard(self, key: str, path: Path | str) -> None:
+        """Drop a key whose object was deleted outside the store, unless the key was stored again since."""
+        with self._lock:
+            self._sync()
+            if self._objects.get(key) != Path(path).name:
+                return
+        self._append([(_REMOVED, key)])
+
+    def items(self) -> Iterator[tuple[str, Path]]:
+        """Iterate all keys and the paths of their objects."""
+        with self._lock:
+            self._sync()
+            items = list(self._objects.items())
+        for key, name in items:
+            yield key, self.path(name)
+
+    def objects(self) -> Iterator[Path]:
+        """Iterate all files in the store, including those without a key."""
+        return (path for path in self.objects_folder.glob("*/*/*") if not path.name.endswith(".tmp"))
+
+    def staged(self) -> Iterator[Path]:
+        """Iterate files waiting to be moved into the store, e.g. downloads in progress or interrupted ones."""
+        if not self.objects_folder.is_dir():
+            return iter(())
+        return (path for path in self.objects_folder.iterdir() if path.is_file())
+
+    def compact(self) -> None:
+        """Rewrite the manifest with a single line per key, so it doesn't grow forever."""
+        with FileLock(self.manifest_path), self._lock:
+            self._sync()
+            tmp_path = self.manifest_path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(f"{name} {key}\n" for key, name in self._objects.items())
+            tmp_path.replace(self.manifest_path)
+            self._inode = self.manifest_path.stat().st_ino
+            self._offset = self.manifest_path.stat().st_size
+
+    def _append(self, entries: list[tuple[str, str]]) -> None:
+        """Append entries to the manifest and apply them."""
+        if len(entries) == 0:
+            return
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with FileLock(self.manifest_path), self._lock:
+            self._sync()  # Don't skip lines appended by other processes
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{name} {key}\n" for name, key in entries)
+                self._offset = f.tell()
+                self._inode = os.fstat(f.fileno()).st_ino
+            self._apply(entries)
+
+    def _sync(self) -> None:
+        """Read the lines appended to the manifest since the last read. Must hold the lock."""
+        try:
+            stat = self.manifest_path.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_ino == self._inode and stat.st_size == self._offset:  # Nothing appended
+            return
+
+        try:
+            with open(self.manifest_path, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if inode != self._inode:  # Compacted by another process, start over
+                    self._objects.clear()
+                    self._offset = 0
+                    self._inode = inode
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        end = data.rfind(b"\n") + 1  # Ignore a line that is still being written
+        lines = data[:end].decode("utf-8").splitlines()
+        self._apply([tuple(line.split(" ", 1)) for line in lines])
+        self._offset += end
+
+    def _apply(self, entries: list[tuple[str, str]]) -> None:
+        for name, key in entries:
+            if name == _REMOVED:
+                self._objects.pop(key, None)
+            else:
+                self._objects[key] = name
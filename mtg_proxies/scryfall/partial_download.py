@@ -0,0 +1,118 @@
+"""Downloads into a partial file, which are continued with `Range` requests after the connection dropped.
+
+Holds the logic shared by the synchronous and the asynchronous downloads, which only differ in their HTTP client.
+The `ETag` or `Last-Modified` header of the first response is kept next to the partial file and sent as `If-Range`
+when continuing, so a file that changed on the server in between is downloaded again instead of being spliced.
+
+See:
+    https://developer.mozilla.org/en-US/docs/Web/HTTP/Range_requests
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from pathlib import Path
+from typing import IO
+
+PART_SUFFIX = ".part"
+VALIDATOR_SUFFIX = ".validator"  # Suffix of the file next to the partial file, which holds the If-Range validator
+
+
+class PartialDownload:
+    """Download of a file to `<dst>.part`, which is renamed to `dst` once complete.
+
+    For each attempt, send a request with the `headers`, check whether the response `is_complete`, otherwise `start`
+    appending its content and `verify` the result. Once an attempt succeeded, `finish` the download.
+    """
+
+    def __init__(self, url: str, dst: Path | str, size: int | None = None) -> None:
+        """Create a PartialDownload. Continues the partial file of a previous download, if any.
+
+        Args:
+            url: Url of the file
+            dst: Path to save the file to
+            size: Expected size of the file in bytes, if known
+        """
+        self.url = url
+        self.dst = Path(dst)
+        self.part_path = self.dst.with_name(f"{self.dst.name}{PART_SUFFIX}")
+        self.validator_path = self.part_path.with_name(f"{self.part_path.name}{VALIDATOR_SUFFIX}")
+        self.size = size
+        self.offset = 0
+        """Bytes downloaded before the current attempt."""
+        self.total = size
+        """Size of the complete file, if known."""
+
+    def headers(self) -> dict[str, str]:
+        """Get the headers of a request for the rest of the file."""
+        self.offset = self.part_path.stat().st_size if self.part_path.is_file() else 0
+        validator = self.validator_path.read_text(encoding="utf-8") if self.validator_path.is_file() else None
+        # Not a prefix of the file, or not known which version of the file it is part of
+        if self.offset > 0 and ((self.size is not None and self.offset > self.size) or validator is None):
+            self._restart()
+
+        # Ranges refer to the encoded content, so ask for the file as is
+        headers = {"Accept-Encoding": "identity"}
+        if self.offset > 0:
+            headers["Range"] = f"bytes={self.offset}-"
+            if validator:  # Otherwise the server sent none, so changes can't be detected
+                headers["If-Range"] = validator
+        return headers
+
+    def is_complete(self, status_code: int, headers: Mapping[str, str]) -> bool:
+        """Check whether the response to a range request means there is nothing left to download.
+
+        Raises:
+            ValueError: If the range can't be satisfied, but the partial file isn't complete either. It is removed,
+                so the next attempt restarts the download.
+        """
+        if status_code != 416 or self.offset == 0:
+            return False
+        total = self.size
+        if total is None:  # Servers may tell the size in the response, e.g. `Content-Range: bytes */1234`
+            _, _, length = headers.get("Content-Range", "").rpartition("/")
+            total = int(length) if length.isdigit() else None
+        if self.offset == total:
+            return True
+        self._restart()
+        raise ValueError(f"Range request for {self.url} not satisfiable, restarting the download")
+
+    def start(self, status_code: int, headers: Mapping[str, str]) -> IO[bytes]:
+        """Start receiving the content of a successful response.
+
+        Args:
+            status_code: Status code of the response
+            headers: Headers of the response
+
+        Returns:
+            The partial file, opened to append the content
+        """
+        if status_code != 206:  # Server sends the whole file, e.g. because it changed
+            self.offset = 0
+            # Strong validators only, weak ETags can't be used in If-Range
+            etag = headers.get("ETag", "")
+            validator = etag if etag and not etag.startswith("W/") else headers.get("Last-Modified", "")
+            self.validator_path.write_text(validator, encoding="utf-8")
+        self.total = int(headers["Content-Length"]) + self.offset if "Content-Length" in headers else self.size
+        return open(self.part_path, "ab" if self.offset > 0 else "wb")
+
+    def verify(self) -> None:
+        """Check that the partial file has the expected size.
+
+        Raises:
+            ValueError: If it hasn't. The next attempt continues or restarts the download.
+        """
+        downloaded = self.part_path.stat().st_size
+        if self.size is not None and downloaded != self.size:
+            raise ValueError(f"Downloaded {downloaded} bytes of {self.url}, expected {self.size}")
+
+    def finish(self) -> None:
+        """Move the complete file to its destination."""
+        self.part_path.replace(self.dst)
+        self.validator_path.unlink(missing_ok=True)
+
+    def _restart(self) -> None:
+        """Remove the partial file, so the next request downloads the whole file."""
+        self.part_path.unlink(missing_ok=True)
+        self.validator_path.unlink(missing_ok=True)
+        self.offset = 0
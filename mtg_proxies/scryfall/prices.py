@@ -0,0 +1,86 @@
+"""Vectorized price lookups.
+
+Prices are stored per print, but usually wanted per card. The index groups the price columns of a card store by
+oracle id and keeps the lowest price of each group, so the prices of a whole decklist are a few array lookups.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable
+
+import numpy as np
+
+from mtg_proxies.scryfall.store import PRICE_COLUMNS, CardStore
+
+USD_TO_EUR = 0.83  # Used for cards without any eur price
+
+_NO_UUID = np.void(bytes(16))
+
+
+def _uuid_bytes(oracle_id: str) -> bytes:
+    try:
+        return uuid.UUID(oracle_id).bytes
+    except ValueError:  # Not a valid uuid, so there can't be any match
+        return bytes(16)
+
+
+class PriceIndex:
+    """Lowest prices of each oracle id in a card store."""
+
+    def __init__(self, store: CardStore) -> None:
+        """Group the prices of a card store by oracle id.
+
+        This includes cards that only have an oracle id on their first face.
+        """
+        self.store = store
+        self.oracle_ids, groups = np.unique(store.columns["oracle_id"], return_inverse=True)
+        """Sorted distinct oracle ids."""
+
+        order = np.argsort(groups, kind="stable")
+        starts = np.flatnonzero(np.diff(groups[order], prepend=-1))
+        self.minima: dict[str, np.ndarray] = {
+            # Scryfall prices have two decimals, which float32 can't represent exactly
+            column: np.round(np.fmin.reduceat(store.columns[column][order].astype(np.float64), starts), 2)
+            for column in PRICE_COLUMNS
+        }
+        """Lowest price of each oracle id by price column, `nan` if there is none."""
+
+    def groups(self, oracle_ids: Iterable[str]) -> np.ndarray:
+        """Get the positions of oracle ids in `oracle_ids`, -1 for unknown oracle ids."""
+        keys = np.array([_uuid_bytes(oracle_id) for oracle_id in oracle_ids], dtype="V16")
+        groups = np.minimum(np.searchsorted(self.oracle_ids, keys), len(self.oracle_ids) - 1)
+        found = (self.oracle_ids[groups] == keys) & (keys != _NO_UUID) if len(self.oracle_ids) > 0 else False
+        return np.where(found, groups, -1)
+
+    def prices(self, oracle_ids: Iterable[str], currency: str = "eur", foil: bool | None = None) -> np.ndarray:
+        """Find the lowest prices of oracle ids.
+
+        Args:
+            oracle_ids: Oracle ids to look up
+            currency: `usd`, `eur` or `tix`
+            foil: `False`, `True`, or `None` for any
+
+        Returns:
+            Lowest price of each oracle id, `nan` if there is none. Cards without any eur price fall back to their
+            converted usd price.
+        """
+        groups = self.groups(oracle_ids)
+        return self._prices(groups, currency, foil)
+
+    def _prices(self, groups: np.ndarray, currency: str, foil: bool | None) -> np.ndarray:
+        columns = []
+        if not foil:
+            columns += [currency]
+        if (foil or foil is None) and currency != "tix":  # "TIX has no foil"
+            columns += [currency + "_foil"]
+
+        prices = np.full(len(groups), np.nan)
+        found = groups >= 0
+        for column in columns:
+            prices[found] = np.fmin(prices[found], self.minima[column][groups[found]])
+
+        if currency == "eur":  # Try dollar and apply conversion
+            missing = found & np.isnan(prices)
+            prices[missing] = USD_TO_EUR * self._prices(groups[missing], "usd", None)
+        return prices
@@ -0,0 +1,179 @@
+"""Precomputed ranking of prints.
+
+How suitable a print is for proxies only depends on the print itself. So all prints of a card store are scored once
+and the scores are saved next to the store, which turns recommending a print into lookups in the score arrays.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import Collection, Mapping
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from mtg_proxies.scryfall.store import CardStore
+
+RANKING_FILE_NAME = "ranking.npy"
+
+_DTYPE = np.dtype([("score", np.uint8), ("best_score", np.uint8), ("illustration", "V16")])
+_NO_UUID = np.void(bytes(16))
+
+
+def print_score(card: Mapping[str, Any], *, penalize_extended_art: bool = False) -> int:
+    """Score how suitable a print is for proxies. Higher is better.
+
+    Args:
+        card: Scryfall card object
+        penalize_extended_art: Don't award black borders of extended art frames
+    """
+    points = 0
+    if card["set"] != "mb1" and card["border_color"] != "gold":
+        points += 1
+    if card["frame"] == "2015":
+        points += 2
+    if not card["digital"]:
+        points += 4
+    if card["border_color"] == "black" and (
+        not penalize_extended_art or "frame_effects" not in card or "extendedart" not in card["frame_effects"]
+    ):
+        points += 8
+    if card["collector_number"][-1] not in ["p", "s"] and card["nonfoil"]:
+        points += 16
+    if card["highres_image"]:
+        points += 32
+    if card["lang"] == "en":
+        points += 64
+
+    return points
+
+
+def illustration(card: Mapping[str, Any]) -> str:
+    """Get the illustration id of the front face. Not all cards have illustrations, these use their id instead."""
+    face = card["card_faces"][0] if "image_uris" not in card and "card_faces" in card else card
+    return face.get("illustration_id", card["id"])
+
+
+def build_print_ranking(
+    store: CardStore, path: Path | str, previous: PrintRanking | None = None, changed: Collection[str] = ()
+) -> None:
+    """Score all prints of a card store.
+
+    The ranking is written to a temporary file first, so concurrent readers never see an incomplete ranking.
+
+    Args:
+        store: Card store to rank
+        path: Path of the ranking file
+        previous: Ranking of a previous version of the store, whose scores are reused for unchanged prints
+        changed: Ids of the prints that changed since the previous version, see `CardDiff.changed`
+    """
+    ranking = np.empty(len(store), dtype=_DTYPE)
+    rescore = np.ones(len(store), dtype=bool)
+    if previous is not None:
+        _, old_rows, new_rows = np.intersect1d(
+            previous.store.columns["id"], store.columns["id"], assume_unique=True, return_indices=True
+        )
+        changed_ids = {uuid.UUID(card_id).bytes for card_id in changed}
+        unchanged = np.array([store.columns["id"][row].tobytes() not in changed_ids for row in new_rows], dtype=bool)
+        ranking[new_rows[unchanged]] = previous.ranking[old_rows[unchanged]]
+        rescore[new_rows[unchanged]] = False
+
+    for row in np.flatnonzero(rescore):
+        card = store.card(row)
+        ranking[row] = (
+            print_score(card),
+            print_score(card, penalize_extended_art=True),
+            uuid.UUID(illustration(card)).bytes,
+        )
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, ranking)
+    tmp_path.replace(path)
+
+
+class PrintRanking:
+    """Scores of all prints of a card store."""
+
+    def __init__(self, store: CardStore, path: Path | str) -> None:
+        """Open an existing ranking.
+
+        Args:
+            store: Ranked card store
+            path: Path of the ranking file
+        """
+        self.store = store
+        self.path = Path(path)
+        ranking = np.load(self.path, mmap_mode="r")
+        if len(ranking) != len(store):
+            raise ValueError(f"Ranking {self.path} does not match card store {store.path}")
+        self.ranking: np.ndarray = ranking
+        """Scores and illustration id of each row."""
+        self.scores: np.ndarray = ranking["score"]
+        """Score of each row."""
+        self.best_scores: np.ndarray = ranking["best_score"]
+        """Score of each row, without black borders of extended art frames."""
+        self.illustrations: np.ndarray = ranking["illustration"]
+        """Illustration id of each row."""
+
+    @staticmethod
+    def open(store: CardStore, previous: PrintRanking | None = None, changed: Collection[str] = ()) -> PrintRanking:
+        """Open the ranking of a card store, building it if necessary.
+
+        Args:
+            store: Ranked card store
+            previous: Ranking of a previous version of the store, to reuse the scores of unchanged prints when building
+            changed: Ids of the prints that changed since the previous version, see `CardDiff.changed`
+        """
+        path = store.path / RANKING_FILE_NAME
+        if not path.is_file():
+            build_print_ranking(store, path, previous, changed)
+        return PrintRanking(store, path)
+
+    @staticmethod
+    def find(store: CardStore) -> PrintRanking | None:
+        """Open the ranking of a card store, if it was built already."""
+        path = store.path / RANKING_FILE_NAME
+        return PrintRanking(store, path) if path.is_file() else None
+
+    @cached_property
+    def _best_by_oracle_id(self) -> dict[bytes, int]:
+        """Best row of each oracle id, including cards that only have an oracle id on their first face."""
+        oracle_ids, groups = np.unique(self.store.columns["oracle_id"], return_inverse=True)
+        # Sort by oracle id, then descending score. Sorting is stable, so ties stay in row order
+        order = np.lexsort((-self.best_scores.astype(np.int16), groups))
+        _, first = np.unique(groups[order], return_index=True)
+        return {
+            oracle_id.tobytes(): int(row) for oracle_id, row in zip(oracle_ids, order[first]) if oracle_id != _NO_UUID
+        }
+
+    def best_print(self, oracle_id: str) -> int | None:
+        """Find the best row of an oracle id, or `None` if there is none."""
+        try:
+            return self._best_by_oracle_id.get(uuid.UUID(oracle_id).bytes)
+        except ValueError:  # Not a valid uuid
+            return None
+
+    def best(self, rows: np.ndarray) -> int | None:
+        """Find the best of some rows. Ties are won by the first row."""
+        if len(rows) == 0:
+            return None
+        rows = np.sort(rows)
+        return int(rows[np.argmax(self.best_scores[rows])])
+
+    def ranked(self, rows: np.ndarray) -> np.ndarray:
+        """Sort rows by descending score. Ties stay in row order."""
+        rows = np.sort(rows)
+        return rows[np.argsort(-self.scores[rows].astype(np.int16), kind="stable")]
+
+    def choices(self, rows: np.ndarray) -> np.ndarray:
+        """Find the best rows of each illustration, sorted by descending score."""
+        rows = self.ranked(rows)
+        _, groups = np.unique(self.illustrations[rows], return_inverse=True)
+        group_scores = np.zeros(groups.max(initial=-1) + 1, dtype=self.scores.dtype)
+        np.maximum.at(group_scores, groups, self.scores[rows])
+        return rows[self.scores[rows] == group_scores[groups]]
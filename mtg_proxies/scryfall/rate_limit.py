@@ -1,30 +1,118 @@
 from __future__ import annotations
 
+import asyncio
+import struct
 import threading
 import time
+from pathlib import Path
 from types import TracebackType
 from typing import Self
 
+from mtg_proxies.scryfall.file_lock import FileLock
+
+_STATE_FORMAT = "<dd"  # Tokens and time of the last update
+
 
 class RateLimiter:
-    """Context manager for enforcing a rate limit to API calls."""
+    """Context manager for enforcing a rate limit to API calls.
+
+    Implemented as a token bucket: Calls draw a token from a bucket, that is refilled at a constant rate up to its
+    capacity. So up to `burst` calls may be made at once, after that calls are spaced out to the rate.
 
-    def __init__(self, delay: float) -> None:
-        """Initialie this RateLimit.
+    Can be used both as regular and as async context manager, sharing the same limit between threads and coroutines.
+    Waiting calls reserve their token first and then sleep without holding any lock, so they don't block each other.
+    """
+
+    def __init__(
+        self,
+        delay: float | None = None,
+        *,
+        rate: float | None = None,
+        burst: int = 1,
+        state_path: Path | str | None = None,
+    ) -> None:
+        """Initialize this RateLimiter.
 
         Args:
             delay: Delay between calls in seconds
+            rate: Calls per second, alternative to `delay`
+            burst: Number of calls that can be made at once, before the rate applies
+            state_path: File to keep the bucket in, so all processes using the same file share a single limit.
+                By default, the limit only applies to this process.
         """
-        self.delay = delay
+        if (rate is None) == (delay is None):
+            raise ValueError("Specify either rate or delay")
+        self.rate = rate if rate is not None else 1 / delay
+        self.burst = burst
+        self.state_path = Path(state_path) if state_path is not None else None
         self.lock = threading.Lock()
-        self.last_call = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+        self.calls = 0
+        """Number of calls so far."""
+        self.total_wait = 0.0
+        """Total time calls waited for the rate limit, in seconds."""
+        self.max_wait = 0.0
+        """Longest time a single call waited for the rate limit, in seconds."""
+
+    @property
+    def delay(self) -> float:
+        """Delay between calls in seconds, once the burst is used up."""
+        return 1 / self.rate
+
+    @property
+    def mean_wait(self) -> float:
+        """Mean time calls waited for the rate limit, in seconds."""
+        return self.total_wait / self.calls if self.calls > 0 else 0.0
+
+    def _take(self, tokens: float, updated: float, now: float) -> tuple[float, float]:
+        """Take a token from a bucket.
+
+        Returns:
+            The remaining tokens, and how long to wait for the token. Tokens become negative while calls are waiting.
+        """
+        tokens = min(self.burst, tokens + (now - updated) * self.rate) - 1
+        return tokens, max(-tokens / self.rate, 0.0)
+
+    def _load_state(self, now: float) -> tuple[float, float]:
+        """Read the shared bucket. Must hold the lock of the state file."""
+        data = self.state_path.read_bytes() if self.state_path.is_file() else b""
+        if len(data) == struct.calcsize(_STATE_FORMAT):
+            tokens, updated = struct.unpack(_STATE_FORMAT, data)
+            if updated <= now:  # Otherwise, the host was rebooted
+                return tokens, updated
+        return self.burst, now  # New bucket
+
+    def _reserve(self) -> float:
+        """Reserve a token and return how long to wait for it."""
+        with self.lock:
+            # time.monotonic is system-wide, so it can be compared between processes
+            now = time.monotonic()
+            if self.state_path is None:
+                self._tokens, wait = self._take(self._tokens, self._updated, now)
+                self._updated = now
+            else:
+                with FileLock(self.state_path):
+                    tokens, updated = self._load_state(now)
+                    tokens, wait = self._take(tokens, updated, now)
+                    self.state_path.write_bytes(struct.pack(_STATE_FORMAT, tokens, now))
+
+            self.calls += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        return wait
 
     def __enter__(self) -> Self:
-        with self.lock:  # Prevent asynchronous access
-            # Check time since last call
-            if time.time() < self.last_call + self.delay:  # Wait if neccessary
-                time.sleep(self.last_call + self.delay - time.time())
-            self.last_call = time.time()
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    async def __aenter__(self) -> Self:
+        wait = await asyncio.to_thread(self._reserve)  # May wait for the lock of the state file
+        if wait > 0:
+            await asyncio.sleep(wait)
         return self
 
     def __exit__(
@@ -34,3 +122,11 @@ class RateLimiter:
         exc_tb: TracebackType | None,
     ) -> None:
         pass  # Nothing to do here
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        pass  # Nothing to do here
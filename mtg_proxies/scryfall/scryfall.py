@@ -6,26 +6,106 @@ See:
 
 from __future__ import annotations
 
-import json
-import pickle
-import threading
+import hashlib
+import os
+import time
 from collections import defaultdict
-from functools import cache
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import cache, cached_property
 from importlib.metadata import version
-from pathlib import Path
+from itertools import islice
+from pathlib import Path, PurePosixPath
 from tempfile import gettempdir
-from typing import Literal, overload
+from typing import Any, Literal, overload
+from urllib.parse import urlsplit
 
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+from mtg_proxies.scryfall.bulk import BulkFile, BulkManifest, CardDiff, diff_card_stores
+from mtg_proxies.scryfall.cache import CacheEntry, CacheManager, CacheStats, format_size, parse_size
+from mtg_proxies.scryfall.card import CardView
+from mtg_proxies.scryfall.file_lock import LOCK_FOLDER_NAME, FileLock
+from mtg_proxies.scryfall.http_cache import ResponseCache
+from mtg_proxies.scryfall.index import CardIndex
+from mtg_proxies.scryfall.ingest import iter_json_array
+from mtg_proxies.scryfall.object_store import ObjectStore
+from mtg_proxies.scryfall.partial_download import PartialDownload
+from mtg_proxies.scryfall.prices import PriceIndex
+from mtg_proxies.scryfall.ranking import PrintRanking, print_score
 from mtg_proxies.scryfall.rate_limit import RateLimiter
+from mtg_proxies.scryfall.search_cache import SEARCH_CACHE_FILE_NAME, SearchCache
+from mtg_proxies.scryfall.sqlite_index import COLUMNS as SQLITE_INDEX_COLUMNS
+from mtg_proxies.scryfall.sqlite_index import SqliteCardIndex
+from mtg_proxies.scryfall.store import CardStore, build_card_store, is_card_store
+from mtg_proxies.scryfall.token_graph import TokenGraph
 
-_cache_folder = Path(gettempdir()) / "scryfall_cache"
+_cache_folder = Path(os.environ.get("MTG_PROXIES_CACHE_DIR") or Path(gettempdir()) / "scryfall_cache")
 _cache_folder.mkdir(parents=True, exist_ok=True)  # Create cache folder
-scryfall_rate_limiter = RateLimiter(delay=0.1)
-_download_lock = threading.Lock()
+scryfall_rate_limiter = RateLimiter(rate=10, state_path=_cache_folder / "rate_limit.bin")  # Shared by all processes
+DOWNLOAD_WORKERS = 8  # Default number of concurrent downloads
+DOWNLOAD_RETRIES = 5  # Default number of retries of failed downloads
+DOWNLOAD_TIMEOUT = 30  # Seconds to wait for the server to respond or to send more data
+_bulk_manifest = BulkManifest(_cache_folder / "bulk_manifest.json")
+_object_store = ObjectStore(_cache_folder)
+_response_cache = ResponseCache(
+    _cache_folder / "responses", max_age=float(os.environ.get("MTG_PROXIES_API_MAX_AGE", 0))
+)
+_loaded_bulk_files: dict[str, BulkFile] = {}
+_stored_cards_by_id: dict[Path, Mapping[str, CardView]] = {}  # Card stores opened without refreshing, by path
+_refresh_hooks: list[Callable[[str, CardDiff | None], None]] = []
+
+
+def _cache_size() -> int | None:
+    size = os.environ.get("MTG_PROXIES_CACHE_SIZE")
+    return parse_size(size) if size else None
+
+
+def _current_bulk_files() -> list[str]:
+    """Names of the bulk data files and card stores in use, according to the manifest of any process."""
+    manifest = BulkManifest(_bulk_manifest.path)
+    names = []
+    for bulk_file in manifest.files.values():
+        names.append(_store_path(bulk_file).name)
+        json_file = _object_store.get(bulk_file.download_uri)
+        if json_file is not None:
+            names.append(json_file.name)
+    return names
+
+
+_cache_manager = CacheManager(
+    _cache_folder,
+    max_bytes=_cache_size(),
+    pinned=_current_bulk_files,
+    internal=(
+        LOCK_FOLDER_NAME,
+        _bulk_manifest.path.name,
+        scryfall_rate_limiter.state_path.name,
+        SEARCH_CACHE_FILE_NAME,
+        _response_cache.folder.name,  # Bounded by itself
+    ),
+    objects=_object_store,
+)
+
+
+def _download_workers() -> int:
+    return int(os.environ.get("MTG_PROXIES_DOWNLOAD_WORKERS", DOWNLOAD_WORKERS))
+
+
+@cache
+def _session() -> requests.Session:
+    """Shared HTTP session, which keeps connections alive between requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=max(_download_workers(), DOWNLOAD_WORKERS))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": f"mtg-proxies/{version('mtg-proxies')}", "Accept": "*/*"})
+    return session
 
 
 def get_image(image_uri: str, *, silent: bool = False) -> str:
@@ -36,76 +116,421 @@ def get_image(image_uri: str, *, silent: bool = False) -> str:
     Returns:
         string: Path to local file.
     """
-    split = image_uri.split("/")
-    file_name = split[-5] + "_" + split[-4] + "_" + split[-1].split("?")[0]
-    return get_file(file_name, image_uri, silent=silent)
+    return get_file(image_uri, silent=silent)
+
+
+def get_images(
+    image_uris: Iterable[str], *, max_workers: int | None = None, desc: str = "Fetching images", silent: bool = False
+) -> list[str]:
+    """Download many card artworks concurrently and return the paths to local copies.
+
+    Images on the Scryfall CDN are only limited by the number of workers, API calls still respect the rate limit.
+
+    Args:
+        image_uris: Uris of the images, may contain duplicates
+        max_workers: Maximum number of concurrent downloads. Defaults to `MTG_PROXIES_DOWNLOAD_WORKERS` or 8.
+        desc: Description of the progress bar
+        silent: Don't show a progress bar
+
+    Returns:
+        Path to the local file of each uri, in the same order
+    """
+    if max_workers is None:
+        max_workers = _download_workers()
+    image_uris = list(image_uris)
+    unique_uris = list(dict.fromkeys(image_uris))
+
+    paths = {}
+    with (
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+        tqdm(total=len(unique_uris), desc=desc, disable=silent) as pbar,
+    ):
+        futures = {executor.submit(get_image, image_uri, silent=True): image_uri for image_uri in unique_uris}
+        for future in as_completed(futures):
+            paths[futures[future]] = future.result()
+            pbar.update(1)
+
+    # Keep the cache within its budget, but never evict the images just fetched
+    _cache_manager.prune(keep=paths.values())
+    return [paths[image_uri] for image_uri in image_uris]
+
+
+@dataclass(slots=True)
+class PrefetchStats:
+    """Outcome of prefetching images."""
+
+    requested: int = 0
+    """Number of distinct images requested."""
+    skipped: int = 0
+    """Number of images that were cached already."""
+    downloaded: int = 0
+    """Number of images downloaded."""
+    failed: int = 0
+    """Number of images that couldn't be downloaded."""
+    bytes: int = 0
+    """Size of the downloaded images in bytes."""
+
+
+def prefetch_images(
+    image_uris: Iterable[str], *, max_workers: int | None = None, desc: str = "Prefetching images", silent: bool = False
+) -> PrefetchStats:
+    """Download many card artworks into the cache, so they are available offline later.
+
+    Unlike `get_images`, failed downloads don't abort the others. As downloads are only cached once complete, an
+    interrupted prefetch continues with the missing images when run again.
 
+    Args:
+        image_uris: Uris of the images, may contain duplicates
+        max_workers: Maximum number of concurrent downloads. Defaults to `MTG_PROXIES_DOWNLOAD_WORKERS` or 8.
+        desc: Description of the progress bar
+        silent: Don't show a progress bar
 
-def get_file(file_name: str, url: str, *, silent: bool = False) -> str:
+    Returns:
+        Counts of skipped, downloaded and failed images
+    """
+    if max_workers is None:
+        max_workers = _download_workers()
+    unique_uris = list(dict.fromkeys(image_uris))
+    missing_uris = [image_uri for image_uri in unique_uris if cached_file(image_uri) is None]
+    stats = PrefetchStats(requested=len(unique_uris), skipped=len(unique_uris) - len(missing_uris))
+
+    with (
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+        tqdm(total=len(unique_uris), initial=stats.skipped, desc=desc, disable=silent) as pbar,
+    ):
+        futures = {executor.submit(get_image, image_uri, silent=True): image_uri for image_uri in missing_uris}
+        for future in as_completed(futures):
+            try:
+                stats.bytes += Path(future.result()).stat().st_size
+                stats.downloaded += 1
+            except (requests.RequestException, ValueError, OSError) as e:
+                stats.failed += 1
+                pbar.write(f"Failed to download {futures[future]}: {e}")
+            pbar.set_postfix(downloaded=format_size(stats.bytes), failed=stats.failed, refresh=False)
+            pbar.update(1)
+
+    # Keep the cache within its budget, but never evict the images just prefetched
+    paths = [cached_file(image_uri) for image_uri in unique_uris]
+    _cache_manager.prune(keep=[path for path in paths if path is not None])
+    return stats
+
+
+def _url_file_name(url: str) -> str:
+    return PurePosixPath(urlsplit(url).path).name
+
+
+def cached_file(url: str, *, verify: bool = False) -> Path | None:
+    """Get the local copy of a downloaded file.
+
+    Args:
+        url: Url of the file
+        verify: Check that the file still exists, and forget it if it was deleted outside the cache
+
+    Returns:
+        Path to the cached file, or `None` if the url isn't cached
+    """
+    path = _object_store.get(url)
+    if verify and path is not None and not path.is_file():
+        _object_store.discard(url, path)
+        return None
+    return path
+
+
+def download_path(url: str) -> Path:
+    """Get the path to download a file to, before it is moved into the cache with `commit_download`.
+
+    Lock it with a `FileLock` for the download, so each file is only downloaded once. Its folder is created.
+    """
+    path = _object_store.objects_folder / hashlib.sha256(url.encode()).hexdigest()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def commit_download(url: str, path: Path | str) -> Path:
+    """Move a complete download into the cache.
+
+    Returns:
+        Path to the cached file
+    """
+    return _object_store.put(url, path, PurePosixPath(_url_file_name(url)).suffix)
+
+
+def record_access(path: Path | str) -> None:
+    """Record the use of a cached file, so `prune_cache` evicts it later."""
+    _cache_manager.record_access(path)
+
+
+def rate_limit(url: str) -> RateLimiter | nullcontext:
+    """Get the rate limit to apply to a request. Only the API is limited, not the CDN of images and bulk data.
+
+    Returns:
+        Context manager, usable both as regular and as async context manager
+    """
+    return scryfall_rate_limiter if "api.scryfall.com" in url else nullcontext()
+
+
+def get_file(url: str, *, silent: bool = False, size: int | None = None) -> str:
     """Download a file and return the path to a local copy.
 
-    Uses cache and Scryfall API call rate limit.
+    Uses cache and Scryfall API call rate limit. Files are cached by url, identical files from different urls are
+    stored once. Different files can be downloaded concurrently, concurrent requests for the same file by other
+    threads or processes wait for a single download.
+
+    Args:
+        url: Url of the file
+        silent: Don't show a progress bar
+        size: Expected size of the file in bytes, if known
 
     Returns:
         string: Path to local file.
     """
-    file_path = _cache_folder / file_name
-    with _download_lock:
-        if not file_path.is_file():
-            if "api.scryfall.com" in url:  # Apply rate limit
-                with scryfall_rate_limiter:
-                    download(url, file_path, silent=silent)
-            else:
-                download(url, file_path, silent=silent)
-
+    file_path = cached_file(url, verify=True)
+    if file_path is None:
+        path = download_path(url)
+        with FileLock(path):
+            file_path = cached_file(url, verify=True)
+            if file_path is None:
+                with rate_limit(url):
+                    download(url, path, silent=silent, size=size)
+                file_path = commit_download(url, path)
+
+    record_access(file_path)
     return str(file_path)
 
 
-def download(url: str, dst: Path | str, *, chunk_size: int = 1024 * 4, silent: bool = False) -> None:
-    """Download a file with a tqdm progress bar."""
-    with requests.get(
-        url, stream=True, headers={"User-Agent": f"mtg-proxies/{version('mtg-proxies')}", "Accept": "*/*"}
-    ) as req:
+def cache_stats() -> CacheStats:
+    """Summarize the contents of the download cache."""
+    return _cache_manager.stats()
+
+
+def prune_cache(
+    max_bytes: int | None = None, policy: Literal["lru", "lfu"] = "lru", *, dry_run: bool = False
+) -> list[CacheEntry]:
+    """Remove old versions of bulk data and evict files until the download cache fits into its budget.
+
+    Args:
+        max_bytes: Budget in bytes. Defaults to `MTG_PROXIES_CACHE_SIZE`, without one only old versions are removed.
+        policy: Evict the least recently used (`lru`) or the least frequently used (`lfu`) files first
+        dry_run: Only determine which files would be removed
+
+    Returns:
+        The removed files
+    """
+    stale = _remove_stale_bulk_files(dry_run=dry_run)
+    return stale + _cache_manager.prune(max_bytes, policy, keep=[entry.path for entry in stale], dry_run=dry_run)
+
+
+def _remove_stale_bulk_files(keep: Iterable[BulkFile] = (), *, dry_run: bool = False) -> list[CacheEntry]:
+    """Remove previous versions of bulk data files and card stores.
+
+    Card stores opened by this process are kept, as are the versions to `keep`.
+
+    Returns:
+        The removed files
+    """
+    in_use = [*_loaded_bulk_files.values(), *keep]
+    stale_names = (
+        _stale_bulk_files()
+        - {_store_path(bulk_file).name for bulk_file in in_use}
+        - {path.name for path in _stored_cards_by_id}
+    )
+    stale = [entry for entry in _cache_manager.entries()[0] if entry.path.name in stale_names]
+    if not dry_run and len(stale) > 0:
+        for entry in stale:
+            _cache_manager.remove(entry.path)
+        _cache_manager.compact()
+    return stale
+
+
+def download(
+    url: str,
+    dst: Path | str,
+    *,
+    chunk_size: int = 1024 * 4,
+    silent: bool = False,
+    size: int | None = None,
+    retries: int = DOWNLOAD_RETRIES,
+    backoff: float = 1.0,
+) -> None:
+    """Download a file with a tqdm progress bar.
+
+    The file is written to `<dst>.part` first and renamed when complete, so it never exists partially. When the
+    connection drops, the download is retried with exponential backoff and continues where it stopped with a `Range`
+    request, unless the file changed on the server in between. The partial file is kept on failure, so even the next
+    call continues it. Only one download to the same destination may run at a time, e.g. guard it with a `FileLock`.
+
+    Args:
+        url: Url of the file
+        dst: Path to save the file to
+        chunk_size: Size of the chunks to write
+        silent: Don't show a progress bar
+        size: Expected size of the file in bytes, which is verified after the download
+        retries: Number of times to retry a failed download
+        backoff: Seconds to wait before the first retry, doubling with every further retry
+    """
+    partial = PartialDownload(url, dst, size)
+    for attempt in range(retries + 1):
+        try:
+            _download_part(partial, chunk_size=chunk_size, silent=silent)
+            break
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, ValueError):
+            if attempt == retries:
+                raise
+        except requests.HTTPError as e:
+            if attempt == retries or e.response.status_code < 500:  # Client errors don't go away by retrying
+                raise
+        time.sleep(backoff * 2**attempt)
+    partial.finish()
+
+
+def _download_part(partial: PartialDownload, *, chunk_size: int, silent: bool) -> None:
+    """Download the rest of a partially downloaded file."""
+    with _session().get(partial.url, stream=True, headers=partial.headers(), timeout=DOWNLOAD_TIMEOUT) as req:
+        if partial.is_complete(req.status_code, req.headers):
+            return
         req.raise_for_status()
-        file_size = int(req.headers["Content-Length"]) if "Content-Length" in req.headers else None
         with (
-            open(dst, "xb") as f,
+            partial.start(req.status_code, req.headers) as f,
             tqdm(
-                total=file_size,
+                total=partial.total,
+                initial=partial.offset,
                 unit="B",
                 unit_scale=True,
-                desc=url.split("/")[-1],
+                desc=partial.url.split("/")[-1],
                 disable=silent,
             ) as pbar,
         ):
             for chunk in req.iter_content(chunk_size=chunk_size):
                 if chunk:
                     f.write(chunk)
-                    pbar.update(chunk_size)
+                    pbar.update(len(chunk))
+    partial.verify()
+
+
+def iter_depaginate(url: str, *, use_cache: bool = True) -> Iterator[dict]:
+    """Iterate Scryfall search results, requesting further pages only when needed.
+
+    Uses Scryfall API call rate limit.
+
+    Args:
+        url: Url of the first page
+        use_cache: Cache the pages and revalidate them with conditional requests
+
+    Yields:
+        The `data` entries of each page, as soon as the page arrives
+
+    Raises:
+        ValueError: If Scryfall returns an error, other than `not_found` for searches without results
+    """
+    while url is not None:
+        if use_cache:
+            response = _response_cache.get_json(url, _session(), scryfall_rate_limiter)
+        else:
+            with scryfall_rate_limiter:
+                response = _session().get(url).json()
+        data, url = parse_page(url, response)
+        yield from data
+
+
+def parse_page(url: str, response: dict) -> tuple[list[dict], str | None]:
+    """Get the entries of a page of Scryfall results and the url of the next page.
+
+    Args:
+        url: Url of the page
+        response: JSON object of the page
+
+    Returns:
+        The `data` entries and the url of the next page, or `None` if this is the last one
+
+    Raises:
+        ValueError: If Scryfall returned an error, other than `not_found` for searches without results
+    """
+    assert response["object"]
+
+    if response["object"] == "error" and response.get("status") != 404:
+        raise ValueError(f"Scryfall returned an error for {url}: {response.get('details')}")
+    if "data" not in response:
+        return [], None
+    return response["data"], response["next_page"] if response["has_more"] else None
+
+
+def response_cache() -> ResponseCache:
+    """Get the cache of API responses, see `MTG_PROXIES_API_MAX_AGE`."""
+    return _response_cache
 
 
 def depaginate(url: str) -> list[dict]:
     """Depaginates Scryfall search results.
 
-    Uses cache and Scryfall API call rate limit.
+    Uses cache and Scryfall API call rate limit. Pages are cached and revalidated with conditional requests.
 
     Returns:
         list: Concatenation of all `data` entries.
     """
-    with scryfall_rate_limiter:
-        response = requests.get(url).json()
-    assert response["object"]
+    return list(iter_depaginate(url))
 
-    if "data" not in response:
-        return []
-    data = response["data"]
-    if response["has_more"]:
-        data = data + depaginate(response["next_page"])
 
-    return data
+@cache
+def _get_search_cache() -> SearchCache:
+    return SearchCache(
+        _cache_folder / SEARCH_CACHE_FILE_NAME, ttl=float(os.environ.get("MTG_PROXIES_SEARCH_TTL", 24 * 60 * 60))
+    )
+
+
+def iter_search(q: str, limit: int | None = None) -> Iterator[Mapping[str, Any]]:
+    """Perform Scryfall search, yielding cards as their pages arrive.
+
+    Stopping the iteration early saves the requests for the remaining pages. The ids of complete results are cached
+    for `MTG_PROXIES_SEARCH_TTL` seconds (default: one day). Repeated searches, also by other processes, read the
+    cards from the local card store as is, without checking Scryfall for a newer version.
+
+    Args:
+        q: Search query
+        limit: Maximum number of cards to yield
+
+    See:
+        https://scryfall.com/docs/api/cards/search
+    """
+    cards = _iter_search(q)
+    return cards if limit is None else islice(cards, limit)
+
+
+def _local_cards_by_id() -> Mapping[str, CardView] | None:
+    """Look up cards by id in the local card store, without refreshing it.
+
+    Returns:
+        Mapping {id: card}, or `None` if there is no local card store
+    """
+    if "default_cards" in _loaded_bulk_files:
+        return card_by_id()
+    bulk_file = _bulk_manifest.get("default_cards")
+    if bulk_file is None:
+        return None
+    store_path = _store_path(bulk_file)
+    cards = _stored_cards_by_id.get(store_path)
+    if cards is None and is_card_store(store_path):
+        cards = _stored_cards_by_id[store_path] = _CardsById(CardIndex(CardStore(store_path)))
+    return cards
 
 
-def search(q: str) -> list[dict]:
+def _iter_search(q: str) -> Iterator[Mapping[str, Any]]:
+    ids = _get_search_cache().get(q)
+    cards = _local_cards_by_id() if ids is not None else None
+    # Unless the card store is older than the search
+    if cards is not None and all(card_id in cards for card_id in ids):
+        yield from (cards[card_id] for card_id in ids)
+        return
+
+    # Search pages are not cached themselves, only the ids
+    ids = []
+    for card in iter_depaginate(f"https://api.scryfall.com/cards/search?q={q}&format=json", use_cache=False):
+        ids.append(card["id"])
+        yield card
+    if len(ids) > 0:  # Don't cache searches without results, e.g. misspelled queries
+        _get_search_cache().put(q, ids)  # Only reached once all pages arrived
+
+
+def search(q: str) -> list[Mapping[str, Any]]:
     """Perform Scryfall search.
 
     Returns:
@@ -114,26 +539,113 @@ def search(q: str) -> list[dict]:
     See:
         https://scryfall.com/docs/api/cards/search
     """
-    return depaginate(f"https://api.scryfall.com/cards/search?q={q}&format=json")
+    return list(iter_search(q))
 
 
-@cache
-def _get_database(database_name: str = "default_cards") -> list[dict]:
+def _bulk_data(database_name: str) -> dict:
     databases = depaginate("https://api.scryfall.com/bulk-data")
     bulk_data = [database for database in databases if database["type"] == database_name]
     if len(bulk_data) != 1:
         raise ValueError(f"Unknown database {database_name}")
+    return bulk_data[0]
+
+
+def _store_path(bulk_file: BulkFile) -> Path:
+    return (_cache_folder / bulk_file.file_name).with_suffix(".store")
 
-    bulk_file = Path(get_file(bulk_data[0]["download_uri"].split("/")[-1], bulk_data[0]["download_uri"]))
-    pickle_file = bulk_file.with_suffix(".pickle")
-    if not pickle_file.is_file():  # Convert json to pickle
-        with open(bulk_file, encoding="utf-8") as json_file:
-            data = json.load(json_file)
-        with open(pickle_file, "wb") as pickle_file:
-            pickle.dump(data, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
-        return data
-    with open(pickle_file, "rb") as f:
-        return pickle.load(f)
+
+def _stale_bulk_files() -> set[str]:
+    """Names of previous versions of bulk data files and card stores, which are no longer in use."""
+    manifest = BulkManifest(_bulk_manifest.path)
+    prefixes = tuple(type_.replace("_", "-") + "-" for type_ in manifest.files)
+    names = {
+        path.name
+        for path in _cache_folder.iterdir()
+        if path.name.startswith(prefixes) and path.suffix in (".json", ".store", ".pickle")
+    }
+    names |= {path.name for url, path in _object_store.items() if _url_file_name(url).startswith(prefixes)}
+    return names - set(_current_bulk_files())
+
+
+def _update_database(database_name: str, keep: BulkFile | None = None) -> BulkFile:
+    """Make sure the local copy of a bulk data file is up-to-date.
+
+    Downloads the bulk data file and builds its card store only if Scryfall has a newer version than the manifest.
+    Previous versions are removed then, unless this process still uses their card store.
+
+    Args:
+        database_name: Scryfall bulk data type, e.g. `default_cards` or `oracle_cards`
+        keep: Previous version not to remove, e.g. to compare it with the new one
+
+    Returns:
+        The current version
+    """
+    bulk_data = _bulk_data(database_name)
+    bulk_file = _bulk_manifest.get(database_name)
+    if bulk_file is not None and bulk_file.is_current(bulk_data) and is_card_store(_store_path(bulk_file)):
+        return bulk_file  # Nothing changed
+
+    bulk_file = BulkFile.from_bulk_data(bulk_data)
+    json_file = Path(get_file(bulk_file.download_uri, size=bulk_file.size))
+    store_path = _store_path(bulk_file)
+    with FileLock(store_path):  # Convert json to card store, once per bulk file
+        if not is_card_store(store_path):
+            with open(json_file, encoding="utf-8") as f:
+                build_card_store(iter_json_array(f), store_path)
+    _bulk_manifest.update(bulk_file)
+    _remove_stale_bulk_files(keep=[keep] if keep is not None else [])
+    return bulk_file
+
+
+@cache
+def _get_database(database_name: str = "default_cards") -> CardStore:
+    bulk_file = _update_database(database_name)
+    _loaded_bulk_files[database_name] = bulk_file
+    return CardStore(_store_path(bulk_file))
+
+
+def on_refresh(hook: Callable[[str, CardDiff | None], None]) -> Callable[[str, CardDiff | None], None]:
+    """Register a function to call after a database has been refreshed.
+
+    Hooks are called with the name of the database and the differences to the previous version, or `None` if
+    those are unknown. Use this to patch caches derived from the database. Can be used as a decorator.
+    """
+    _refresh_hooks.append(hook)
+    return hook
+
+
+def refresh_database(database_name: str = "default_cards", *, diff: bool = False) -> bool:
+    """Update the local copy of a database if it changed upstream.
+
+    Derived indexes are only rebuilt if a new version was downloaded.
+
+    Args:
+        database_name: Scryfall bulk data type, e.g. `default_cards` or `oracle_cards`
+        diff: Find the cards that changed between the previous and the new version. The print ranking of the new
+            version is patched, so only the changed prints are scored again, and the differences are passed to the
+            refresh hooks. Prices are not compared, as they change daily for most cards, the price index is rebuilt.
+
+    Returns:
+        Whether the database changed
+    """
+    previous = _loaded_bulk_files.get(database_name) or _bulk_manifest.get(database_name)
+    current = _update_database(database_name, keep=previous if diff else None)
+    if current == previous:
+        return False
+
+    card_diff = None
+    if diff and previous is not None and is_card_store(_store_path(previous)):
+        previous_store, current_store = CardStore(_store_path(previous)), CardStore(_store_path(current))
+        card_diff = diff_card_stores(previous_store, current_store)
+        previous_ranking = PrintRanking.find(previous_store)
+        if previous_ranking is not None:
+            PrintRanking.open(current_store, previous_ranking, card_diff.changed)
+
+    for hook in _refresh_hooks:
+        hook(database_name, card_diff)
+    if diff:
+        _remove_stale_bulk_files()  # The previous version, once compared
+    return True
 
 
 def canonic_card_name(card_name: str) -> str:
@@ -144,7 +656,39 @@ def canonic_card_name(card_name: str) -> str:
     return card_name.replace("æ", "ae")  # Sometimes used, e.g. in "Vedalken Aethermage"
 
 
-def get_card(card_name: str, set_id: str | None = None, collector_number: str | None = None) -> dict | None:
+# Normalization of indexed attributes, other than lower case
+_index_normalization = {"name": canonic_card_name}
+
+
+@cache
+def _get_index(database_name: str = "default_cards") -> CardIndex:
+    return CardIndex(_get_database(database_name), normalize=_index_normalization)
+
+
+@cache
+def _get_sqlite_index(database_name: str = "default_cards") -> SqliteCardIndex | None:
+    """Open the SQLite index of a database, if enabled via the `MTG_PROXIES_SQLITE_INDEX` environment variable."""
+    if os.environ.get("MTG_PROXIES_SQLITE_INDEX", "0").lower() in ("", "0", "false", "no"):
+        return None
+    return SqliteCardIndex.open(_get_database(database_name), normalize=_index_normalization)
+
+
+@cache
+def _get_price_index(database_name: str = "default_cards") -> PriceIndex:
+    return PriceIndex(_get_database(database_name))
+
+
+@cache
+def _get_ranking(database_name: str = "default_cards") -> PrintRanking:
+    return PrintRanking.open(_get_database(database_name))
+
+
+@cache
+def _get_token_graph(database_name: str = "default_cards") -> TokenGraph:
+    return TokenGraph.open(_get_database(database_name))
+
+
+def get_card(card_name: str, set_id: str | None = None, collector_number: str | None = None) -> CardView | None:
     """Find a card by it's name and possibly set and collector number.
 
     In case, the Scryfall database contains multiple cards, the first is returned.
@@ -155,14 +699,14 @@ def get_card(card_name: str, set_id: str | None = None, collector_number: str |
         collector_number: Collector number, may be a string for e.g. promo suffixes
 
     Returns:
-        card: Dictionary of card, or `None` if not found.
+        card: View of the card, or `None` if not found.
     """
     cards = get_cards(name=card_name, set=set_id, collector_number=collector_number)
 
     return cards[0] if len(cards) > 0 else None
 
 
-def get_cards(database: str = "default_cards", **kwargs: str | None) -> list[dict]:
+def get_cards(database: str = "default_cards", **kwargs: str | None) -> list[CardView]:
     """Get all cards matching certain attributes.
 
     Matching is case insensitive.
@@ -175,19 +719,52 @@ def get_cards(database: str = "default_cards", **kwargs: str | None) -> list[dic
     Returns:
         List of all matching cards
     """
-    cards = _get_database(database)
+    return _views(_get_database(database), _get_rows(database, **kwargs))
+
 
+def _get_rows(database: str = "default_cards", **kwargs: str | None) -> np.ndarray:
+    """Get the rows of all cards matching certain attributes. See `get_cards`."""
+    query = {}
     for key, value in kwargs.items():
         if value is not None:
             value = value.lower()
             if key == "name":  # Normalize card name
                 value = canonic_card_name(value)
-            cards = [card for card in cards if key in card and card[key].lower() == value]
+            query[key] = value
 
-    return cards
+    sqlite_index = _get_sqlite_index(database)
+    if sqlite_index is not None:  # Resolve indexed attributes with a single query
+        indexed = {key: query.pop(key) for key in list(query) if key in SQLITE_INDEX_COLUMNS}
+        candidates = sqlite_index.rows(**indexed) if len(indexed) > 0 else None
+        return _get_database(database).rows(candidates, **query)
+
+    return _get_index(database).rows(**query)
+
+
+def _views(store: CardStore, rows: Iterable[int]) -> list[CardView]:
+    return [CardView(store, row) for row in rows]
+
+
+def get_card_names(database: str = "default_cards", exclude_layouts: Sequence[str] = ("art_series",)) -> list[str]:
+    """Get all distinct card names.
+
+    Args:
+        database: Scryfall bulk data type, e.g. `default_cards` or `oracle_cards`
+        exclude_layouts: Skip cards with these layouts
+
+    Returns:
+        Card names in order of their first occurrence in the database
+    """
+    store = _get_database(database)
+
+    excluded = [code for layout in exclude_layouts for code in store.codes("layout", layout)]
+    names = store.columns["name"][~np.isin(store.columns["layout"], excluded)]
+    codes, first_rows = np.unique(names, return_index=True)
 
+    return [store.categories["name"][code] for code in codes[np.argsort(first_rows)]]
 
-def get_faces(card: dict) -> list[dict]:
+
+def get_faces(card: Mapping[str, Any]) -> list[Mapping[str, Any]]:
     """All faces on this card.
 
     For single faced cards, this is just the card.
@@ -204,32 +781,42 @@ def get_faces(card: dict) -> list[dict]:
 
 @overload
 def recommend_print(
-    current: dict | None = None,
+    current: Mapping[str, Any] | None = None,
     *,
     card_name: str | None = None,
     oracle_id: str | None = None,
     mode: Literal["best"] = "best",
-) -> dict: ...
+) -> Mapping[str, Any]: ...
 
 
 @overload
 def recommend_print(
-    current: dict | None = None,
+    current: Mapping[str, Any] | None = None,
     *,
     card_name: str | None = None,
     oracle_id: str | None = None,
     mode: Literal["all", "choices"],
-) -> list[dict]: ...
+) -> list[Mapping[str, Any]]: ...
 
 
 def recommend_print(
-    current: dict | None = None,
+    current: Mapping[str, Any] | None = None,
     *,
     card_name: str | None = None,
     oracle_id: str | None = None,
     mode: Literal["best", "all", "choices"] = "best",
-) -> dict | list[dict]:
-    """Recommend a (better) print of a card."""
+) -> Mapping[str, Any] | list[Mapping[str, Any]]:
+    """Recommend a (better) print of a card.
+
+    Prints are ranked by their precomputed scores, see `mtg_proxies.scryfall.ranking`.
+
+    Args:
+        current: Print to improve on. It's kept if there is no better one and comes first in the other modes.
+        card_name: Consider all prints with this name, if neither `current` nor `oracle_id` is given
+        oracle_id: Consider all prints with this oracle id. Defaults to the oracle id of `current`.
+        mode: `best` for the single best print, `all` for all prints by descending score, or `choices` for the best
+            prints of each artwork
+    """
     if current is not None and oracle_id is None:  # Use oracle id of current
         if current.get("layout") == "reversible_card":
             # Reversible cards have the same oracle id for both faces
@@ -237,98 +824,134 @@ def recommend_print(
         else:
             oracle_id = current["oracle_id"]
 
-    alternatives = cards_by_oracle_id()[oracle_id] if oracle_id is not None else get_cards(name=card_name)
-
-    def score(card: dict) -> int:
-        points = 0
-        if card["set"] != "mb1" and card["border_color"] != "gold":
-            points += 1
-        if card["frame"] == "2015":
-            points += 2
-        if not card["digital"]:
-            points += 4
-        if card["border_color"] == "black" and (
-            mode != "best" or "frame_effects" not in card or "extendedart" not in card["frame_effects"]
-        ):
-            points += 8
-        if card["collector_number"][-1] not in ["p", "s"] and card["nonfoil"]:
-            points += 16
-        if card["highres_image"]:
-            points += 32
-        if card["lang"] == "en":
-            points += 64
-
-        return points
-
-    scores = [score(card) for card in alternatives]
+    ranking = _get_ranking()
 
     if mode == "best":
-        if current is not None and scores[alternatives.index(current)] == np.max(scores):
-            return current  # No better recommendation
+        # Oracle ids have a table of their best prints
+        best = ranking.best_print(oracle_id) if oracle_id is not None else ranking.best(_get_rows(name=card_name))
+        if best is None:
+            if current is None:
+                raise ValueError(f"No prints of {card_name or oracle_id!r}")
+            return current
+
+        if current is not None:
+            if isinstance(current, CardView) and current.store is ranking.store:
+                current_score = ranking.best_scores[current.row]
+            else:
+                current_score = print_score(current, penalize_extended_art=True)
+            if current_score >= ranking.best_scores[best]:
+                return current  # No better recommendation
 
         # Return print with highest score
-        return alternatives[np.argmax(scores)]
-    if mode == "all":
-        recommendations = list(np.array(alternatives)[np.argsort(scores)][::-1])
+        return CardView(ranking.store, best)
+    if mode in ("all", "choices"):
+        rows = _get_index().lookup("oracle_id", oracle_id) if oracle_id is not None else _get_rows(name=card_name)
+        # Return all cards in descending order, or only the best of each artwork
+        recommendations = _views(ranking.store, ranking.ranked(rows) if mode == "all" else ranking.choices(rows))
 
         # Bring current print to front
         if current is not None:
-            if current in recommendations:
-                recommendations.remove(current)
-            recommendations = [current, *recommendations]
+            recommendations = [current, *(c for c in recommendations if c["id"] != current["id"])]
 
-        # Return all card in descending order
         return recommendations
-    if mode == "choices":
-        artworks = np.array([
-            get_faces(card)[0]["illustration_id"] if "illustration_id" in get_faces(card)[0] else card["id"]
-            for card in alternatives
-        ])  # Not all cards have illustrations, use id instead
-        choices = []
-        for artwork in set(artworks):
-            artwork_alternatives = np.array(alternatives)[artworks == artwork]
-            artwork_scores = np.array(scores)[artworks == artwork]
-
-            recommendations = artwork_alternatives[artwork_scores == np.max(artwork_scores)]
-            # TODO: Sort again
-            choices.extend(recommendations)
+    raise ValueError(f"Unknown mode '{mode}'")
 
-        # Bring current print to front
-        if current is not None:
-            choices = [current, *(c for c in choices if c["id"] != current["id"])]
 
-        return choices
-    raise ValueError(f"Unknown mode '{mode}'")
+def recommend_prints(oracle_ids: Iterable[str]) -> list[CardView]:
+    """Recommend the best print of many cards at once.
+
+    Same as `recommend_print(oracle_id=oracle_id)` for each oracle id, but skips oracle ids without any print.
+    """
+    ranking = _get_ranking()
+    rows = (ranking.best_print(oracle_id) for oracle_id in oracle_ids)
+    return _views(ranking.store, (row for row in rows if row is not None))
+
+
+def get_related_tokens(oracle_ids: Iterable[str]) -> list[str]:
+    """Find the tokens related to any of some cards.
+
+    Uses the `all_parts` of all prints of the cards.
+
+    Args:
+        oracle_ids: Oracle ids of the cards
+
+    Returns:
+        Distinct oracle ids of the tokens
+    """
+    return _get_token_graph().tokens(oracle_ids)
+
+
+class _CardsById(Mapping[str, CardView]):
+    """Lazy lookup of cards by their id."""
+
+    def __init__(self, index: CardIndex) -> None:
+        self.index = index
+        self.store = index.store
+
+    def __getitem__(self, card_id: str) -> CardView:
+        rows = self.index.lookup("id", card_id.lower())
+        if len(rows) == 0:
+            raise KeyError(card_id)
+        return CardView(self.store, rows[0])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.store.value("id", row) for row in range(len(self.store)))
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+
+class _CardsByOracleId(Mapping[str, list[CardView]]):
+    """Lazy lookup of cards by their oracle id.
+
+    Like a `defaultdict`, unknown oracle ids map to an empty list.
+    """
+
+    def __init__(self, index: CardIndex) -> None:
+        self.index = index
+        self.store = index.store
+
+    def __getitem__(self, oracle_id: str) -> list[CardView]:
+        return _views(self.store, self.index.lookup("oracle_id", oracle_id))
+
+    def __contains__(self, oracle_id: object) -> bool:
+        return isinstance(oracle_id, str) and len(self.index.lookup("oracle_id", oracle_id)) > 0
+
+    @cached_property
+    def first_rows(self) -> np.ndarray:
+        """First row of each oracle id, in order of occurrence."""
+        oracle_ids, first_rows = np.unique(self.store.columns["oracle_id"], return_index=True)
+        return np.sort(first_rows[oracle_ids != np.void(bytes(16))])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.store.value("oracle_id", row) for row in self.first_rows)
+
+    def __len__(self) -> int:
+        return len(self.first_rows)
 
 
 @cache
-def card_by_id() -> dict[str, dict]:
-    """Create dictionary to look up cards by their id.
+def card_by_id() -> Mapping[str, CardView]:
+    """Create mapping to look up cards by their id.
 
     Faster than repeated lookup via get_cards().
 
     Returns:
-        dict {id: card}
+        mapping {id: card}
     """
-    return {c["id"]: c for c in get_cards()}
+    return _CardsById(_get_index())
 
 
 @cache
-def cards_by_oracle_id() -> dict[str, list[dict]]:
-    """Create dictionary to look up cards by their oracle id.
+def cards_by_oracle_id() -> Mapping[str, list[CardView]]:
+    """Create mapping to look up cards by their oracle id.
 
     Faster than repeated lookup via get_cards().
 
     Returns:
-        dict {id: [cards]}
+        mapping {id: [cards]}
     """
-    cards_by_oracle_id = defaultdict(list)
-    for c in get_cards():
-        if "oracle_id" in c:  # Not all cards have a oracle id, *sigh*
-            cards_by_oracle_id[c["oracle_id"]].append(c)
-        elif "card_faces" in c and "oracle_id" in c["card_faces"][0]:
-            cards_by_oracle_id[c["card_faces"][0]["oracle_id"]].append(c)
-    return cards_by_oracle_id
+    return _CardsByOracleId(_get_index())
 
 
 @cache
@@ -342,12 +965,15 @@ def oracle_ids_by_name() -> dict[str, list[str]]:
     Returns:
         dict {name: [oracle_ids]}
     """
+    store = _get_database()
+    art_series = store.codes("layout", "art_series")
+
     oracle_ids_by_name = defaultdict(set)
-    for oracle_id, cards in cards_by_oracle_id().items():
-        card = cards[0]
-        if card["layout"] == "art_series":  # Skip art series, as they have double faced names
+    for row in cards_by_oracle_id().first_rows:
+        if store.columns["layout"][row] in art_series:  # Skip art series, as they have double faced names
             continue
-        name = card["name"].lower()
+        oracle_id = store.value("oracle_id", row)
+        name = store.value("name", row).lower()
         # Use name and also front face only for double faced cards
         oracle_ids_by_name[name].add(oracle_id)
         if "//" in name:
@@ -365,18 +991,41 @@ def get_price(oracle_id: str, currency: str = "eur", foil: bool | None = None) -
         currency: `usd`, `eur` or `tix`
         foil: `False`, `True`, or `None` for any
     """
-    cards = cards_by_oracle_id()[oracle_id]
+    price = get_prices([oracle_id], currency, foil)[0]
+    return float(price) if not np.isnan(price) else None
 
-    slots = []
-    if not foil:
-        slots += [currency]
-    if (foil or foil is None) and currency != "tix":  # "TIX has no foil"
-        slots += [currency + "_foil"]
 
-    prices = [float(c["prices"][slot]) for c in cards for slot in slots if c["prices"][slot] is not None]
+def get_prices(oracle_ids: Iterable[str], currency: str = "eur", foil: bool | None = None) -> np.ndarray:
+    """Find lowest prices for many oracle ids at once.
 
-    if len(prices) == 0 and currency == "eur":  # Try dollar and apply conversion
-        usd = get_price(oracle_id, "usd")
-        return 0.83 * usd if usd is not None else None
+    Args:
+        oracle_ids: oracle_ids of cards, e.g. of all cards in a decklist
+        currency: `usd`, `eur` or `tix`
+        foil: `False`, `True`, or `None` for any
 
-    return min(prices) if len(prices) > 0 else None
+    Returns:
+        Array of the lowest price of each oracle id, `nan` if unknown
+    """
+    return _get_price_index().prices(oracle_ids, currency, foil)
+
+
+@on_refresh
+def _clear_caches(database_name: str, diff: CardDiff | None) -> None:
+    """Drop all lazily built indexes of the previous version.
+
+    They are bound to the previous card store. The print ranking was patched for the new version already, if possible.
+    """
+    for cached in (
+        _get_database,
+        _get_index,
+        _get_sqlite_index,
+        _get_price_index,
+        _get_ranking,
+        _get_token_graph,
+        card_by_id,
+        cards_by_oracle_id,
+        oracle_ids_by_name,
+    ):
+        cached.cache_clear()
+    _loaded_bulk_files.pop(database_name, None)
+    _stored_cards_by_id.clear()
@@ -0,0 +1,89 @@
+"""Persistent cache of Scryfall search results.
+
+Only the ids of the found cards are stored, the cards themselves are looked up in the local card store. Entries
+expire after a time to live, and the least recently used entries are dropped once the cache exceeds its size.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+SEARCH_CACHE_FILE_NAME = "searches.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    query TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    ids BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS searches_used_at ON searches (used_at);
+"""
+
+
+def normalize_query(q: str) -> str:
+    """Normalize a search query, so different spellings of the same query share a cache entry.
+
+    Scryfall search is case-insensitive and ignores repeated whitespace.
+    """
+    return " ".join(q.lower().split())
+
+
+class SearchCache:
+    """Card ids found by search queries, shared by all processes using the same file."""
+
+    def __init__(self, path: Path | str, ttl: float = 24 * 60 * 60, max_entries: int = 1000) -> None:
+        """Open a search cache, creating the file if necessary.
+
+        Args:
+            path: Path of the SQLite file
+            ttl: Seconds after which an entry expires
+            max_entries: Maximum number of queries to keep
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._con.executescript(_SCHEMA)
+
+    def get(self, q: str) -> list[str] | None:
+        """Get the ids of the cards found by a query.
+
+        Returns:
+            The ids in order of the results, or `None` if the query isn't cached or has expired
+        """
+        query, now = normalize_query(q), time.time()
+        with self._lock:
+            found = self._con.execute(
+                "SELECT ids FROM searches WHERE query = ? AND fetched_at > ?", (query, now - self.ttl)
+            ).fetchone()
+            if found is None:
+                return None
+            self._con.execute("UPDATE searches SET used_at = ? WHERE query = ?", (now, query))
+        ids = found[0]
+        return [str(uuid.UUID(bytes=ids[i : i + 16])) for i in range(0, len(ids), 16)]
+
+    def put(self, q: str, ids: list[str]) -> None:
+        """Store the ids of the cards found by a query, dropping the least recently used entries if necessary."""
+        query, now = normalize_query(q), time.time()
+        blob = b"".join(uuid.UUID(id_).bytes for id_ in ids)
+        with self._lock, self._con:
+            self._con.execute("BEGIN IMMEDIATE")  # Don't let other processes interleave the eviction
+            self._con.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?)", (query, now, now, blob))
+            self._con.execute(
+                "DELETE FROM searches WHERE query NOT IN (SELECT query FROM searches ORDER BY used_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._con.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._con.close()
@@ -0,0 +1,141 @@
+"""Persistent SQLite index of a card store.
+
+The index maps lower case attributes to rows of the card store, so a lookup is a single indexed query. As it lives
+on disk, separate processes can share it without building any in-memory index of their own.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Callable, Iterator, Mapping
+from pathlib import Path
+
+import numpy as np
+
+from mtg_proxies.scryfall.store import FLAG_FACE_ORACLE_ID, CardStore
+
+INDEX_FILE_NAME = "index.sqlite"
+
+# Indexed attributes and their columns in the index
+COLUMNS = {
+    "id": "id",
+    "oracle_id": "oracle_id",
+    "name": "name",
+    "set": "set_code",
+    "collector_number": "collector_number",
+    "lang": "lang",
+    "layout": "layout",
+}
+
+_SCHEMA = """
+CREATE TABLE cards (
+    row INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    oracle_id TEXT,
+    name TEXT,
+    set_code TEXT,
+    collector_number TEXT,
+    lang TEXT,
+    layout TEXT
+);
+CREATE INDEX cards_id ON cards (id);
+CREATE INDEX cards_oracle_id ON cards (oracle_id);
+CREATE INDEX cards_name ON cards (name);
+CREATE INDEX cards_set_collector_number ON cards (set_code, collector_number);
+"""
+
+
+def _rows(store: CardStore, normalize: Mapping[str, Callable[[str], str]]) -> Iterator[tuple]:
+    normalized_categories = {
+        column: [normalize.get(column, str.lower)(category) for category in store.categories[column]]
+        for column in ("name", "set", "collector_number", "lang", "layout")
+    }
+
+    def category(column: str, row: int) -> str | None:
+        code = store.columns[column][row]
+        return normalized_categories[column][code] if code >= 0 else None
+
+    flags = store.columns["flags"]
+    return (
+        (
+            row,
+            store.value("id", row),
+            store.value("oracle_id", row) if flags[row] & FLAG_FACE_ORACLE_ID == 0 else None,
+            category("name", row),
+            category("set", row),
+            category("collector_number", row),
+            category("lang", row),
+            category("layout", row),
+        )
+        for row in range(len(store))
+    )
+
+
+def build_sqlite_index(
+    store: CardStore, path: Path | str, normalize: Mapping[str, Callable[[str], str]] | None = None
+) -> None:
+    """Build a SQLite index for a card store.
+
+    The index is written to a temporary file first, so concurrent readers never see an incomplete index.
+
+    Args:
+        store: Card store to index
+        path: Path of the SQLite file
+        normalize: Normalization functions for categorical columns, by column. Defaults to `str.lower`.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    con = sqlite3.connect(tmp_path)
+    try:
+        with con:
+            con.executescript(_SCHEMA)
+            con.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _rows(store, normalize or {}))
+    finally:
+        con.close()
+    tmp_path.replace(path)
+
+
+class SqliteCardIndex:
+    """Read-only SQLite index of a card store."""
+
+    def __init__(self, path: Path | str) -> None:
+        """Open an existing SQLite index.
+
+        Args:
+            path: Path of the SQLite file
+        """
+        self.path = Path(path)
+        self._con = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+    @staticmethod
+    def open(store: CardStore, normalize: Mapping[str, Callable[[str], str]] | None = None) -> SqliteCardIndex:
+        """Open the index of a card store, building it if necessary.
+
+        Args:
+            store: Card store to index
+            normalize: Normalization functions for categorical columns, used when building the index
+        """
+        path = store.path / INDEX_FILE_NAME
+        if not path.is_file():
+            build_sqlite_index(store, path, normalize)
+        return SqliteCardIndex(path)
+
+    def rows(self, **kwargs: str) -> np.ndarray:
+        """Find all rows matching certain attributes.
+
+        Args:
+            kwargs: (key, value) pairs of indexed attributes with lower case values, e.g. `name="counterspell"`
+
+        Returns:
+            Sorted array of matching rows
+        """
+        where = " AND ".join(f"{COLUMNS[key]} = ?" for key in kwargs)
+        cursor = self._con.execute(f"SELECT row FROM cards WHERE {where} ORDER BY row", tuple(kwargs.values()))
+        return np.array([row for (row,) in cursor], dtype=np.intp)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._con.close()
@@ -0,0 +1,329 @@
+"""Columnar, memory-mapped storage of Scryfall bulk data.
+
+The store is a directory containing one raw binary file per column, an offset-indexed blob of the complete card
+objects and some json metadata. Frequently queried attributes are stored in fixed-width or categorical columns, so
+lookups don't require decoding any card objects. Everything is memory-mapped, so opening a store is almost free and
+only the accessed pages are ever loaded.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import shutil
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from functools import lru_cache
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+import numpy as np
+
+STORE_VERSION = 2
+
+UUID_COLUMNS = ("id", "oracle_id")
+CATEGORICAL_COLUMNS = ("name", "set", "collector_number", "lang", "layout")
+PRICE_COLUMNS = ("usd", "usd_foil", "usd_etched", "eur", "eur_foil", "tix")
+FLAGS = ("digital", "highres_image", "nonfoil", "foil", "promo", "reprint", "full_art", "oversized")
+
+# Set for cards without a top-level oracle id, where the oracle id column holds the one of the first face
+FLAG_FACE_ORACLE_ID = 1 << len(FLAGS)
+# Set for cards with a prices object, and for each key of it, as missing and null prices are both stored as NaN
+FLAG_PRICES = 1 << (len(FLAGS) + 1)
+FLAG_PRICE_KEYS = {column: 1 << (len(FLAGS) + 2 + i) for i, column in enumerate(PRICE_COLUMNS)}
+DECODED_CACHE_SIZE = 256  # Number of decoded card objects cached per store
+
+_COLUMN_DTYPES = {
+    **dict.fromkeys(UUID_COLUMNS, "V16"),
+    **dict.fromkeys(CATEGORICAL_COLUMNS, "<i4"),
+    **dict.fromkeys(PRICE_COLUMNS, "<f4"),
+    "flags": "<u2",
+}
+
+_NO_UUID = bytes(16)
+
+
+def _uuid_bytes(value: str | None) -> bytes:
+    return uuid.UUID(value).bytes if value is not None else _NO_UUID
+
+
+def _card_oracle_id(card: dict) -> tuple[str | None, bool]:
+    """Get the oracle id of a card and whether it was taken from the first face."""
+    if "oracle_id" in card:
+        return card["oracle_id"], False
+    if "card_faces" in card and "oracle_id" in card["card_faces"][0]:  # Reversible cards
+        return card["card_faces"][0]["oracle_id"], True
+    return None, False
+
+
+class CardStoreWriter:
+    """Incrementally write cards into a new card store.
+
+    Rows are buffered and flushed in chunks, so memory usage does not depend on the number of cards written.
+    The store is written to a temporary directory and only moved into place when the writer is closed successfully.
+    """
+
+    def __init__(self, path: Path | str, chunk_size: int = 4096) -> None:
+        """Create a new CardStoreWriter.
+
+        Args:
+            path: Directory of the store to create
+            chunk_size: Number of rows to buffer before flushing them to disk
+        """
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        if self._tmp_path.exists():  # Leftover of an interrupted build
+            shutil.rmtree(self._tmp_path)
+        self._tmp_path.mkdir(parents=True)
+
+        self.count = 0
+        self._buffers: dict[str, list] = {column: [] for column in _COLUMN_DTYPES}
+        self._files = {column: open(self._tmp_path / f"{column}.bin", "wb") for column in _COLUMN_DTYPES}  # noqa: SIM115
+        self._categories: dict[str, dict[str, int]] = {column: {} for column in CATEGORICAL_COLUMNS}
+        self._blob = open(self._tmp_path / "blob.bin", "wb")  # noqa: SIM115
+        self._offsets = open(self._tmp_path / "offsets.bin", "wb")  # noqa: SIM115
+        self._offset_buffer = [0]
+        self._blob_size = 0
+
+    def append(self, card: dict) -> None:
+        """Append a Scryfall card object to the store."""
+        buffers = self._buffers
+
+        oracle_id, from_face = _card_oracle_id(card)
+        buffers["id"].append(_uuid_bytes(card["id"]))
+        buffers["oracle_id"].append(_uuid_bytes(oracle_id))
+
+        for column in CATEGORICAL_COLUMNS:
+            value = card.get(column)
+            categories = self._categories[column]
+            buffers[column].append(-1 if value is None else categories.setdefault(value, len(categories)))
+
+        flags = FLAG_FACE_ORACLE_ID if from_face else 0
+        prices = card.get("prices")
+        if prices is not None:
+            flags |= FLAG_PRICES
+        prices = prices or {}
+        for column in PRICE_COLUMNS:
+            price = prices.get(column)
+            buffers[column].append(np.nan if price is None else float(price))
+            if column in prices:
+                flags |= FLAG_PRICE_KEYS[column]
+
+        for i, flag in enumerate(FLAGS):
+            if card.get(flag):
+                flags |= 1 << i
+        buffers["flags"].append(flags)
+
+        data = json.dumps(card, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._blob.write(data)
+        self._blob_size += len(data)
+        self._offset_buffer.append(self._blob_size)
+
+        self.count += 1
+        if len(self._offset_buffer) >= self.chunk_size:
+            self._flush()
+
+    def extend(self, cards: Iterable[dict]) -> None:
+        """Append multiple Scryfall card objects to the store."""
+        for card in cards:
+            self.append(card)
+
+    def _flush(self) -> None:
+        for column, dtype in _COLUMN_DTYPES.items():
+            if len(self._buffers[column]) > 0:
+                np.asarray(self._buffers[column], dtype=dtype).tofile(self._files[column])
+                self._buffers[column].clear()
+        np.asarray(self._offset_buffer, dtype="<u8").tofile(self._offsets)
+        self._offset_buffer.clear()
+
+    def _close_files(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._blob.close()
+        self._offsets.close()
+
+    def close(self) -> CardStore:
+        """Finish writing the store and open it for reading."""
+        self._flush()
+        self._close_files()
+
+        with open(self._tmp_path / "categories.json", "w", encoding="utf-8") as f:
+            json.dump({column: list(codes) for column, codes in self._categories.items()}, f, ensure_ascii=False)
+        with open(self._tmp_path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"version": STORE_VERSION, "count": self.count, "columns": _COLUMN_DTYPES}, f)
+
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self._tmp_path.rename(self.path)
+
+        return CardStore(self.path)
+
+    def abort(self) -> None:
+        """Discard the partially written store."""
+        self._close_files()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        if exc_type is not None:
+            self.abort()
+
+
+def build_card_store(cards: Iterable[dict], path: Path | str) -> CardStore:
+    """Build a card store from Scryfall card objects.
+
+    Args:
+        cards: Iterable of Scryfall card objects
+        path: Directory of the store to create
+
+    Returns:
+        The opened card store
+    """
+    with CardStoreWriter(path) as writer:
+        writer.extend(cards)
+        return writer.close()
+
+
+def is_card_store(path: Path | str) -> bool:
+    """Check whether a directory contains a complete card store of the current version."""
+    meta_file = Path(path) / "meta.json"
+    if not meta_file.is_file():
+        return False
+    with open(meta_file, encoding="utf-8") as f:
+        return json.load(f)["version"] == STORE_VERSION
+
+
+class CardStore:
+    """Read-only, memory-mapped view of a card store."""
+
+    def __init__(self, path: Path | str) -> None:
+        """Open a card store.
+
+        Args:
+            path: Directory of the store
+        """
+        self.path = Path(path)
+        with open(self.path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["version"] != STORE_VERSION:
+            raise ValueError(f"Unsupported card store version {meta['version']}")
+        self.count: int = meta["count"]
+
+        with open(self.path / "categories.json", encoding="utf-8") as f:
+            self.categories: dict[str, list[str]] = json.load(f)
+
+        self.columns: dict[str, np.ndarray] = {
+            column: self._memmap(f"{column}.bin", dtype) for column, dtype in meta["columns"].items()
+        }
+        self.offsets = self._memmap("offsets.bin", "<u8", self.count + 1)
+
+        with open(self.path / "blob.bin", "rb") as f:
+            # Empty files can't be mapped
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] > 0 else b""
+
+        # Cached per instance, so replaced stores aren't kept alive by the cache
+        self._decoded = lru_cache(maxsize=DECODED_CACHE_SIZE)(self.card)
+
+    def _memmap(self, file_name: str, dtype: str, count: int | None = None) -> np.ndarray:
+        count = self.count if count is None else count
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.path / file_name, dtype=dtype, mode="r", shape=(count,))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def raw(self, row: int) -> bytes:
+        """Get the encoded card object of a row."""
+        return self._blob[self.offsets[row] : self.offsets[row + 1]]
+
+    def card(self, row: int) -> dict[str, Any]:
+        """Decode the complete card object of a row."""
+        return json.loads(self.raw(row))
+
+    def decoded(self, row: int) -> dict[str, Any]:
+        """Decode the complete card object of a row, caching recently decoded rows.
+
+        The returned object is shared, so it must not be modified.
+        """
+        return self._decoded(int(row))
+
+    def cards(self, rows: Iterable[int]) -> list[dict[str, Any]]:
+        """Decode the complete card objects of multiple rows."""
+        return [self.card(row) for row in rows]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (self.card(row) for row in range(self.count))
+
+    def value(self, column: str, row: int) -> str | None:
+        """Get the decoded value of a categorical or uuid column."""
+        if column in UUID_COLUMNS:
+            value = self.columns[column][row].tobytes()
+            return str(uuid.UUID(bytes=value)) if value != _NO_UUID else None
+        code = self.columns[column][row]
+        return self.categories[column][code] if code >= 0 else None
+
+    def flag(self, flag: str) -> np.ndarray:
+        """Get a boolean array of a flag for all rows."""
+        return (self.columns["flags"] & (1 << FLAGS.index(flag))) != 0
+
+    def codes(self, column: str, value: str, normalize: Callable[[str], str] = str.lower) -> list[int]:
+        """Find the codes of all categories of a column matching a (normalized) value."""
+        return [code for code, category in enumerate(self.categories[column]) if normalize(category) == value]
+
+    def uuid_rows(self, column: str, value: str) -> np.ndarray:
+        """Find all rows with a certain uuid."""
+        try:
+            key = np.void(uuid.UUID(value).bytes)
+        except ValueError:  # Not a valid uuid, so there can't be any match
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.columns[column] == key)
+
+    def rows(
+        self,
+        candidates: np.ndarray | None = None,
+        normalize: Mapping[str, Callable[[str], str]] | None = None,
+        **kwargs: str,
+    ) -> np.ndarray:
+        """Find all rows matching certain attributes.
+
+        Matching is case insensitive. Queried values are expected to be lower case already.
+        Attributes not stored in a column are matched against the decoded card objects.
+
+        Args:
+            candidates: Sorted rows to restrict the search to. Defaults to all rows.
+            normalize: Normalization functions applied to categories before comparison, by column.
+                Defaults to `str.lower`.
+            kwargs: (key, value) pairs, e.g. `name="tendershoot dryad", set="rix"`
+
+        Returns:
+            Array of matching rows
+        """
+        normalize = normalize or {}
+        rows = np.arange(self.count) if candidates is None else candidates
+        for key, value in kwargs.items():
+            if key in UUID_COLUMNS:
+                matches = self.uuid_rows(key, value)
+                if key == "oracle_id":  # Only cards with a top-level oracle id have one
+                    matches = matches[(self.columns["flags"][matches] & FLAG_FACE_ORACLE_ID) == 0]
+                rows = np.intersect1d(rows, matches, assume_unique=True)
+            elif key in CATEGORICAL_COLUMNS:
+                codes = self.codes(key, value, normalize.get(key, str.lower))
+                rows = rows[np.isin(self.columns[key][rows], codes)]
+            else:  # Not stored in a column, fall back to decoding the cards
+                rows = np.array(
+                    [row for row, card in zip(rows, self.cards(rows)) if key in card and card[key].lower() == value],
+                    dtype=np.intp,
+                )
+            if len(rows) == 0:
+                break
+        return rows
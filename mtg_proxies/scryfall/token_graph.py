@@ -0,0 +1,110 @@
+"""Precomputed relationships between cards and the tokens they create.
+
+Scryfall lists related tokens in the `all_parts` of a card, but only by their id and not on every print. The graph
+collects these relations of all prints once and maps them to oracle ids, so finding the tokens of a card doesn't
+require looking at any of its prints.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from mtg_proxies.scryfall.store import CardStore
+
+TOKEN_GRAPH_FILE_NAME = "tokens.npy"
+
+_DTYPE = np.dtype([("oracle_id", "V16"), ("token_oracle_id", "V16")])
+_NO_UUID = np.void(bytes(16))
+
+
+def build_token_graph(store: CardStore, path: Path | str) -> None:
+    """Collect the tokens related to each oracle id of a card store.
+
+    The graph is written to a temporary file first, so concurrent readers never see an incomplete graph.
+
+    Args:
+        store: Card store to search for related tokens
+        path: Path of the graph file
+    """
+    rows, token_ids = [], []
+    for row in range(len(store)):
+        if b'"all_parts"' not in store.raw(row):  # Most cards have no related cards, so don't decode them
+            continue
+        for part in store.card(row)["all_parts"]:
+            if part["component"] == "token":
+                rows.append(row)
+                token_ids.append(uuid.UUID(part["id"]).bytes)
+
+    # Related cards are only provided by their id, resolve them to oracle ids
+    ids = store.columns["id"]
+    order = np.argsort(ids)
+    token_ids = np.array(token_ids, dtype="V16")
+    positions = np.minimum(np.searchsorted(ids, token_ids, sorter=order), max(len(ids) - 1, 0))
+    token_rows = order[positions] if len(ids) > 0 else positions
+    found = ids[token_rows] == token_ids if len(ids) > 0 else np.zeros(len(token_ids), dtype=bool)
+
+    edges = np.empty(int(found.sum()), dtype=_DTYPE)
+    edges["oracle_id"] = store.columns["oracle_id"][np.array(rows, dtype=np.intp)[found]]
+    edges["token_oracle_id"] = store.columns["oracle_id"][token_rows[found]]
+    edges = edges[(edges["oracle_id"] != _NO_UUID) & (edges["token_oracle_id"] != _NO_UUID)]
+
+    # Drop duplicates, but keep the order in which the tokens were found
+    _, first = np.unique(edges, return_index=True)
+    edges = edges[np.sort(first)]
+    edges = edges[np.argsort(edges["oracle_id"], kind="stable")]
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, edges)
+    tmp_path.replace(path)
+
+
+class TokenGraph:
+    """Tokens related to each oracle id of a card store."""
+
+    def __init__(self, path: Path | str) -> None:
+        """Load an existing token graph.
+
+        Args:
+            path: Path of the graph file
+        """
+        self.path = Path(path)
+        edges = np.load(self.path)
+        self.oracle_ids: np.ndarray = edges["oracle_id"]
+        """Oracle id of each edge, sorted."""
+        self.token_oracle_ids: np.ndarray = edges["token_oracle_id"]
+        """Oracle id of the related token of each edge."""
+
+    @staticmethod
+    def open(store: CardStore) -> TokenGraph:
+        """Open the token graph of a card store, building it if necessary."""
+        path = store.path / TOKEN_GRAPH_FILE_NAME
+        if not path.is_file():
+            build_token_graph(store, path)
+        return TokenGraph(path)
+
+    def tokens(self, oracle_ids: Iterable[str]) -> list[str]:
+        """Find the tokens related to any of some cards.
+
+        Args:
+            oracle_ids: Oracle ids of the cards
+
+        Returns:
+            Distinct oracle ids of the related tokens, in order of the cards
+        """
+        keys = np.array([uuid.UUID(oracle_id).bytes for oracle_id in oracle_ids], dtype="V16")
+        starts = np.searchsorted(self.oracle_ids, keys, side="left")
+        stops = np.searchsorted(self.oracle_ids, keys, side="right")
+
+        tokens = dict.fromkeys(
+            token_oracle_id.tobytes()
+            for start, stop in zip(starts, stops)
+            for token_oracle_id in self.token_oracle_ids[start:stop]
+        )
+        return [str(uuid.UUID(bytes=token)) for token in tokens]
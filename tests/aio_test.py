@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from mtg_proxies.decklists import Decklist
+
+
+@pytest.mark.parametrize(
+    ("faces", "expected_images"),
+    [
+        ("all", 7),
+        ("front", 6),
+        ("back", 1),
+    ],
+)
+def test_afetch_scans(example_decklist: Decklist, faces: str, expected_images: int) -> None:
+    from mtg_proxies import fetch_scans_scryfall
+    from mtg_proxies.scryfall import afetch_scans
+
+    images = asyncio.run(afetch_scans(example_decklist, faces=faces))
+
+    assert images == fetch_scans_scryfall(example_decklist, faces=faces)  # Same cache
+    assert len(images) == expected_images
+
+
+def test_adepaginate() -> None:
+    from mtg_proxies.scryfall import adepaginate
+    from mtg_proxies.scryfall.scryfall import depaginate
+
+    url = "https://api.scryfall.com/cards/search?q=set%3Alea+t%3Aland&format=json"
+
+    assert [card["id"] for card in asyncio.run(adepaginate(url))] == [card["id"] for card in depaginate(url)]
+
+
+def test_adepaginate_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, http_server: Callable[[type[BaseHTTPRequestHandler]], str]
+) -> None:
+    import json
+
+    pytest.importorskip("httpx")
+    from mtg_proxies.scryfall import adepaginate, scryfall
+    from mtg_proxies.scryfall.http_cache import ResponseCache
+
+    monkeypatch.setattr(scryfall, "_response_cache", ResponseCache(tmp_path))
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serves Scryfall error objects with the status code of the path."""
+
+        def do_GET(self) -> None:
+            status = int(self.path.strip("/"))
+            data = json.dumps({"object": "error", "status": status, "details": "Nope"}).encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    url = http_server(Handler)
+    assert asyncio.run(adepaginate(f"{url}/404")) == []  # Search without results
+    with pytest.raises(ValueError, match="Nope"):
+        asyncio.run(adepaginate(f"{url}/400"))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mtg_proxies.scryfall.store import CardStore
+
+
+def test_diff_card_stores(card: Callable[..., dict], card_store: Callable[..., CardStore]) -> None:
+    from mtg_proxies.scryfall.bulk import diff_card_stores
+
+    a = card("00000000-0000-0000-0000-00000000000a", oracle_id="00000000-0000-0000-0000-0000000000a0", name="A")
+    b = card("00000000-0000-0000-0000-00000000000b", oracle_id="00000000-0000-0000-0000-0000000000b0", name="B")
+    c = card("00000000-0000-0000-0000-00000000000c", oracle_id="00000000-0000-0000-0000-0000000000c0", name="C")
+    b_changed = {**b, "name": "B2"}
+    a_repriced = {**a, "prices": {"eur": "1.00"}, "edhrec_rank": 42}
+
+    old = card_store([a, b], "old")
+    new = card_store([c, b_changed, a_repriced], "new")
+    diff = diff_card_stores(old, new)
+
+    assert diff.added == {c["id"]}
+    assert diff.removed == set()
+    assert diff.changed == {b["id"]}  # Prices and ranks are not compared
+    assert diff.oracle_ids == {b["oracle_id"], c["oracle_id"]}
+    assert not diff_card_stores(old, old)
+
+
+def test_bulk_manifest(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.bulk import BulkFile, BulkManifest
+
+    bulk_data = {
+        "type": "default_cards",
+        "updated_at": "2026-10-18T09:02:11.118+00:00",
+        "size": 512,
+        "download_uri": "https://data.scryfall.io/default-cards/default-cards-20261018090211.json",
+    }
+    BulkManifest(tmp_path / "manifest.json").update(BulkFile.from_bulk_data(bulk_data))
+    bulk_file = BulkManifest(tmp_path / "manifest.json").get("default_cards")
+
+    assert bulk_file is not None
+    assert bulk_file.file_name == "default-cards-20261018090211.json"
+    assert bulk_file.is_current(bulk_data)
+    assert not bulk_file.is_current({**bulk_data, "size": 1024})
+
+
+def test_bulk_manifest_merges_updates(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.bulk import BulkFile, BulkManifest
+
+    # Two processes, which loaded the manifest before either updated it
+    first = BulkManifest(tmp_path / "manifest.json")
+    second = BulkManifest(tmp_path / "manifest.json")
+    first.update(BulkFile("default_cards", "2026-10-18", 512, "https://data.scryfall.io/default-cards-1.json"))
+    second.update(BulkFile("oracle_cards", "2026-10-18", 256, "https://data.scryfall.io/oracle-cards-1.json"))
+
+    assert set(BulkManifest(tmp_path / "manifest.json").files) == {"default_cards", "oracle_cards"}
+    assert second.get("default_cards") is not None
@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+
+import pytest
+
+
+def _make_file(path: Path, size: int, mtime: float) -> Path:
+    path.write_bytes(bytes(size))
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_parse_size() -> None:
+    from mtg_proxies.scryfall.cache import parse_size
+
+    assert parse_size("1234") == 1234
+    assert parse_size("2k") == 2048
+    assert parse_size("1.5 GB") == 3 * 1024**3 // 2
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("many")
+
+
+def test_prune_lru(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.cache import CacheManager
+
+    cache = CacheManager(tmp_path, max_bytes=250, pinned=lambda: ["bulk.json"], internal=["state.bin"])
+    a = _make_file(tmp_path / "a.png", 100, 1000)
+    b = _make_file(tmp_path / "b.png", 100, 2000)
+    c = _make_file(tmp_path / "c.png", 100, 3000)
+    _make_file(tmp_path / "bulk.json", 100, 0)
+    _make_file(tmp_path / "state.bin", 100, 0)
+
+    stats = cache.stats()
+    assert (stats.files, stats.bytes, stats.pinned_files, stats.pinned_bytes) == (4, 400, 1, 100)
+
+    cache.record_access(a)  # a is now the most recently used file
+    assert [entry.path for entry in cache.prune(dry_run=True)] == [b, c]
+    assert b.is_file()
+
+    evicted = cache.prune(keep=[b])
+    assert [entry.path for entry in evicted] == [c, a]
+    assert not a.is_file()
+    assert b.is_file()
+    assert not c.is_file()
+    assert (tmp_path / "bulk.json").is_file()
+    assert (tmp_path / "state.bin").is_file()
+
+
+def test_prune_lfu(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.cache import CacheManager
+
+    cache = CacheManager(tmp_path)
+    a = _make_file(tmp_path / "a.png", 100, 0)
+    b = _make_file(tmp_path / "b.png", 100, 0)
+    for _ in range(3):
+        cache.record_access(a)
+    cache.record_access(b)
+
+    assert cache.prune() == []  # No budget
+    assert [entry.path for entry in cache.prune(150, policy="lfu")] == [b]
+
+    # The access counts of remaining files survive compaction of the log
+    entries, _ = cache.entries()
+    assert [(entry.path, entry.accesses) for entry in entries] == [(a, 3)]
+
+
+def test_abandoned_downloads(tmp_path: Path) -> None:
+    import time
+
+    from mtg_proxies.scryfall.cache import STALE_DOWNLOAD_AGE, CacheManager
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+    objects = ObjectStore(tmp_path)
+    cache = CacheManager(tmp_path, objects=objects)
+    objects.objects_folder.mkdir()
+    abandoned = _make_file(objects.objects_folder / "abc.part", 100, time.time() - 2 * STALE_DOWNLOAD_AGE)
+    _make_file(objects.objects_folder / "def.part", 100, time.time())  # Still in progress
+
+    entries, _ = cache.entries()
+    assert [entry.path for entry in entries] == [abandoned]
+
+    assert [entry.path for entry in cache.prune(50)] == [abandoned]
+    assert not abandoned.exists()
+    assert (objects.objects_folder / "def.part").is_file()
@@ -1,15 +1,19 @@
+import subprocess
+import sys
 from unittest.mock import patch
 
 import pytest
 
 
-def test_main(capsys: pytest.CaptureFixture) -> None:
+def test_main(capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test the main function.
 
     Ensure that ther a are no import errors and that the help message is printed correctly.
     """
     from mtg_proxies.cli import main
 
+    monkeypatch.setenv("COLUMNS", "80")  # Line wrapping depends on the terminal width
+
     # Mock argv
     with patch("sys.argv", ["mtg-proxies", "--help"]), pytest.raises(SystemExit):
         main()
@@ -18,18 +22,58 @@ def test_main(capsys: pytest.CaptureFixture) -> None:
     captured = capsys.readouterr()
     assert (
         captured.out
-        == """usage: mtg-proxies [-h] {print,convert,tokens,deck_value} ...
+        == """usage: mtg-proxies [-h] [--cache-dir PATH]
+                   {print,convert,tokens,deck_value,prefetch,cache} ...
 
 Create high quality MtG proxies from your decklist.
 
 positional arguments:
-  {print,convert,tokens,deck_value}
+  {print,convert,tokens,deck_value,prefetch,cache}
     print               Prepare a decklist for printing
     convert             Convert a decklist to text or arena format
     tokens              Append the created tokens to a decklist
     deck_value          Show deck value decomposition
+    prefetch            Download scans into the cache ahead of printing
+    cache               Show or prune the download cache
 
 options:
   -h, --help            show this help message and exit
+  --cache-dir PATH      folder to cache downloads in (default:
+                        MTG_PROXIES_CACHE_DIR or a temporary folder)
 """
     )
+
+
+def _import_profile(code: str) -> tuple[set[str], float]:
+    """Run code in a fresh interpreter and return the imported modules and the total import time in seconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    # Lines look like "import time:       self [us] |  cumulative | imported package", nested imports are indented
+    rows = [
+        line.split("|") for line in result.stderr.splitlines() if line.startswith("import time:") and "[us]" not in line
+    ]
+    modules = {row[2].strip() for row in rows}
+    total = sum(int(row[1]) for row in rows if not row[2].startswith("  ")) / 1e6  # Top-level imports only
+    return modules, total
+
+
+@pytest.mark.parametrize(
+    ("command", "code", "budget"),
+    [
+        ("--help", "import sys; sys.argv = ['mtg-proxies', '--help']; from mtg_proxies.cli import main; main()", 0.5),
+        ("convert", "import mtg_proxies.cli, mtg_proxies.decklists", 1.0),
+        ("tokens", "import mtg_proxies.cli, mtg_proxies.decklists, mtg_proxies.tokens", 1.0),
+    ],
+)
+def test_import_time(command: str, code: str, budget: float) -> None:
+    """Ensure that subcommands only import what they use."""
+    modules, total = _import_profile(code)
+
+    assert "mtg_proxies.cli" in modules
+    assert "matplotlib" not in modules
+    assert "fpdf" not in modules
+    if command == "--help":
+        assert "numpy" not in modules
+        assert "mtg_proxies.scryfall" not in modules
+    assert total < budget, f"Importing for {command} took {total:.3f}s"
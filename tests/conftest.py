@@ -1,12 +1,31 @@
 from __future__ import annotations
 
+import threading
+from collections.abc import Callable, Iterator
+from http.server import ThreadingHTTPServer
 from pathlib import Path
+from socketserver import BaseRequestHandler
 from typing import TYPE_CHECKING
 
 import pytest
 
 if TYPE_CHECKING:
     from mtg_proxies.decklists import Decklist
+    from mtg_proxies.scryfall.store import CardStore
+
+CARD_DEFAULTS = {
+    "oracle_id": "c0b2bd3e-0b3e-4b6b-9a3c-6b0c7d9c4a11",
+    "name": "Counterspell",
+    "set": "ema",
+    "collector_number": "43",
+    "lang": "en",
+    "layout": "normal",
+    "border_color": "black",
+    "frame": "2015",
+    "digital": False,
+    "nonfoil": True,
+    "highres_image": True,
+}  # Values of the cards created by the `card` fixture, unless overridden
 
 
 @pytest.fixture(scope="session")
@@ -23,3 +42,42 @@ def example_decklist(data_dir: Path) -> Decklist:
 
     decklist, _, _ = parse_decklist(data_dir / "decklist.txt")
     return decklist
+
+
+@pytest.fixture
+def http_server() -> Iterator[Callable[[Callable[..., BaseRequestHandler]], str]]:
+    """Return a function, which serves requests with a handler on a local port and returns the url of the server."""
+    servers: list[ThreadingHTTPServer] = []
+
+    def serve(handler: Callable[..., BaseRequestHandler]) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def card() -> Callable[..., dict]:
+    """Return a function, which creates a card as in Scryfall's bulk data, with keyword arguments as its values."""
+
+    def make(id: str, **kwargs: object) -> dict:
+        # Keys overridden with `None` are left out
+        return {key: value for key, value in {"id": id, **CARD_DEFAULTS, **kwargs}.items() if value is not None}
+
+    return make
+
+
+@pytest.fixture
+def card_store(tmp_path: Path) -> Callable[..., CardStore]:
+    """Return a function, which builds a card store of cards in the temporary folder of the test."""
+    from mtg_proxies.scryfall.store import build_card_store
+
+    def build(cards: list[dict], name: str = "cards") -> CardStore:
+        return build_card_store(cards, tmp_path / f"{name}.store")
+
+    return build
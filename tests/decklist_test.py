@@ -178,3 +178,40 @@ def test_reversible_cards() -> None:
     images = fetch_scans_scryfall(decklist)
 
     assert len(images) == 2  # Front and back
+
+
+def test_validate_cards() -> None:
+    from mtg_proxies.decklists import ValidationCache, validate_card_name, validate_cards, validate_print
+
+    entries = [
+        ("Counterspell", "ema", "43"),
+        ("Counterb", None, None),
+        ("counterspell", None, None),
+        ("Counterspell", "ema", "43"),
+    ]
+    cache = ValidationCache()
+    results = validate_cards(entries, cache)
+
+    assert len(results) == len(entries)
+    for (card_name, set_id, collector_number), (card, warnings) in zip(entries, results):
+        validated_name, expected_warnings = validate_card_name(card_name)
+        if validated_name is None:
+            assert card is None
+        else:
+            expected_card, warnings_print = validate_print(validated_name, set_id, collector_number)
+            assert card == expected_card
+            expected_warnings += warnings_print
+        assert warnings == expected_warnings
+    assert len(cache.names) == 3  # Each distinct name is validated once
+    assert len(cache.prints) == 2
+
+
+def test_validate_cards_suggest() -> None:
+    from mtg_proxies.decklists import ValidationCache, validate_cards
+
+    [(card, warnings)] = validate_cards([("Countersark", "5ed", "77")], ValidationCache(suggest=True))
+
+    assert card is None
+    assert len(warnings) == 1
+    assert str(warnings[0]).startswith("ERROR: Unable to find card 'Countersark'. Did you mean ")
+    assert "'Counterspell'" in warnings[0].message
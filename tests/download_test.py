@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+import pytest
+import requests
+
+PAYLOAD = bytes(range(256)) * 400
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """Serves the payload with `Range` and `If-Range` support, but drops the connection after some bytes."""
+
+    ranges: list[str | None]
+    drop_after = 10000
+    payload = PAYLOAD
+    etag = '"1"'
+
+    def do_GET(self) -> None:
+        self.ranges.append(self.headers.get("Range"))
+        offset = int(self.headers["Range"].removeprefix("bytes=").removesuffix("-")) if "Range" in self.headers else 0
+        if self.headers.get("If-Range", self.etag) != self.etag:  # Changed since, send the whole file
+            offset = 0
+        if offset >= len(self.payload) > 0:
+            self.send_response(416)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.payload[offset:]
+        self.send_response(206 if offset > 0 else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(body[: self.drop_after])
+        self.close_connection = True
+
+
+@pytest.fixture
+def flaky_server(http_server: Callable[[type[_FlakyHandler]], str]) -> tuple[str, type[_FlakyHandler]]:
+    handler = type("Handler", (_FlakyHandler,), {"ranges": []})
+    return f"{http_server(handler)}/cards.json", handler
+
+
+def test_download_resumes(tmp_path: Path, flaky_server: tuple[str, type[_FlakyHandler]]) -> None:
+    from mtg_proxies.scryfall.scryfall import download
+
+    url, handler = flaky_server
+    dst = tmp_path / "cards.json"
+    download(url, dst, silent=True, size=len(PAYLOAD), retries=20, backoff=0)
+
+    assert dst.read_bytes() == PAYLOAD
+    assert not dst.with_name("cards.json.part").exists()
+    assert handler.ranges[0] is None
+    offsets = [int(r.removeprefix("bytes=").removesuffix("-")) for r in handler.ranges[1:]]
+    assert offsets == sorted(set(offsets))  # Each attempt continued where the previous one stopped
+    assert 0 < offsets[0] <= 10000
+
+
+def test_download_keeps_partial_file(tmp_path: Path, flaky_server: tuple[str, type[_FlakyHandler]]) -> None:
+    from mtg_proxies.scryfall.scryfall import download
+
+    url, handler = flaky_server
+    dst = tmp_path / "cards.json"
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download(url, dst, silent=True, size=len(PAYLOAD), retries=2, backoff=0)
+    assert not dst.exists()
+    partial_size = dst.with_name("cards.json.part").stat().st_size
+    assert 0 < partial_size < len(PAYLOAD)
+
+    # The next call continues where the previous one stopped
+    download(url, dst, silent=True, size=len(PAYLOAD), retries=20, backoff=0)
+    assert dst.read_bytes() == PAYLOAD
+    assert handler.ranges[3] == f"bytes={partial_size}-"
+
+
+def test_download_restarts_changed_file(tmp_path: Path, flaky_server: tuple[str, type[_FlakyHandler]]) -> None:
+    from mtg_proxies.scryfall.scryfall import download
+
+    url, handler = flaky_server
+    dst = tmp_path / "cards.json"
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download(url, dst, silent=True, retries=0)
+    assert dst.with_name("cards.json.part.validator").read_text() == '"1"'
+
+    handler.payload, handler.etag = PAYLOAD[::-1], '"2"'
+    handler.drop_after = len(PAYLOAD)
+    download(url, dst, silent=True, retries=0)
+    assert dst.read_bytes() == PAYLOAD[::-1]  # Not spliced from both versions
+    assert handler.ranges[1] is not None  # Asked for the rest of the previous version
+    assert not dst.with_name("cards.json.part.validator").exists()
+
+
+def test_download_unsatisfiable_range(tmp_path: Path, flaky_server: tuple[str, type[_FlakyHandler]]) -> None:
+    from mtg_proxies.scryfall.scryfall import download
+
+    url, handler = flaky_server
+    handler.drop_after = len(PAYLOAD)
+    dst = tmp_path / "cards.json"
+    dst.with_name("cards.json.part").write_bytes(PAYLOAD + b"more")  # E.g. of a previous version of the file
+    dst.with_name("cards.json.part.validator").write_text(handler.etag)
+
+    download(url, dst, silent=True, retries=1, backoff=0)  # Size unknown
+    assert dst.read_bytes() == PAYLOAD
+    assert handler.ranges == [f"bytes={len(PAYLOAD) + 4}-", None]
+
+
+def test_download_verifies_size(tmp_path: Path, flaky_server: tuple[str, type[_FlakyHandler]]) -> None:
+    from mtg_proxies.scryfall.scryfall import download
+
+    url, handler = flaky_server
+    handler.drop_after = len(PAYLOAD)
+    dst = tmp_path / "cards.json"
+    with pytest.raises(ValueError, match="expected 1000"):
+        download(url, dst, silent=True, size=1000, retries=1, backoff=0)
+    assert not dst.exists()
+
+
+def test_adownload_resumes(tmp_path: Path, flaky_server: tuple[str, type[_FlakyHandler]]) -> None:
+    import asyncio
+
+    pytest.importorskip("httpx")
+    from mtg_proxies.scryfall.aio import adownload
+
+    url, handler = flaky_server
+    dst = tmp_path / "cards.json"
+    asyncio.run(adownload(url, dst, size=len(PAYLOAD), retries=20, backoff=0))
+
+    assert dst.read_bytes() == PAYLOAD
+    assert not dst.with_name("cards.json.part").exists()
+    offsets = [int(r.removeprefix("bytes=").removesuffix("-")) for r in handler.ranges[1:]]
+    assert offsets == sorted(set(offsets))
+    assert 0 < offsets[0] <= 10000
+
+
+def test_adownload_verifies_size(tmp_path: Path, flaky_server: tuple[str, type[_FlakyHandler]]) -> None:
+    import asyncio
+
+    pytest.importorskip("httpx")
+    from mtg_proxies.scryfall.aio import adownload
+
+    url, handler = flaky_server
+    handler.drop_after = len(PAYLOAD)
+    dst = tmp_path / "cards.json"
+    with pytest.raises(ValueError, match="expected 1000"):
+        asyncio.run(adownload(url, dst, size=1000, retries=1, backoff=0))
+    assert not dst.exists()
@@ -0,0 +1,85 @@
+import contextlib
+import threading
+import time
+from pathlib import Path
+
+
+def test_file_lock(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.file_lock import FileLock
+
+    counter = tmp_path / "counter.txt"
+    counter.write_text("0")
+
+    def increment() -> None:
+        with FileLock(counter):
+            value = int(counter.read_text())
+            time.sleep(0.001)  # Give other threads a chance to interfere
+            counter.write_text(str(value + 1))
+
+    threads = [threading.Thread(target=increment) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.read_text() == "16"
+
+
+def test_file_lock_stripes(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall import file_lock
+
+    for i in range(4 * file_lock._STRIPES):
+        with file_lock.FileLock(tmp_path / f"{i}.txt"):
+            pass
+
+    assert len({path for path in file_lock._thread_locks if path.is_relative_to(tmp_path)}) <= file_lock._STRIPES
+
+
+def test_file_lock_async_cancel(tmp_path: Path) -> None:
+    import asyncio
+
+    from mtg_proxies.scryfall.file_lock import FileLock
+
+    path = tmp_path / "file.txt"
+
+    async def cancel_while_waiting() -> None:
+        with FileLock(path):  # Held by another thread, as far as the waiting task is concerned
+            task = asyncio.create_task(FileLock(path).__aenter__())
+            await asyncio.sleep(0.05)
+            task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.05)  # Let the thread acquire and release the lock
+
+    asyncio.run(cancel_while_waiting())
+
+    # The lock was not leaked by the cancelled task
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: FileLock(path).__enter__() and acquired.set(), daemon=True)
+    thread.start()
+    assert acquired.wait(timeout=5)
+
+
+def test_file_lock_async_small_executor(tmp_path: Path) -> None:
+    import asyncio
+    import zlib
+    from concurrent.futures import ThreadPoolExecutor
+
+    from mtg_proxies.scryfall import file_lock
+
+    # Distinct files on the same stripe
+    names = [name for name in map(str, range(10000)) if zlib.crc32(name.encode()) % file_lock._STRIPES == 0][:6]
+
+    async def hold(name: str) -> None:
+        async with file_lock.FileLock(tmp_path / name):
+            await asyncio.to_thread(time.sleep, 0.01)  # The holder needs the executor
+
+    async def main() -> None:
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=4))
+        await asyncio.gather(*(hold(name) for name in names))
+
+    # Run in a thread, so a deadlock fails the test instead of hanging it
+    thread = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
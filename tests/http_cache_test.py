@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import ClassVar
+
+import pytest
+import requests
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    """Serves a JSON document with an `ETag`, answering conditional requests with `304 Not Modified`."""
+
+    body: ClassVar[dict] = {"object": "list", "data": [1, 2, 3]}
+    requests: list[str | None]
+
+    def do_GET(self) -> None:
+        etag = f'"{len(self.body["data"])}"'
+        self.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = json.dumps(self.body).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def etag_server(http_server: Callable[[type[_ETagHandler]], str]) -> tuple[str, type[_ETagHandler]]:
+    handler = type("Handler", (_ETagHandler,), {"requests": []})
+    return f"{http_server(handler)}/bulk-data", handler
+
+
+def test_revalidation(tmp_path: Path, etag_server: tuple[str, type[_ETagHandler]]) -> None:
+    from mtg_proxies.scryfall.http_cache import ResponseCache
+
+    url, handler = etag_server
+    session = requests.Session()
+    cache = ResponseCache(tmp_path)
+
+    assert cache.get_json(url, session) == handler.body
+    assert cache.get_json(url, session) == handler.body  # Revalidated
+    assert handler.requests == [None, '"3"']
+    assert (cache.misses, cache.revalidations, cache.hits) == (1, 1, 0)
+
+    # Changed upstream
+    handler.body = {"object": "list", "data": [1, 2, 3, 4]}
+    assert ResponseCache(tmp_path).get_json(url, session) == handler.body
+
+
+def test_max_age(tmp_path: Path, etag_server: tuple[str, type[_ETagHandler]]) -> None:
+    from mtg_proxies.scryfall.http_cache import ResponseCache
+
+    url, handler = etag_server
+    session = requests.Session()
+    cache = ResponseCache(tmp_path, max_age=3600)
+
+    assert cache.get_json(url, session) == handler.body
+    assert ResponseCache(tmp_path, max_age=3600).get_json(url, session) == handler.body
+    assert handler.requests == [None]  # No request within the max-age
+    assert cache.get_json(url + "?page=2", session) == handler.body  # Different url
+    assert len(handler.requests) == 2
+
+
+def test_max_entries(tmp_path: Path, etag_server: tuple[str, type[_ETagHandler]]) -> None:
+    import os
+
+    from mtg_proxies.scryfall.http_cache import ResponseCache
+
+    url, _ = etag_server
+    session = requests.Session()
+    cache = ResponseCache(tmp_path, max_age=3600, max_entries=2)
+
+    cache.get_json(f"{url}?page=0", session)
+    cache.get_json(f"{url}?page=1", session)
+    for i, path in enumerate([cache._path(f"{url}?page=0"), cache._path(f"{url}?page=1")]):
+        os.utime(path, (i, i))
+    cache.get_json(f"{url}?page=0", session)  # Page 0 is now the most recently used
+    cache.get_json(f"{url}?page=2", session)  # Drops page 1
+
+    assert len(cache) == 2
+    cache.get_json(f"{url}?page=0", session)
+    cache.get_json(f"{url}?page=1", session)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_arevalidation(tmp_path: Path, etag_server: tuple[str, type[_ETagHandler]]) -> None:
+    import asyncio
+
+    httpx = pytest.importorskip("httpx")
+    from mtg_proxies.scryfall.http_cache import ResponseCache
+
+    url, handler = etag_server
+    cache = ResponseCache(tmp_path)
+
+    async def get_twice() -> list[dict]:
+        async with httpx.AsyncClient() as client:
+            return [await cache.aget_json(url, client), await cache.aget_json(url, client)]
+
+    assert asyncio.run(get_twice()) == [handler.body, handler.body]
+    assert handler.requests == [None, '"3"']
+    assert (cache.misses, cache.revalidations, cache.hits) == (1, 1, 0)
+    assert ResponseCache(tmp_path).get_json(url, requests.Session()) == handler.body  # Shared with the sync interface
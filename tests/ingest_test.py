@@ -0,0 +1,38 @@
+import json
+from io import StringIO
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [],
+        [{"name": "Counterspell"}],
+        [{"name": "Counterspell", "prices": {"eur": "1.50"}}, {"name": "Wear // Tear", "cmc": 4.0}, 12345, "]"],
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_iter_json_array(data: list, chunk_size: int) -> None:
+    from mtg_proxies.scryfall.ingest import iter_json_array
+
+    text = json.dumps(data, indent=2)
+
+    assert list(iter_json_array(StringIO(text), chunk_size=chunk_size)) == data
+
+
+@pytest.mark.parametrize("text", ["[1.5,2]", "[15000000000.0,1]", "[-1.5e-5,true,null]"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_iter_json_array_numbers(text: str, chunk_size: int) -> None:
+    from mtg_proxies.scryfall.ingest import iter_json_array
+
+    # Numbers split at the end of a chunk are parsed whole
+    assert list(iter_json_array(StringIO(text), chunk_size=chunk_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1, 2", "[1 2]", '[{"name": "Counterspell"'])
+def test_iter_json_array_invalid(text: str) -> None:
+    from mtg_proxies.scryfall.ingest import iter_json_array
+
+    with pytest.raises(ValueError, match="json array"):
+        list(iter_json_array(StringIO(text), chunk_size=3))
@@ -0,0 +1,34 @@
+import pytest
+
+NAMES = ["counterspell", "counterbalance", "counterbore", "cackling counterpart", "wear // tear", "ox"]
+
+
+@pytest.mark.parametrize(
+    "words",
+    [
+        ["counterb"],
+        ["count", "part"],
+        ["ox"],
+        ["o"],
+        ["//"],
+        ["wear", "", "tear"],
+        [""],
+        ["countersark"],
+    ],
+)
+def test_containing(words: list[str]) -> None:
+    from mtg_proxies.scryfall.name_index import NameIndex
+
+    index = NameIndex(NAMES)
+
+    assert index.containing(words) == [name for name in NAMES if all(word in name for word in words)]
+
+
+def test_closest() -> None:
+    from mtg_proxies.scryfall.name_index import NameIndex
+
+    index = NameIndex(NAMES)
+
+    assert index.closest("countrspell", limit=1) == ["counterspell"]
+    assert index.closest("countersark", limit=2) == ["counterbore", "counterspell"]
+    assert index.closest("xyz") == []
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+
+def test_object_store(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+    store = ObjectStore(tmp_path)
+    assert store.get("https://example.com/a.png") is None
+
+    (tmp_path / "a").write_bytes(b"image")
+    a = store.put("https://example.com/a.png", tmp_path / "a", ".png")
+    assert a.read_bytes() == b"image"
+    assert a.suffix == ".png"
+    assert a.parent.parent.parent == store.objects_folder  # Sharded into two levels of subfolders
+    assert not (tmp_path / "a").exists()
+
+    # Identical content is stored once
+    (tmp_path / "b").write_bytes(b"image")
+    assert store.put("https://example.com/b.png", tmp_path / "b", ".png") == a
+    assert list(store.objects()) == [a]
+
+    # Other processes read the manifest on their first miss
+    other = ObjectStore(tmp_path)
+    assert other.get("https://example.com/b.png") == a
+
+    # Removing an object removes all keys referring to it
+    other.remove(a)
+    assert not a.exists()
+    assert store.get("https://example.com/a.png") == a  # Known keys are served from memory
+    assert other.get("https://example.com/a.png") is None
+    assert ObjectStore(tmp_path).get("https://example.com/a.png") is None
+
+
+def test_object_store_stale_entry(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+    store = ObjectStore(tmp_path)
+    (tmp_path / "a").write_bytes(b"image")
+    a = store.put("https://example.com/a.png", tmp_path / "a", ".png")
+    a.unlink()  # E.g. deleted by hand
+
+    assert store.get("https://example.com/a.png") == a  # Not checked on lookups
+    store.discard("https://example.com/a.png", a)
+    assert store.get("https://example.com/a.png") is None
+    assert dict(ObjectStore(tmp_path).items()) == {}  # Dropped from the manifest
+
+    # Downloaded again
+    (tmp_path / "a").write_bytes(b"image")
+    assert store.put("https://example.com/a.png", tmp_path / "a", ".png") == a
+    assert store.get("https://example.com/a.png") == a
+
+    # Keys stored again since aren't dropped
+    store.discard("https://example.com/a.png", tmp_path / "other.png")
+    assert ObjectStore(tmp_path).get("https://example.com/a.png") == a
+
+
+def test_object_store_compact(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+    store = ObjectStore(tmp_path)
+    for i in range(3):
+        (tmp_path / "file").write_bytes(bytes([i]))
+        store.put("key", tmp_path / "file")
+    other = ObjectStore(tmp_path)
+    assert other.get("key") == store.get("key")
+
+    store.compact()
+    assert len(store.manifest_path.read_text().splitlines()) == 1
+
+    # Other processes notice the compaction
+    (tmp_path / "file").write_bytes(b"new")
+    store.put("new key", tmp_path / "file")
+    assert other.get("new key") == store.get("new key")
+    assert dict(other.items()) == dict(store.items())
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import functools
+from collections.abc import Callable
+from http.server import SimpleHTTPRequestHandler
+from pathlib import Path
+from socketserver import BaseRequestHandler
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from mtg_proxies.decklists import Decklist
+
+
+def test_prefetch(example_decklist: Decklist) -> None:
+    from mtg_proxies import fetch_scans_scryfall
+    from mtg_proxies.prefetch import prefetch
+
+    prefetch([example_decklist], silent=True)
+    stats = prefetch([example_decklist], silent=True)
+
+    assert stats.requested == len(set(fetch_scans_scryfall(example_decklist)))
+    assert stats.skipped == stats.requested  # All cached by the first prefetch
+    assert stats.downloaded == 0
+
+
+def test_prefetch_images(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, http_server: Callable[[Callable[..., BaseRequestHandler]], str]
+) -> None:
+    from mtg_proxies.scryfall import prefetch_images, scryfall
+    from mtg_proxies.scryfall.cache import CacheManager
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+    object_store = ObjectStore(tmp_path / "cache")
+    monkeypatch.setattr(scryfall, "_object_store", object_store)
+    monkeypatch.setattr(scryfall, "_cache_manager", CacheManager(tmp_path / "cache", objects=object_store))
+
+    folder = tmp_path / "scans"
+    folder.mkdir()
+    (folder / "a.png").write_bytes(b"a" * 100)
+    (folder / "b.png").write_bytes(b"b" * 200)
+
+    base = http_server(functools.partial(SimpleHTTPRequestHandler, directory=str(folder)))
+    image_uris = [f"{base}/a.png", f"{base}/b.png", f"{base}/a.png", f"{base}/missing.png"]
+
+    stats = prefetch_images(image_uris, silent=True)
+    assert (stats.requested, stats.downloaded, stats.skipped, stats.failed) == (3, 2, 0, 1)
+    assert stats.bytes == 300
+
+    # Only the missing image is requested again
+    stats = prefetch_images(image_uris, silent=True)
+    assert (stats.requested, stats.downloaded, stats.skipped, stats.failed) == (3, 0, 2, 1)
+    assert len(list(object_store.objects())) == 2
+
+
+@pytest.mark.parametrize(
+    ("dpi", "quality", "variant"),
+    [
+        (None, "auto", "png"),  # As for pdf
+        (150, "auto", "normal"),
+        (300, "auto", "png"),
+        (300, "large", "large"),
+    ],
+)
+def test_prefetch_variant(monkeypatch: pytest.MonkeyPatch, dpi: int | None, quality: str, variant: str) -> None:
+    from mtg_proxies import scryfall
+    from mtg_proxies.prefetch import prefetch
+
+    card = {"image_uris": {key: key for key in ("png", "large", "normal")}}
+    requested = []
+    monkeypatch.setattr(scryfall, "get_cards", lambda **_: [card])
+    monkeypatch.setattr(
+        scryfall, "prefetch_images", lambda image_uris, **_: requested.extend(image_uris) or scryfall.PrefetchStats()
+    )
+
+    prefetch(sets=["lea"], dpi=dpi, quality=quality)
+
+    assert requested == [variant]
@@ -43,3 +43,33 @@ def test_print_cards_matplotlib_png(example_images: list[str], tmp_path: Path) -
     print_cards_matplotlib(example_images, out_file)
 
     assert (tmp_path / "decklist_000.png").is_file()
+
+
+def test_print_cards_fpdf_normal_quality(example_decklist: Decklist, tmp_path: Path) -> None:
+    from mtg_proxies import fetch_scans_scryfall, print_cards_fpdf
+
+    out_file = tmp_path / "decklist.pdf"
+    print_cards_fpdf(fetch_scans_scryfall(example_decklist, quality="normal"), out_file)
+
+    assert out_file.is_file()
+
+
+def test_load_image(tmp_path: Path) -> None:
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    from mtg_proxies.print_cards import _load_image
+
+    path = tmp_path / "scan.png"
+    plt.imsave(path, np.full((680, 488, 3), 0.5))
+    _load_image.cache_clear()
+
+    img = _load_image(path)
+    assert img.dtype == np.uint8
+    assert img.shape == (680, 488, 4)
+
+    # Crops are scaled to the size of the scan and share the decoded image
+    cropped = _load_image(path, 14, 14)
+    assert cropped.shape == (671, 479, 4)
+    assert np.shares_memory(img, cropped)
+    assert _load_image(path, 14, 14) is cropped
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from mtg_proxies.scryfall.store import CardStore
+
+
+@pytest.fixture
+def cards(card: Callable[..., dict]) -> list[dict]:
+    return [
+        card("00000000-0000-0000-0000-000000000000", illustration_id="10000000-0000-0000-0000-000000000000", lang="de"),
+        card("00000000-0000-0000-0000-000000000001", illustration_id="10000000-0000-0000-0000-000000000000"),
+        card(
+            "00000000-0000-0000-0000-000000000002",
+            illustration_id="10000000-0000-0000-0000-000000000001",
+            frame_effects=["extendedart"],
+        ),
+        card(
+            "00000000-0000-0000-0000-000000000003", illustration_id="10000000-0000-0000-0000-000000000001", digital=True
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("method", "expected_rows"),
+    [
+        ("best", 1),  # Extended art doesn't count as black border
+        ("ranked", [1, 2, 3, 0]),
+        ("choices", [1, 2]),
+    ],
+)
+def test_print_ranking(
+    cards: list[dict],
+    card_store: Callable[..., CardStore],
+    method: str,
+    expected_rows: int | list[int],
+) -> None:
+    import numpy as np
+
+    from mtg_proxies.scryfall.ranking import PrintRanking
+
+    ranking = PrintRanking.open(card_store(cards))
+    result = getattr(ranking, method)(np.arange(len(cards)))
+
+    assert np.array_equal(result, expected_rows)
+    if method == "best":
+        assert ranking.best_print(cards[0]["oracle_id"]) == expected_rows
+
+
+def test_patch_print_ranking(
+    cards: list[dict], card: Callable[..., dict], card_store: Callable[..., CardStore]
+) -> None:
+    import numpy as np
+
+    from mtg_proxies.scryfall.ranking import PrintRanking
+
+    previous = PrintRanking.open(card_store(cards, "previous"))
+    new_cards = [
+        {**cards[0], "digital": True},
+        *cards[1:],
+        card("00000000-0000-0000-0000-000000000004", illustration_id=cards[1]["illustration_id"]),
+    ]
+
+    # Scores of prints that didn't change are copied, so a change that isn't reported goes unnoticed
+    stale = PrintRanking.open(card_store(new_cards, "stale"), previous)
+    assert np.array_equal(stale.scores[:4], previous.scores)
+
+    patched = PrintRanking.open(card_store(new_cards, "patched"), previous, [cards[0]["id"]])
+    rebuilt = PrintRanking.open(card_store(new_cards, "rebuilt"))
+    assert np.array_equal(patched.ranking, rebuilt.ranking)
+    assert patched.scores[0] < previous.scores[0]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_rate_limiter(tmp_path: Path, shared: bool) -> None:
+    from mtg_proxies.scryfall.rate_limit import RateLimiter
+
+    state_path = tmp_path / "rate_limit.bin" if shared else None
+    rate_limiter = RateLimiter(rate=20, burst=3, state_path=state_path)
+
+    start = time.monotonic()
+    for _ in range(3):  # Burst
+        with rate_limiter:
+            pass
+    assert time.monotonic() - start < 0.04
+
+    for _ in range(4):  # Rate
+        with rate_limiter:
+            pass
+    assert time.monotonic() - start >= 4 / 20 - 0.01
+
+    assert rate_limiter.calls == 7
+    assert rate_limiter.total_wait == pytest.approx(4 / 20, abs=0.02)
+    assert rate_limiter.max_wait <= 1 / 20 + 0.01
+
+
+def test_rate_limiter_shared_state(tmp_path: Path) -> None:
+    """Limiters with the same state file, e.g. in different processes, draw from a single bucket."""
+    from mtg_proxies.scryfall.rate_limit import RateLimiter
+
+    rate_limiters = [RateLimiter(rate=20, state_path=tmp_path / "rate_limit.bin") for _ in range(2)]
+
+    start = time.monotonic()
+    for i in range(6):
+        with rate_limiters[i % 2]:
+            pass
+
+    assert time.monotonic() - start >= 5 / 20 - 0.01
+
+
+def test_rate_limiter_async() -> None:
+    from mtg_proxies.scryfall.rate_limit import RateLimiter
+
+    rate_limiter = RateLimiter(delay=0.05)
+
+    async def call() -> float:
+        async with rate_limiter:
+            return time.monotonic()
+
+    async def calls() -> list[float]:
+        return await asyncio.gather(*(call() for _ in range(5)))
+
+    times = sorted(asyncio.run(calls()))
+
+    assert times[-1] - times[0] >= 4 * 0.05 - 0.01
+
+
+def test_rate_limiter_delay() -> None:
+    from mtg_proxies.scryfall.rate_limit import RateLimiter
+
+    rate_limiter = RateLimiter(0.05)  # Positional delay, as before the rate
+
+    assert rate_limiter.rate == 20
+    assert rate_limiter.delay == pytest.approx(0.05)
+    with pytest.raises(ValueError, match="either rate or delay"):
+        RateLimiter(0.05, rate=20)
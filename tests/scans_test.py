@@ -22,3 +22,31 @@ def test_fetch_scans_scryfall(example_decklist: Decklist, faces: str, expected_i
     images = fetch_scans_scryfall(example_decklist, faces=faces)
 
     assert len(images) == expected_images
+
+
+@pytest.mark.parametrize(
+    ("dpi", "scale", "quality", "expected_variant"),
+    [
+        (None, 1.0, "auto", "png"),
+        (300, 1.0, "auto", "png"),
+        (250, 1.0, "auto", "large"),
+        (150, 1.0, "auto", "normal"),
+        (150, 2.0, "auto", "png"),
+        (600, 1.0, "normal", "normal"),
+    ],
+)
+def test_select_image_variant(dpi: float | None, scale: float, quality: str, expected_variant: str) -> None:
+    from mtg_proxies.scans import select_image_variant
+
+    assert select_image_variant((2.5 * scale, 3.5 * scale), dpi, quality) == expected_variant
+
+
+def test_fetch_scans_scryfall_variant(example_decklist: Decklist) -> None:
+    from matplotlib.pyplot import imread
+
+    from mtg_proxies import fetch_scans_scryfall
+
+    images = fetch_scans_scryfall(example_decklist, dpi=150)
+
+    assert len(images) == 7
+    assert imread(images[0]).shape[:2] == (680, 488)
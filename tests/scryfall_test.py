@@ -1,5 +1,15 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 import pytest
 
+if TYPE_CHECKING:
+    from mtg_proxies.scryfall.store import CardStore
+
 
 @pytest.mark.parametrize(
     ("id", "n_faces"),
@@ -37,3 +47,208 @@ def test_canonic_card_name(name: str, expected_id: str) -> None:
     card = scryfall.get_card(name)
 
     assert card["id"] == expected_id
+
+
+def test_iter_search() -> None:
+    from mtg_proxies import scryfall
+
+    q = "set:lea t:land"
+    cards = scryfall.search(q)
+
+    assert len(cards) > 5
+    assert [card["id"] for card in scryfall.iter_search(q, limit=5)] == [card["id"] for card in cards[:5]]
+
+
+def test_iter_depaginate_stops_early(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, http_server: Callable[[type[BaseHTTPRequestHandler]], str]
+) -> None:
+    import json
+    from itertools import islice
+
+    from mtg_proxies.scryfall import scryfall
+    from mtg_proxies.scryfall.http_cache import ResponseCache
+    from mtg_proxies.scryfall.scryfall import depaginate, iter_depaginate
+
+    monkeypatch.setattr(scryfall, "_response_cache", ResponseCache(tmp_path))
+    pages = []
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serves 10 pages of 2 cards each."""
+
+        def do_GET(self) -> None:
+            page = int(self.path.split("page=")[-1])
+            pages.append(page)
+            body = {
+                "object": "list",
+                "data": [{"page": page, "card": i} for i in range(2)],
+                "has_more": page < 9,
+                "next_page": f"http://127.0.0.1:{self.server.server_port}/cards?page={page + 1}",
+            }
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    url = f"{http_server(Handler)}/cards?page=0"
+    assert len(list(islice(iter_depaginate(url), 3))) == 3
+    assert pages == [0, 1]  # Remaining pages are never requested
+
+    assert len(depaginate(url)) == 20
+
+
+def test_iter_depaginate_errors(http_server: Callable[[type[BaseHTTPRequestHandler]], str]) -> None:
+    import json
+
+    from mtg_proxies.scryfall.scryfall import iter_depaginate
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serves Scryfall error objects with the status code of the path."""
+
+        def do_GET(self) -> None:
+            status = int(self.path.strip("/"))
+            data = json.dumps({"object": "error", "status": status, "details": "Nope"}).encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    url = http_server(Handler)
+    assert list(iter_depaginate(f"{url}/404", use_cache=False)) == []  # Search without results
+    with pytest.raises(ValueError, match="Nope"):
+        list(iter_depaginate(f"{url}/400", use_cache=False))
+
+
+def test_get_file_deleted_object(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, http_server: Callable[[type[BaseHTTPRequestHandler]], str]
+) -> None:
+    import functools
+    from http.server import SimpleHTTPRequestHandler
+
+    from mtg_proxies.scryfall import scryfall
+    from mtg_proxies.scryfall.cache import CacheManager
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+    object_store = ObjectStore(tmp_path / "cache")
+    monkeypatch.setattr(scryfall, "_object_store", object_store)
+    monkeypatch.setattr(scryfall, "_cache_manager", CacheManager(tmp_path / "cache", objects=object_store))
+
+    folder = tmp_path / "scans"
+    folder.mkdir()
+    (folder / "a.png").write_bytes(b"a" * 100)
+    url = f"{http_server(functools.partial(SimpleHTTPRequestHandler, directory=str(folder)))}/a.png"
+
+    path = Path(scryfall.get_file(url, silent=True))
+    path.unlink()  # E.g. deleted by hand
+    assert scryfall.cached_file(url) == path  # Known keys are served from memory
+
+    assert Path(scryfall.get_file(url, silent=True)).read_bytes() == b"a" * 100  # Downloaded again
+
+
+def test_iter_search_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    card: Callable[..., dict],
+    card_store: Callable[..., CardStore],
+) -> None:
+    from collections.abc import Iterator
+
+    from mtg_proxies.scryfall import scryfall
+    from mtg_proxies.scryfall.bulk import BulkFile, BulkManifest
+    from mtg_proxies.scryfall.search_cache import SearchCache
+
+    cache = SearchCache(tmp_path / "searches.sqlite")
+    monkeypatch.setattr(scryfall, "_get_search_cache", lambda: cache)
+    monkeypatch.setattr(scryfall, "_cache_folder", tmp_path)
+    monkeypatch.setattr(scryfall, "_bulk_manifest", BulkManifest(tmp_path / "bulk.json"))
+    monkeypatch.setattr(scryfall, "_loaded_bulk_files", {})  # Card store not loaded by this process
+    monkeypatch.setattr(scryfall, "_stored_cards_by_id", {})
+    goblin = card("00000000-0000-0000-0000-000000000001", name="Goblin")
+    elf = card("00000000-0000-0000-0000-000000000002", name="Elf")
+    results = {"t:goblin": [goblin], "t:elf": [elf], "t:nothing": []}
+    searches = []
+
+    def iter_depaginate(url: str, *, use_cache: bool = True) -> Iterator[dict]:
+        q = url.split("q=")[1].split("&")[0]
+        searches.append(q)
+        if q not in results:
+            raise ValueError("Scryfall returned an error")
+        yield from results[q]
+
+    monkeypatch.setattr(scryfall, "iter_depaginate", iter_depaginate)
+
+    assert scryfall.search("t:nothing") == []
+    with pytest.raises(ValueError, match="error"):
+        scryfall.search("t:")
+    assert len(cache) == 0  # Neither empty nor failed searches are cached
+
+    assert scryfall.search("t:goblin") == [goblin]
+    assert cache.get("t:goblin") == [goblin["id"]]
+    assert scryfall.search("t:goblin") == [goblin]  # No local card store to read the cards from
+    assert scryfall.search("t:elf") == [elf]
+    assert searches == ["t:nothing", "t:", "t:goblin", "t:goblin", "t:elf"]
+
+    # A card store of another process, which is not refreshed just for the search
+    bulk_file = BulkFile(
+        "default_cards", "2026-10-18T09:02:11.118+00:00", 512, "https://example.com/default-cards.json"
+    )
+    card_store([goblin], "default-cards")
+    scryfall._bulk_manifest.update(bulk_file)
+
+    assert [found["id"] for found in scryfall.search("t:goblin")] == [goblin["id"]]
+    assert scryfall.search("t:elf") == [elf]  # Store is older than the search
+    assert searches == ["t:nothing", "t:", "t:goblin", "t:goblin", "t:elf", "t:elf"]
+
+
+def test_update_database_removes_stale_versions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, card: Callable[..., dict]
+) -> None:
+    import json
+
+    from mtg_proxies.scryfall import scryfall
+    from mtg_proxies.scryfall.bulk import BulkManifest
+    from mtg_proxies.scryfall.cache import CacheManager
+    from mtg_proxies.scryfall.object_store import ObjectStore
+
+    object_store = ObjectStore(tmp_path)
+    bulk_manifest = BulkManifest(tmp_path / "bulk.json")
+    cache_manager = CacheManager(
+        tmp_path, pinned=scryfall._current_bulk_files, internal=[bulk_manifest.path.name], objects=object_store
+    )
+    monkeypatch.setattr(scryfall, "_cache_folder", tmp_path)
+    monkeypatch.setattr(scryfall, "_object_store", object_store)
+    monkeypatch.setattr(scryfall, "_bulk_manifest", bulk_manifest)
+    monkeypatch.setattr(scryfall, "_cache_manager", cache_manager)
+    monkeypatch.setattr(scryfall, "_loaded_bulk_files", {})
+    monkeypatch.setattr(scryfall, "_stored_cards_by_id", {})
+
+    def bulk_data(version: int) -> dict:
+        return {
+            "type": "default_cards",
+            "updated_at": f"2026-10-{version:02d}T09:02:11.118+00:00",
+            "size": 2,
+            "download_uri": f"https://data.scryfall.io/default-cards/default-cards-202610{version:02d}090211.json",
+        }
+
+    def get_file(url: str, **_: object) -> str:
+        (tmp_path / "download").write_text(json.dumps([card("00000000-0000-0000-0000-000000000001", name=url)]))
+        return str(scryfall.commit_download(url, tmp_path / "download"))
+
+    def names() -> set[str]:
+        urls = [bulk_data(version)["download_uri"] for version in range(1, 4)]
+        return {path.name for path in tmp_path.glob("default-cards-*")} | {
+            scryfall._url_file_name(url) for url in urls if scryfall.cached_file(url) is not None
+        }
+
+    monkeypatch.setattr(scryfall, "get_file", get_file)
+    for version in range(1, 4):
+        monkeypatch.setattr(scryfall, "_bulk_data", lambda _, version=version: bulk_data(version))
+        bulk_file = scryfall._update_database("default_cards")
+        if version == 1:
+            scryfall._loaded_bulk_files["default_cards"] = bulk_file  # Card store in use by this process
+
+    assert names() == {
+        "default-cards-20261001090211.store",  # Still in use
+        "default-cards-20261003090211.store",
+        "default-cards-20261003090211.json",
+    }
@@ -0,0 +1,31 @@
+import uuid
+from pathlib import Path
+
+
+def test_search_cache(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.search_cache import SearchCache
+
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    cache = SearchCache(tmp_path / "searches.sqlite")
+    assert cache.get("t:goblin") is None
+
+    cache.put("t:goblin", ids)
+    assert cache.get("t:goblin") == ids
+    assert cache.get("  T:Goblin ") == ids  # Normalized
+    assert SearchCache(tmp_path / "searches.sqlite").get("t:goblin") == ids  # Persistent
+    assert SearchCache(tmp_path / "searches.sqlite", ttl=0).get("t:goblin") is None  # Expired
+
+
+def test_search_cache_size(tmp_path: Path) -> None:
+    from mtg_proxies.scryfall.search_cache import SearchCache
+
+    cache = SearchCache(tmp_path / "searches.sqlite", max_entries=2)
+    cache.put("a", [])
+    cache.put("b", [])
+    assert cache.get("a") == []  # a is now used more recently than b
+    cache.put("c", [])
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == []
+    assert cache.get("c") == []
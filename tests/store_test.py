@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from mtg_proxies.scryfall.store import CardStore
+
+
+@pytest.fixture
+def cards(card: Callable[..., dict]) -> list[dict]:
+    return [
+        card(
+            "76ac5b70-47db-4cdb-91e7-e5c18c42e516",
+            prices={"usd": "1.50", "usd_foil": None, "usd_etched": None, "eur": None, "eur_foil": None, "tix": "0.02"},
+        ),
+        card(
+            "c470539a-9cc7-4175-8f7c-c982b6072b6d",
+            oracle_id=None,
+            name="Propaganda // Propaganda",
+            set="sld",
+            collector_number="381",
+            layout="reversible_card",
+            prices={"usd": None, "usd_foil": None, "usd_etched": None, "eur": "4.20", "eur_foil": None, "tix": None},
+            card_faces=[
+                {"oracle_id": "5d1b3c4e-8f7a-4c1e-9d2b-3e4f5a6b7c8d"},
+                {"oracle_id": "5d1b3c4e-8f7a-4c1e-9d2b-3e4f5a6b7c8d"},
+            ],
+        ),
+    ]
+
+
+@pytest.fixture
+def store(cards: list[dict], card_store: Callable[..., CardStore]) -> CardStore:
+    return card_store(cards)
+
+
+def test_roundtrip(store: CardStore, cards: list[dict]) -> None:
+    assert len(store) == len(cards)
+    assert list(store) == cards
+    assert store.value("name", 1) == "Propaganda // Propaganda"
+    assert store.value("oracle_id", 1) == "5d1b3c4e-8f7a-4c1e-9d2b-3e4f5a6b7c8d"
+
+
+QUERIES = [
+    ({"name": "counterspell"}, [0]),
+    ({"name": "counterspell", "set": "ema", "collector_number": "43"}, [0]),
+    ({"name": "counterspell", "set": "sld"}, []),
+    ({"id": "c470539a-9cc7-4175-8f7c-c982b6072b6d"}, [1]),
+    ({"id": "not an id"}, []),
+    ({"oracle_id": "5d1b3c4e-8f7a-4c1e-9d2b-3e4f5a6b7c8d"}, []),  # Reversible cards have no top-level oracle id
+    ({"layout": "reversible_card", "lang": "en"}, [1]),
+]
+
+
+@pytest.mark.parametrize(("query", "expected_rows"), QUERIES)
+def test_rows(store: CardStore, query: dict[str, str], expected_rows: list[int]) -> None:
+    assert list(store.rows(**query)) == expected_rows
+
+
+@pytest.mark.parametrize(("query", "expected_rows"), QUERIES)
+def test_sqlite_index(store: CardStore, query: dict[str, str], expected_rows: list[int]) -> None:
+    from mtg_proxies.scryfall.sqlite_index import SqliteCardIndex
+
+    index = SqliteCardIndex.open(store)
+    try:
+        assert list(index.rows(**query)) == expected_rows
+    finally:
+        index.close()
+
+
+@pytest.mark.parametrize(("query", "expected_rows"), QUERIES)
+def test_card_index(store: CardStore, query: dict[str, str], expected_rows: list[int]) -> None:
+    from mtg_proxies.scryfall.index import CardIndex
+
+    assert list(CardIndex(store).rows(**query)) == expected_rows
+
+
+def test_card_view(store: CardStore, cards: list[dict]) -> None:
+    from mtg_proxies.scryfall.card import CardView
+
+    for row, card in enumerate(cards):
+        view = CardView(store, row)
+        assert view == card
+        assert dict(view) == card
+        assert view["name"] == card["name"]
+        assert view["prices"] == card["prices"]
+        assert ("oracle_id" in view) == ("oracle_id" in card)
+        assert "legalities" not in view
+
+
+@pytest.mark.parametrize(
+    ("currency", "foil", "expected_prices"),
+    [
+        ("eur", None, [0.83 * 1.5, 4.2, None]),  # Converted from usd
+        ("usd", None, [1.5, None, None]),
+        ("usd", True, [None, None, None]),
+        ("tix", False, [0.02, None, None]),
+    ],
+)
+def test_price_index(store: CardStore, currency: str, foil: bool | None, expected_prices: list[float | None]) -> None:
+    import numpy as np
+
+    from mtg_proxies.scryfall.prices import PriceIndex
+
+    oracle_ids = ["c0b2bd3e-0b3e-4b6b-9a3c-6b0c7d9c4a11", "5d1b3c4e-8f7a-4c1e-9d2b-3e4f5a6b7c8d", "not an id"]
+    prices = PriceIndex(store).prices(oracle_ids, currency, foil)
+
+    assert [float(price) if not np.isnan(price) else None for price in prices] == expected_prices
+
+
+def test_card_view_partial_prices(card: Callable[..., dict], card_store: Callable[..., CardStore]) -> None:
+    from mtg_proxies.scryfall.card import CardView
+
+    cards = [
+        card("76ac5b70-47db-4cdb-91e7-e5c18c42e516", prices={"eur": "0.35", "tix": None}),  # Fewer keys than usual
+        card("76ac5b70-47db-4cdb-91e7-e5c18c42e516"),
+    ]
+    store = card_store(cards)
+
+    assert CardView(store, 0)["prices"] == {"eur": "0.35", "tix": None}
+    assert dict(CardView(store, 0)) == CardView(store, 0).to_dict()
+    assert "prices" not in CardView(store, 1)
+    assert dict(CardView(store, 1)) == cards[1]
+
+
+def test_decoded_cache_releases_store(cards: list[dict], card_store: Callable[..., CardStore]) -> None:
+    import gc
+    import weakref
+
+    store = card_store(cards)
+    store.decoded(0)
+    ref = weakref.ref(store)
+    del store
+    gc.collect()
+
+    assert ref() is None
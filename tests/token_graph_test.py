@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mtg_proxies.scryfall.store import CardStore
+
+
+SOLDIER = "00000000-0000-0000-0000-00000000000a"
+SPIRIT = "00000000-0000-0000-0000-00000000000b"
+
+
+def test_token_graph(card: Callable[..., dict], card_store: Callable[..., CardStore]) -> None:
+    from mtg_proxies.scryfall.token_graph import TokenGraph
+
+    cards = [
+        card("10000000-0000-0000-0000-000000000001", oracle_id=SOLDIER, name="Soldier"),
+        card("10000000-0000-0000-0000-000000000002", oracle_id=SPIRIT, name="Spirit"),
+        card("10000000-0000-0000-0000-000000000003", oracle_id=SPIRIT, name="Spirit"),
+        # Raise the Alarm, only the second print lists its tokens
+        card(
+            "10000000-0000-0000-0000-000000000004",
+            oracle_id="00000000-0000-0000-0000-000000000001",
+            name="Raise the Alarm",
+        ),
+        card(
+            "10000000-0000-0000-0000-000000000005",
+            oracle_id="00000000-0000-0000-0000-000000000001",
+            name="Raise the Alarm",
+            all_parts=[
+                {"component": "combo_piece", "id": "10000000-0000-0000-0000-000000000005"},
+                {"component": "token", "id": "10000000-0000-0000-0000-000000000001"},
+            ],
+        ),
+        # Lingering Souls, creates two different prints of the same token
+        card(
+            "10000000-0000-0000-0000-000000000006",
+            oracle_id="00000000-0000-0000-0000-000000000002",
+            name="Lingering Souls",
+            all_parts=[
+                {"component": "token", "id": "10000000-0000-0000-0000-000000000002"},
+                {"component": "token", "id": "10000000-0000-0000-0000-000000000003"},
+                {"component": "token", "id": "10000000-0000-0000-0000-ffffffffffff"},  # Not in the database
+            ],
+        ),
+    ]
+    graph = TokenGraph.open(card_store(cards))
+
+    assert graph.tokens(["00000000-0000-0000-0000-000000000001"]) == [SOLDIER]
+    assert graph.tokens(["00000000-0000-0000-0000-000000000002"]) == [SPIRIT]
+    assert graph.tokens(["00000000-0000-0000-0000-000000000002", "00000000-0000-0000-0000-000000000001"]) == [
+        SPIRIT,
+        SOLDIER,
+    ]
+    assert graph.tokens([SOLDIER]) == []